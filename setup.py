@@ -15,9 +15,12 @@ setup(
     packages=find_packages(),
     entry_points={
         'console_scripts': [
-            'stylist=stylist.cli:cli'
+            'stylist=stylist.daemon.client:main'
         ]
     },
     install_requires=reqs,
+    extras_require={
+        'cache': ['cryptography', 'keyring']
+    },
     python_requires='>=2.7'
 )
@@ -0,0 +1,101 @@
+import errno
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from os.path import dirname, expanduser, join
+
+USER_CACHE_DIR = join(expanduser('~'), '.stylist', 'cache')
+
+
+def user_cache_path(*parts):
+    return join(USER_CACHE_DIR, *parts)
+
+
+def stat_signature(paths):
+    """
+    Build cheap change-detection signature for given files, missing files are part of the signature as well
+    :type paths list
+    :rtype: list
+    """
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append([path, st.st_mtime, st.st_size])
+        except OSError:
+            signature.append([path, None, None])
+
+    return signature
+
+
+def ensure_dir(path):
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+
+def ensure_private_dir(path):
+    """
+    Create directory for caches, logs or plans inside the project, ignored by git through its own .gitignore, so
+    projects whose .gitignore predates the directory don't commit its content
+    """
+    ensure_dir(path)
+
+    ignore_file = join(path, '.gitignore')
+    if not os.path.exists(ignore_file):
+        with open(ignore_file, 'w') as f:
+            f.write('*\n')
+
+
+def atomic_write(path, data, mode=0o644):
+    """
+    Write data to temporary file next to destination and move it in place, so concurrent readers never see
+    partially written cache files
+    """
+    ensure_dir(dirname(path))
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, mode)
+        os.rename(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def read_json(path, default=None):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return default
+
+
+def write_json(path, data):
+    try:
+        atomic_write(path, json.dumps(data))
+    except (IOError, OSError):
+        # cache is an optimisation only, read only home directory can't break the command
+        pass
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive lock shared by all stylist processes, released when the block ends or the process dies
+    """
+    ensure_dir(dirname(path))
+
+    with open(path, 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -7,6 +7,7 @@ import click_log
 import os
 
 from stylist.click import CONTEXT_SETTINGS, ComplexCLI, Context
+from stylist.timing import tracer
 
 logger = logging.getLogger(__name__)
 click_log.basic_config(logger)
@@ -16,5 +17,48 @@ os.environ['STYLIST'] = "1"
 
 
 @click.command(cls=ComplexCLI, context_settings=CONTEXT_SETTINGS)
-def cli():
-    pass
+@click.option('--timings', is_flag=True, envvar='STYLIST_TRACE',
+              help='Print time spent in startup, configuration, AWS calls, subprocesses and command body')
+@click.option('--trace-file', type=click.Path(dir_okay=False, writable=True), envvar='STYLIST_TRACE_FILE',
+              help='Write timings as Chrome trace-event JSON file (chrome://tracing, ui.perfetto.dev)')
+@click.option('--aws-stats', is_flag=True, envvar='STYLIST_AWS_STATS',
+              help='Print number, latency, errors and retries of AWS API calls per operation')
+@click.option('--aws-stats-file', type=click.Path(dir_okay=False, writable=True), envvar='STYLIST_AWS_STATS_FILE',
+              help='Write every AWS API call with its latency, HTTP status and retries as JSON file')
+@click.pass_context
+def cli(ctx, timings, trace_file, aws_stats, aws_stats_file):
+    if timings or trace_file:
+        ctx.call_on_close(lambda: report_timings(timings, trace_file))
+
+    if aws_stats or aws_stats_file:
+        ctx.call_on_close(lambda: report_aws_stats(aws_stats, aws_stats_file))
+
+
+def report_timings(summary, trace_file):
+    if trace_file:
+        tracer.write_chrome_trace(trace_file)
+
+    if summary:
+        from stylist.utils import table
+
+        rows = [[category, name, str(calls), '{:.3f}'.format(total)] for category, name, calls, total in
+                tracer.summary()]
+
+        click.echo(table('TIMINGS', rows, ['CATEGORY', 'SPAN', 'CALLS', 'TOTAL (s)']).table, err=True)
+
+
+def report_aws_stats(summary, stats_file):
+    from stylist.provider.aws_stats import stats
+
+    if stats_file:
+        stats.write_json(stats_file)
+
+    if summary:
+        from stylist.utils import table
+
+        rows = [[service, operation, str(calls), str(errors), str(retries), str(throttled), '{:.3f}'.format(total),
+                 '{:.3f}'.format(longest)]
+                for service, operation, calls, errors, retries, throttled, total, longest in stats.summary()]
+
+        click.echo(table('AWS API CALLS', rows, ['SERVICE', 'OPERATION', 'CALLS', 'ERRORS', 'RETRIES', 'THROTTLED',
+                                                 'TOTAL (s)', 'MAX (s)']).table, err=True)
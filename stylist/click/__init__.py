@@ -2,15 +2,17 @@ from __future__ import absolute_import
 
 import os
 import sys
-from os.path import dirname, join, abspath, isfile
+import time
+from os.path import dirname, join, isdir, isfile
 
 import click
 import schema
 from click import MultiCommand, Group
-from git import Repo, InvalidGitRepositoryError
 
 from stylist import config
-from stylist.provider.aws import AWSProvider
+from stylist.click.manifest import CommandManifest, import_command
+from stylist.project.repository import apply_exclusions, project_name
+from stylist.timing import span, tracer
 from stylist.utils import find_dotenv
 
 CONTEXT_SETTINGS = dict(auto_envvar_prefix='STYLIST')
@@ -22,6 +24,7 @@ class Context(object):
         self.environment = ""
         self.name = None
         self.settings = {}
+        self.no_cache = False
         self._provider = None
         self.config_filename = 'config.yml'
 
@@ -42,6 +45,12 @@ class Context(object):
     def config_file(self):
         return join(self.config_dir, self.config_filename)
 
+    def cache_file(self, name):
+        """
+        Path of project level cache file, None when current directory is not a stylist project
+        """
+        return join(self.config_dir, 'cache', name) if isdir(self.config_dir) else None
+
     @property
     def provider(self):
         if not self._provider:
@@ -50,29 +59,27 @@ class Context(object):
         return self._provider
 
     def load(self, profile):
+        with span('load context', 'context'):
+            self._load(profile)
+
+    def _load(self, profile):
         self.environment = profile or self.environment or self._active_environment() or ""
 
         try:
-            self.settings = config.conform(config.get(self.config_file, self.config_filename))
+            self.settings = config.load(self.config_file, self.config_filename, self.cache_file('settings'))
         except schema.SchemaError as e:
             click.secho(e.message, fg='yellow')
             sys.exit(1)
 
-        try:
-            self.name = self.name or Repo(self.working_dir) \
-                .remote('origin') \
-                .url \
-                .split('/')[-1] \
-                .replace(".git", '')
-
-            for _rep in self.settings.get('stylist', {}).get('name_exclusion', []):
-                self.name = self.name.replace(_rep, '')
-
-        except InvalidGitRepositoryError:
-            from stylist.cli import logger
-            self.name = 'unknown'
+        exclusions = self.settings.get('stylist', {}).get('name_exclusion', [])
+        if self.name:
+            self.name = apply_exclusions(self.name, exclusions)
+        else:
+            self.name = project_name(self.working_dir, exclusions, self.cache_file('project')) or 'unknown'
 
     def set_provider(self, profile):
+        from stylist.provider.aws import AWSProvider
+
         self._provider = AWSProvider(self)
         self._provider.load()
         self._provider.values.update({
@@ -88,26 +95,29 @@ class Context(object):
 
 
 class ComplexCLI(MultiCommand):
+    manifest = CommandManifest()
+
     def list_commands(self, ctx):
-        rv = []
-        for filename in os.listdir(abspath(join(os.path.dirname(__file__), '..', 'commands'))):
-            if filename.endswith('.py') and filename.startswith('cmd_'):
-                name = filename[4:-3]
-                rv.append(name)
-        rv.sort()
+        return sorted(self.manifest.commands)
+
+    def format_commands(self, ctx, formatter):
+        """ List commands with short help from manifest instead of importing every command module """
+        rows = [(name, self.manifest.commands[name]) for name in self.list_commands(ctx)]
 
-        return rv
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
 
     def get_command(self, ctx, name):
-        pass
-        try:
-            if sys.version_info[0] == 2:
-                name = name.encode('ascii', 'replace')
-            mod = __import__('stylist.commands.cmd_' + name, None, None, ['cli'])
+        with span('cmd_' + name, 'import'):
+            return import_command(name).cli
+
+    def invoke(self, ctx):
+        # everything from loading stylist package up to now
+        tracer.record('stylist', 'import', tracer.started, time.time())
 
-            return mod.cli
-        except ImportError as e:
-            raise e
+        with span('total', 'stylist'):
+            return MultiCommand.invoke(self, ctx)
 
 
 class GroupWithCommandOptions(Group):
@@ -146,7 +156,8 @@ class GroupWithCommandOptions(Group):
             ctx.params = params
 
             # now call (invoke) the original command
-            original_invoke(ctx)
+            with span(ctx.command_path, 'command'):
+                original_invoke(ctx)
 
         return command_invoke
 
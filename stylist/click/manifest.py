@@ -0,0 +1,69 @@
+import hashlib
+import os
+import sys
+from os.path import abspath, dirname, join
+
+from stylist.cache import read_json, stat_signature, user_cache_path, write_json
+
+COMMANDS_DIR = abspath(join(dirname(__file__), '..', 'commands'))
+MANIFEST_VERSION = 1
+
+
+def import_command(name):
+    if sys.version_info[0] == 2:
+        name = name.encode('ascii', 'replace')
+
+    return __import__('stylist.commands.cmd_' + name, None, None, ['cli'])
+
+
+class CommandManifest(object):
+    """
+    Names and short help of all stylist commands.
+
+    Manifest is generated once by importing every command module and is regenerated only when the set of command
+    modules or their mtimes change, so listing commands (help, completion) never imports them.
+    """
+
+    def __init__(self, commands_dir=COMMANDS_DIR, path=None):
+        self.commands_dir = commands_dir
+        self.path = path or user_cache_path(
+            'commands-{}.json'.format(hashlib.md5(commands_dir.encode('utf-8')).hexdigest()[:8])
+        )
+        self._commands = None
+
+    @property
+    def commands(self):
+        """
+        :rtype: dict
+        """
+        if self._commands is None:
+            self._commands = self.load()
+
+        return self._commands
+
+    def load(self):
+        signature = stat_signature([join(self.commands_dir, f) for f in self._module_files()])
+
+        manifest = read_json(self.path, {})
+        if manifest.get('version') == MANIFEST_VERSION and manifest.get('signature') == signature:
+            return manifest.get('commands')
+
+        commands = self.build()
+        write_json(self.path, {'version': MANIFEST_VERSION, 'signature': signature, 'commands': commands})
+
+        return commands
+
+    def build(self):
+        commands = {}
+        for filename in self._module_files():
+            name = filename[4:-3]
+            try:
+                commands[name] = import_command(name).cli.short_help or ''
+            except ImportError:
+                # keep broken command on the list, same as plain directory listing would do
+                commands[name] = ''
+
+        return commands
+
+    def _module_files(self):
+        return sorted(f for f in os.listdir(self.commands_dir) if f.startswith('cmd_') and f.endswith('.py'))
@@ -10,7 +10,8 @@ _global_options = [
     click.option('--working-dir', type=click.Path(exists=True, file_okay=False, resolve_path=True),
                  help='Changes the folder to operate on.'),
     click.option('--profile', help='Temporary change active profile for given command'),
-    click.option('--project-name', help='Overwrite project name')
+    click.option('--project-name', help='Overwrite project name'),
+    click.option('--no-cache', is_flag=True, help='Bypass local caches of remote values (SSM parameters)')
 ]
 
 
@@ -32,7 +33,7 @@ def ensure_project_directory(dir):
 @click.group(cls=GroupWithCommandOptions)
 @global_options
 @stylist_context
-def cli_prototype(ctx, working_dir, profile, project_name):
+def cli_prototype(ctx, working_dir, profile, project_name, no_cache):
     working_dir = working_dir or ctx.working_dir
     try:
         current_ctx = click.get_current_context()
@@ -42,6 +43,7 @@ def cli_prototype(ctx, working_dir, profile, project_name):
             ensure_project_directory(working_dir)
         ctx.working_dir = working_dir
         ctx.name = project_name
+        ctx.no_cache = no_cache
     except NotProjectDirectoryException as e:
         logger.error(e.message)
         sys.exit(1)
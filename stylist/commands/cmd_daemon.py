@@ -0,0 +1,79 @@
+import os
+import signal
+import sys
+import time
+
+import click
+
+from stylist import daemon
+from stylist.cli import logger
+
+
+@click.group(short_help='Background daemon keeping stylist warm between invocations')
+def cli():
+    """
+    Opt-in daemon executing stylist commands in a long living process.
+
+    When daemon is running, `stylist` forwards every invocation to it and streams the output back, so imports,
+    configuration and AWS sessions are reused between commands. Without daemon commands run in-process as usual.
+    """
+
+
+@cli.command(help='Start stylist daemon')
+@click.option('--foreground', is_flag=True, default=False, help='Run daemon in foreground')
+def start(foreground):
+    from stylist.daemon.server import Server, daemonize, run
+
+    if daemon.connect():
+        click.secho('Daemon is already running', fg='yellow')
+        sys.exit(0)
+
+    if not os.path.isdir(daemon.STYLIST_DIR):
+        os.makedirs(daemon.STYLIST_DIR)
+
+    server = Server()
+    if foreground:
+        run(server)
+        return
+
+    daemonize(server)
+
+    for _ in range(100):
+        if daemon.connect():
+            click.secho('Daemon started, listening on: {}'.format(daemon.SOCKET_PATH), fg='green')
+            return
+        time.sleep(0.1)
+
+    logger.error('Daemon failed to start, see: {}'.format(daemon.LOG_FILE))
+    sys.exit(1)
+
+
+@cli.command(help='Stop stylist daemon')
+def stop():
+    pid = daemon.read_pid()
+    if not pid:
+        click.secho('Daemon is not running', fg='yellow')
+        return
+
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        os.unlink(daemon.PID_FILE)
+        click.secho('Daemon is not running', fg='yellow')
+        return
+
+    for _ in range(100):
+        if not daemon.connect():
+            break
+        time.sleep(0.1)
+
+    click.secho('Daemon stopped', fg='green')
+
+
+@cli.command(help='Show stylist daemon status')
+def status():
+    if daemon.connect():
+        click.secho('Running (pid: {}), socket: {}'.format(daemon.read_pid(), daemon.SOCKET_PATH), fg='green')
+    else:
+        click.secho('Not running', fg='yellow')
+        sys.exit(1)
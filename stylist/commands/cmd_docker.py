@@ -1,5 +1,6 @@
 import sys
 import glob
+from collections import OrderedDict
 from copy import copy
 from datetime import datetime
 from os.path import join
@@ -9,6 +10,7 @@ import re
 
 from stylist.cli import stylist_context, logger
 from stylist.commands import cli_prototype
+from stylist.fanout import fan_out, get_stages, merge_rows, report_errors, show_drift
 from stylist.utils import table
 from stylist.wrapper.docker import Docker, NotADockerProjectException, DockerException, _get_docker_files
 
@@ -109,8 +111,10 @@ def push(ctx, ask, subproject, force_build, tag):
 
 @cli.command(help='List current project images')
 @click.option('--subproject', default=None, help='List images for given subproject')
+@click.option('--all-stages', is_flag=True, help='List images pushed to ECR of every stage')
+@click.option('--drift', is_flag=True, help='Show only tags which point to different images between stages')
 @stylist_context
-def images(ctx, subproject):
+def images(ctx, subproject, all_stages, drift):
     """
     @type ctx: stylist.cli.Context
     """
@@ -119,6 +123,9 @@ def images(ctx, subproject):
 
         docker = Docker(ctx, subproject)
 
+        if all_stages or drift:
+            return _remote_images(ctx, docker, docker_files[0], drift)
+
         images_list = []
         for image in docker.images(docker_files[0]):
             images_list.append([
@@ -142,6 +149,41 @@ def images(ctx, subproject):
         sys.exit(1)
 
 
+def _remote_images(ctx, docker, docker_file, drift):
+    results, errors = fan_out(
+        get_stages(ctx),
+        lambda stage: docker.remote_images(docker_file, ctx.provider.stage_profile(stage))
+    )
+
+    if drift:
+        show_drift("DOCKER IMAGES DRIFT", OrderedDict(
+            (stage, {tag: _short_digest(image) for image in images for tag in image.get('imageTags', [])})
+            for stage, images in results.items()
+        ))
+    else:
+        click.secho(
+            table(
+                "DOCKER IMAGES",
+                merge_rows(OrderedDict(
+                    (stage, [[
+                        _short_digest(image),
+                        image.get('repositoryName'),
+                        ', '.join(image.get('imageTags', [])),
+                        image.get('imageSizeInBytes'),
+                        image.get('imagePushedAt')
+                    ] for image in images]) for stage, images in results.items()
+                )),
+                ["Stage", "Digest", "Repository", "Tags", "Size", "Pushed"]
+            ).table
+        )
+
+    report_errors(errors)
+
+
+def _short_digest(image):
+    return image.get('imageDigest', '').replace('sha256:', '')[:12]
+
+
 @cli.command(help='Run command in project docker container with AWS settings for given stage')
 @click.option('--tag', default='latest', help='Run given tag')
 @click.option('--non-interactive', default=False, is_flag=True, help='Execute command in non interactive mode')
@@ -1,4 +1,5 @@
 import sys
+from collections import OrderedDict
 from copy import copy
 
 import click
@@ -8,7 +9,9 @@ from click import style
 from stylist.cli import stylist_context, logger
 from stylist.click.types import Boolean
 from stylist.commands import cli_prototype
-from stylist.utils import colourize
+from stylist.fanout import fan_out, get_stages, merge_rows, report_errors, show_drift
+from stylist.helper.terraform_runs import display_summary
+from stylist.utils import colourize, table
 from stylist.wrapper.docker import NotADockerProjectException, Docker, _get_docker_files
 from stylist.wrapper.terraform import Terraform, TerraformException
 
@@ -47,11 +50,15 @@ def enrol(ctx, subproject, tag):
 
         terraform.dump_env_vars(env_vars)
 
-        plan_path, exit_code = terraform.plan(True)
+        plan_path, exit_code = terraform.plan(True, reuse=True)
         if exit_code != 0:
             click.secho('terraform plan failed')
             sys.exit(exit_code)
 
+        summary = terraform.plan_summary(plan_path)
+        if summary is not None:
+            display_summary(summary)
+
         msg = style('Enrol "{tag}" to "{env}" with given plan? '.format(
             tag=deploy_tag, env=colourize(ctx.environment)), fg="green"
         )
@@ -60,13 +67,13 @@ def enrol(ctx, subproject, tag):
             click.secho("Aborted!", fg="yellow")
             sys.exit(2)
 
-        exit_code = terraform.apply(plan_path)
+        exit_code = terraform.apply(plan_path, summary)
         if exit_code != 0:
             click.secho('terraform apply failed')
             sys.exit(exit_code)
 
         task_name = str(re.sub("\W", "-", service))
-        ecs = ctx.provider.session.client('ecs')
+        ecs = ctx.provider.client('ecs')
         tasks = ecs.list_task_definitions(familyPrefix=task_name, status='ACTIVE')
 
         if not tasks.get('taskDefinitionArns'):
@@ -85,3 +92,52 @@ def enrol(ctx, subproject, tag):
     except TerraformException as e:
         logger.error(e.message)
         sys.exit(2)
+
+
+@cli.command(name='task-definitions', help='Show containers of the latest active task definition of the service')
+@click.option('--subproject', help='Show task definition of given subproject')
+@click.option('--all-stages', is_flag=True, help='Show task definitions of every stage in a single table')
+@click.option('--drift', is_flag=True, help='Show only containers which run different images between stages')
+@stylist_context
+def task_definitions(ctx, subproject, all_stages, drift):
+    """
+    @type ctx: stylist.cli.Context
+    """
+    task_name = str(re.sub("\W", "-", subproject or ctx.name))
+    headers = ["TASK DEFINITION", "CONTAINER", "IMAGE", "CPU", "MEMORY"]
+
+    if not (all_stages or drift):
+        click.secho(table("TASK DEFINITIONS", _containers(ctx.provider.client('ecs'), task_name), headers, 2).table)
+        return
+
+    results, errors = fan_out(
+        get_stages(ctx),
+        lambda stage: _containers(ctx.provider.client('ecs', profile=ctx.provider.stage_profile(stage)), task_name)
+    )
+
+    if drift:
+        show_drift("TASK DEFINITIONS DRIFT", OrderedDict(
+            (stage, {row[1]: row[2] for row in rows}) for stage, rows in results.items()
+        ))
+    else:
+        click.secho(table("TASK DEFINITIONS", merge_rows(results), ["STAGE"] + headers, 3).table)
+
+    report_errors(errors)
+
+
+def _containers(ecs, task_name):
+    """
+    Task definition, name, image, cpu and memory of each container of the latest active revision
+    :rtype: list
+    """
+    arns = ecs.list_task_definitions(familyPrefix=task_name, status='ACTIVE', sort='DESC', maxResults=1)
+    if not arns.get('taskDefinitionArns'):
+        return []
+
+    definition = ecs.describe_task_definition(taskDefinition=arns['taskDefinitionArns'][0])['taskDefinition']
+    revision = '{}:{}'.format(definition.get('family'), definition.get('revision'))
+
+    return [
+        [revision, c.get('name'), c.get('image'), c.get('cpu'), c.get('memory')]
+        for c in definition.get('containerDefinitions', [])
+    ]
@@ -16,7 +16,7 @@ cli.short_help = "AWS KMS encryption helper"
 @click.option("--plain", default=False, flag_value='plain', help="Return encrypted value only")
 @stylist_context
 def encrypt(ctx, plain_text, plain):
-    kms = ctx.provider.session.client("kms")
+    kms = ctx.provider.client("kms")
 
     key_id = ctx.provider.ssm.get_encryption_key().get('TargetKeyId')
 
@@ -40,7 +40,7 @@ def encrypt(ctx, plain_text, plain):
 @click.option("--plain", default=False, flag_value='plain', help="Return decrypted value only")
 @stylist_context
 def decrypt(ctx, encrypted, plain):
-    kms = ctx.provider.session.client("kms")
+    kms = ctx.provider.client("kms")
 
     try:
         decrypted = kms.decrypt(
@@ -5,7 +5,6 @@ import click
 
 from stylist.cli import stylist_context, logger
 from stylist.commands import cli_prototype
-from stylist.provider.aws import SSM
 from stylist.utils import colourize
 from stylist.wrapper.terraform import Terraform, TerraformException
 
@@ -55,10 +54,16 @@ def list_profiles(ctx):
 
 @cli.command(name="sync-vars", help="Synchronise configuration variables between profiles")
 @click.option("--namespaces", help="SSM namespaces to migrate", multiple=True)
+@click.option("--yes", is_flag=True, help="Apply planned changes")
+@click.option("--out", type=click.Path(dir_okay=False), help="Save plan to file, to be applied later with --plan")
+@click.option("--plan", "plan_file", type=click.Path(exists=True, dir_okay=False), help="Apply plan saved with --out")
+@click.option("--prune", is_flag=True, help="Delete variables which are missing in source profile")
 @click.argument("source")
 @click.argument("destination")
 @stylist_context
-def sync_vars(ctx, namespaces, source, destination):
+def sync_vars(ctx, namespaces, yes, out, plan_file, prune, source, destination):
+    from stylist.diff import Plan
+
     try:
         profiles = ctx.settings.get('stylist', {}).get('stages')
         if source not in profiles:
@@ -67,30 +72,109 @@ def sync_vars(ctx, namespaces, source, destination):
         if destination not in profiles:
             raise Exception('Destination profile "{}" is missing'.format(destination))
 
-        click.secho("Migrating terraform variables", fg="blue")
-
-        if isdir(join(ctx.working_dir, 'terraform')):
-            try:
-                terraform = Terraform(ctx)
-                terraform.sync_vars(source, destination)
-            except TerraformException as e:
-                click.secho("No stage tfvars. Skipping terraform migration.")
-
         namespaces = list(namespaces)
         if not namespaces:
             namespaces.append('service:{}'.format(ctx.name))
 
-        click.secho("Migrating ssm namespaces", fg="blue")
-        source_ssm = SSM(ctx.provider.get_session_for_stage(source).client('ssm'), ctx)
-        destination_session = ctx.provider.get_session_for_stage(destination)
-        destination_ssm = SSM(destination_session.client('ssm'), ctx)
+        terraform = Terraform(ctx) if isdir(join(ctx.working_dir, 'terraform')) else None
+
+        source_ssm = ctx.provider.ssm_for_stage(source)
+        destination_ssm = ctx.provider.ssm_for_stage(destination)
+
+        if plan_file:
+            plan = Plan.load(plan_file)
+            if (plan.source, plan.destination) != (source, destination):
+                raise Exception('Plan has been made for "{}" -> "{}"'.format(plan.source, plan.destination))
+
+            if not terraform and any(section.kind == 'tfvars' for section in plan.sections):
+                raise Exception('Plan updates terraform tfvars, but there is no terraform directory in {}'.format(
+                    ctx.working_dir))
+
+            drifted = _drifted(plan, terraform, destination_ssm)
+            if drifted:
+                raise Exception('Destination has changed since plan has been made: {}'.format(", ".join(drifted)))
+        else:
+            sections = _plan_sections(terraform, source, destination, source_ssm, destination_ssm, namespaces, prune)
+            plan = Plan(source, destination, sections)
 
-        for namespace in namespaces:
-            click.secho("Migrating '{}' from '{}' -> '{}'".format(namespace, colourize(source), colourize(destination)))
-            diff = SSM.sync_vars(source_ssm, destination_ssm, namespace)
+        plan.display()
 
-            for key, value in diff.items():
-                destination_ssm.write(namespace, key, value, session=destination_session)
+        if not plan.has_changes:
+            click.secho("Nothing to synchronise", fg="green")
+            return
+
+        if out:
+            plan.save(out)
+            click.secho("Plan saved to: {}, apply it with: --plan {}".format(out, out), fg="green")
+            return
+
+        if not (yes or plan_file):
+            click.secho("Run with --yes to apply changes or with --out to save the plan", fg="yellow")
+            return
+
+        _apply(plan, terraform, destination_ssm)
 
     except Exception as e:
         logger.error(e.message)
+
+
+def _plan_sections(terraform, source, destination, source_ssm, destination_ssm, namespaces, prune):
+    from stylist.diff import PlanSection
+    from stylist.provider.aws import SSM
+
+    sections = []
+
+    if terraform:
+        try:
+            diff = terraform.vars_diff(source, destination)
+            sections.append(PlanSection.from_diff('tfvars', destination, diff, prune))
+        except TerraformException:
+            click.secho("No stage tfvars. Skipping terraform migration.")
+
+    for namespace, diff in zip(namespaces, SSM.sync_vars(source_ssm, destination_ssm, namespaces)):
+        sections.append(PlanSection.from_diff('ssm', namespace, diff, prune))
+
+    return sections
+
+
+def _drifted(plan, terraform, destination_ssm):
+    ssm_sections = [section for section in plan.sections if section.kind == 'ssm']
+    current = dict(zip(
+        [section.name for section in ssm_sections],
+        destination_ssm.namespace_values([section.name for section in ssm_sections])
+    ))
+
+    drifted = []
+    for section in plan.sections:
+        values = terraform.read_vars(section.name) if section.kind == 'tfvars' else current[section.name]
+        drifted += ['{}:{}'.format(section.name, name) for name in section.drifted(values)]
+
+    return drifted
+
+
+def _apply(plan, terraform, destination_ssm):
+    for section in plan.sections:
+        if not section.has_changes:
+            continue
+
+        if section.kind == 'tfvars':
+            terraform.apply_vars(section.name, section)
+            click.secho("Updated: {}".format(terraform.vars_file(section.name)), fg="green")
+            continue
+
+        click.secho("Migrating '{}' -> '{}'".format(section.name, colourize(plan.destination)))
+        written, failed = destination_ssm.write_many(section.name, section.writes, profile=destination_ssm.profile)
+
+        deleted = 0
+        for name in section.deletes:
+            try:
+                destination_ssm.delete(section.name, name)
+                deleted += 1
+            except Exception as e:
+                failed[name] = e
+
+        for name, e in sorted(failed.items()):
+            logger.error("Unable to update '{}': {}".format(name, e))
+
+        click.secho("Written {}, deleted {}, failed {}".format(len(written), deleted, len(failed)),
+                    fg="yellow" if failed else "green")
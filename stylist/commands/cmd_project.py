@@ -4,7 +4,6 @@ from copy import copy
 from subprocess import call
 
 import click
-import git
 import yaml
 from click import Path
 
@@ -12,8 +11,11 @@ import stylist.provider.sentry as sentry
 from stylist.cli import stylist_context, logger
 from stylist.commands import cli_prototype
 from stylist.feature import get_feature, FEATURES, FeatureException
+from stylist.lazy import lazy_import
 from stylist.utils import table
 
+git = lazy_import('git')
+
 cli = copy(cli_prototype)
 cli.short_help = 'Stylist project helper'
 
@@ -21,11 +23,16 @@ TEMPLATES_REPO = 'git@github.com:ThreadsStylingLtd/stylist.git'
 
 GIT_IGNORE = """
 .stylist/environment
+.stylist/cache
 terraform/.tfupdate
 terraform/.terraform/environment
 terraform/.terraform/modules
 terraform/.terraform/plugins/*
 !terraform/.terraform/plugins/*/lock.json
+terraform/.terraform-*
+terraform/.stylist-logs
+terraform/.stylist-runs
+terraform/.stylist-plans
 """
 
 
@@ -6,14 +6,16 @@ import re
 
 import os
 import subprocess
-from pygments import highlight
-from pygments.formatters import get_formatter_by_name
-from pygments.lexers import get_lexer_by_name
 from stylist.helper.rds import DbContext, get_connection_credentials
 
 from stylist.cli import stylist_context, logger
 from stylist.click.types import Boolean
 from stylist.commands import cli_prototype
+from stylist.lazy import lazy_import
+
+pygments = lazy_import('pygments')
+formatters = lazy_import('pygments.formatters')
+lexers = lazy_import('pygments.lexers')
 
 cli = copy(cli_prototype)
 cli.short_help = "Manage database creation / users / schemas"
@@ -36,10 +38,10 @@ def get_role_tag(instance, role_name):
 
 
 def prompt(instance, db, sqls, mask='-dummy-', fg="green"):
-    queries = highlight(
+    queries = pygments.highlight(
         "\n".join(sqls).replace(mask or '-dummy-', '*' * 8),
-        get_lexer_by_name('sql'),
-        get_formatter_by_name('console')
+        lexers.get_lexer_by_name('sql'),
+        formatters.get_formatter_by_name('console')
     )
 
     return click.prompt(
@@ -51,15 +53,25 @@ def prompt(instance, db, sqls, mask='-dummy-', fg="green"):
 
 
 def write_parameters(ssm, instance, db, namespaces, params, tags=None):
+    failed = False
     for namespace, parameters in namespaces.items():
-        for name, value in {k: v for k, v in params.items() if k in parameters}.items():
-            ssm.write(namespace, name, value, tags=tags or {})
+        _, errors = ssm.write_many(namespace, {k: v for k, v in params.items() if k in parameters}, tags=tags or {})
+
+        for name, e in sorted(errors.items()):
+            logger.error('Unable to store "{}" under: "{}" namespace: {}'.format(name, namespace, e))
+
+        if errors:
+            failed = True
+            continue
 
         click.secho(
             'Values for: [{}] has been stored under: "{}" namespace'.format(", ".join(parameters), namespace),
             fg="green"
         )
 
+    if failed:
+        sys.exit(1)
+
 
 @cli.command(name="init", help="Create new database with db owner")
 @click.option("--instance", default='rds-postgresql')
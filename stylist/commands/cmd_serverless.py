@@ -4,7 +4,6 @@ from copy import copy
 from glob import glob
 from os.path import join, basename, isfile
 
-import boto3
 import click
 import yaml
 
@@ -13,10 +12,13 @@ from stylist.commands import cli_prototype
 from stylist.click.types import EventAwareFile
 from stylist.emulator import ExecutionContext
 from stylist.emulator.aws import Emulator
+from stylist.lazy import lazy_import
 from stylist.wrapper.serverless import Serverless, FunctionNotFoundException, InvalidContextException
 from stylist.utils import highlight_json, display_section, table
 from stylist.wrapper.virtualenv import Virtualenv
 
+boto3 = lazy_import('boto3')
+
 cli = copy(cli_prototype)
 cli.short_help = 'Manage serverless functions'
 
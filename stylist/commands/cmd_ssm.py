@@ -7,6 +7,8 @@ import click
 from stylist.cli import stylist_context, logger
 from stylist.click.types import Boolean
 from stylist.commands import cli_prototype
+from stylist.fanout import fan_out, get_stages, merge_rows, report_errors, show_drift
+from stylist.helper.values_file import FORMATS, ValuesFileException, detect_format, read_values, write_values
 from stylist.utils import table
 
 cli = copy(cli_prototype)
@@ -37,11 +39,31 @@ def write(ctx, namespace, encrypt, parameter, value):
 
 
 @cli.command(help="List all parameters for given service / resource SSM")
+@click.option('--all-stages', is_flag=True, help="List parameters of every stage in a single table")
+@click.option('--drift', is_flag=True, help="Show only parameters which differ between stages")
 @click.argument("namespace", nargs=-1)
 @stylist_context
-def list(ctx, namespace):
+def list(ctx, all_stages, drift, namespace):
     namespace = namespace or ("service:" + re.sub('\W', '-', ctx.name),)
 
+    if drift:
+        return _show_drift(ctx, namespace)
+
+    if all_stages:
+        results, errors = fan_out(
+            get_stages(ctx), lambda stage: ctx.provider.ssm_for_stage(stage).get_full_parameters(*namespace)
+        )
+        click.secho(
+            table(
+                "KNOWN PARAMETERS",
+                merge_rows(results),
+                ["STAGE", "NAME", "TYPE", "VALUE", "LAST MODIFIED", "LAST MODIFIED BY"],
+                wraped_col=2
+            ).table
+        )
+
+        return report_errors(errors)
+
     click.secho(
         table(
             "KNOWN PARAMETERS",
@@ -52,16 +74,42 @@ def list(ctx, namespace):
 
 
 @cli.command(help="Dump all parameters in key=value format")
+@click.option('--all-stages', is_flag=True, help="Dump parameters of every stage, one section per stage")
+@click.option('--drift', is_flag=True, help="Show only parameters which differ between stages")
 @click.argument("namespace", nargs=-1)
 @stylist_context
-def dump(ctx, namespace):
+def dump(ctx, all_stages, drift, namespace):
     namespace = namespace or ("service:" + re.sub('\W', '-', ctx.name),)
+
+    if drift:
+        return _show_drift(ctx, namespace)
+
+    if all_stages:
+        results, errors = fan_out(
+            get_stages(ctx), lambda stage: ctx.provider.ssm_for_stage(stage).get_full_parameters(*namespace, env=True)
+        )
+
+        for stage, _all in results.items():
+            click.echo("# {}".format(stage))
+            for param in _all:
+                click.echo("{}={}".format(param[0], param[2]))
+
+        return report_errors(errors)
+
     _all = ctx.provider.ssm.get_full_parameters(*namespace, env=True)
 
     for param in _all:
         click.echo("{}={}".format(param[0], param[2]))
 
 
+def _show_drift(ctx, namespace):
+    results, errors = fan_out(
+        get_stages(ctx), lambda stage: ctx.provider.ssm_for_stage(stage).get_short_parameters(*namespace)
+    )
+    show_drift("PARAMETERS DRIFT", results)
+    report_errors(errors)
+
+
 @cli.command(help="Delete parameter with given name")
 @click.option('--namespace', help="Namespace under which parameter should be stored, for example service:name")
 @click.argument('parameter')
@@ -84,3 +132,53 @@ def delete(ctx, namespace, parameter):
         sys.exit(2)
 
     click.secho('Deleted', fg='green')
+
+
+@cli.command(name="export", help="Export parameters of namespace to dotenv, json or yaml file")
+@click.argument("namespace", required=False)
+@click.option('--output', '-o', type=click.File('wb'), default='-', help="Output file, stdout by default")
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help="Output format, detected from file extension")
+@stylist_context
+def export(ctx, namespace, output, fmt):
+    namespace = namespace or "service:" + re.sub('\W', '-', ctx.name)
+    fmt = fmt or detect_format(output.name)
+
+    count = write_values(output, fmt, ctx.provider.ssm.iter_parameters(namespace))
+
+    if output.name != '<stdout>':
+        click.secho("Exported {} parameters from '{}' to: {}".format(count, namespace, output.name), fg='green')
+
+
+@cli.command(name="import", help="Import parameters from dotenv, json or yaml file, only changed values are written")
+@click.argument("source", type=click.File('rb'))
+@click.option('--namespace', help="Namespace under which parameters should be stored, for example service:name")
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help="Input format, detected from file extension")
+@click.option('--encrypt/--no-encrypt', help="Encrypt values", default=True)
+@stylist_context
+def import_(ctx, source, namespace, fmt, encrypt):
+    namespace = namespace or "service:" + re.sub('\W', '-', ctx.name)
+
+    try:
+        values = read_values(source, fmt or detect_format(source.name))
+    except (ValuesFileException, ValueError) as e:
+        logger.error('Unable to read {}: {}'.format(source.name, e))
+        sys.exit(1)
+
+    ssm = ctx.provider.ssm
+    current = ssm.get_short_parameters(namespace)
+    changed = {k: v for k, v in values.items() if current.get(k) != v}
+
+    written, failed = ssm.write_many(namespace, changed, encrypt)
+
+    for name, e in sorted(failed.items()):
+        logger.error("Unable to write '{}': {}".format(name, e))
+
+    click.secho(
+        "Written {} parameters to '{}', {} unchanged, {} failed".format(
+            len(written), namespace, len(values) - len(changed), len(failed)
+        ),
+        fg='yellow' if failed else 'green'
+    )
+
+    if failed:
+        sys.exit(1)
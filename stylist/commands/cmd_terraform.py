@@ -1,14 +1,18 @@
 import os
 from copy import copy
+from os.path import join, relpath
 
 import click
 import sys
 from click import style
+from stylist.cache import ensure_private_dir
 from stylist.cli import stylist_context, logger
 from stylist.click.types import Boolean
 from stylist.commands import cli_prototype
+from stylist.fanout import fan_out, get_stages, report_errors
 from stylist.feature import Templates
-from stylist.wrapper.terraform import Terraform, TerraformException
+from stylist.helper.terraform_runs import display_summary, has_changes
+from stylist.wrapper.terraform import LOGS_DIR, Terraform, TerraformException
 from stylist.utils import colourize, table
 
 cli = copy(cli_prototype)
@@ -16,34 +20,100 @@ cli.short_help = 'Wrapper around terraform'
 
 
 @cli.command(help="Show terraform plan for current env")
-@click.option('--force-update', is_flag=True, default=False, help="Force modules update, by default modules are updated after an hour")
+@click.option('--force-update', is_flag=True, default=False,
+              help="Force modules update, by default modules are updated only when their sources or versions change")
+@click.option('--refresh-context', is_flag=True, help="Discover load balancers and APIs again instead of using cache")
+@click.option('--all-stages', is_flag=True, help="Plan every stage in parallel and show summary of changes")
+@click.option('--jobs', default=4, type=click.IntRange(1), help="Number of stages planned at once with --all-stages")
 @stylist_context
-def plan(ctx, force_update):
+def plan(ctx, force_update, refresh_context, all_stages, jobs):
     """
     @type ctx: stylist.cli.Context
     """
+    if all_stages:
+        return _plan_all_stages(ctx, force_update, refresh_context, jobs)
+
     try:
         terraform = Terraform(ctx)
-        plan, exit_code = terraform.plan(force_update=force_update)
+        plan, exit_code = terraform.plan(force_update=force_update, refresh_context=refresh_context)
         sys.exit(exit_code)
     except TerraformException as e:
         logger.error(e.message)
 
 
+def _plan_all_stages(ctx, force_update, refresh_context, jobs):
+    """
+    Plan each stage in its own data dir and workspace, output of each stage goes to its log file
+    """
+    stages = get_stages(ctx)
+    logs_dir = join(ctx.working_dir, 'terraform', LOGS_DIR)
+    ensure_private_dir(logs_dir)
+
+    def run(stage):
+        log_path = join(logs_dir, 'plan.{}.log'.format(stage))
+
+        with open(log_path, 'w') as log:
+            terraform = Terraform(ctx, stage=stage, isolated=True, output=log)
+            plan_path, exit_code = terraform.plan(True, force_update, refresh_context)
+
+            try:
+                changes = terraform.plan_changes(plan_path) if exit_code == 0 else None
+            finally:
+                if plan_path:
+                    os.remove(plan_path)
+
+        if changes is None and exit_code == 0:
+            with open(log_path, 'r') as log:
+                changes = Terraform.parse_plan_output(log.read())
+
+        return exit_code, changes, log_path
+
+    click.secho("Planning {} with {} parallel jobs".format(", ".join(stages), jobs), fg="blue")
+    results, errors = fan_out(stages, run, max_workers=jobs)
+
+    rows = []
+    for stage, (exit_code, changes, log_path) in results.items():
+        changes = changes or {}
+        rows.append([
+            stage,
+            changes.get('add', '?'),
+            changes.get('change', '?'),
+            changes.get('destroy', '?'),
+            'ok' if exit_code == 0 else 'failed ({})'.format(exit_code),
+            relpath(log_path, ctx.working_dir)
+        ])
+
+    click.secho(table("PLAN SUMMARY", rows, ["STAGE", "ADD", "CHANGE", "DESTROY", "STATUS", "LOG"]).table)
+
+    report_errors(errors)
+
+    if any(exit_code != 0 for exit_code, _, _ in results.values()):
+        sys.exit(1)
+
+
 @cli.command(help="Create terraform plan and apply")
+@click.option('--refresh-context', is_flag=True, help="Discover load balancers and APIs again instead of using cache")
+@click.option('--replan', is_flag=True, help="Always plan, even if recent plan with the same inputs and state exists")
 @stylist_context
-def apply(ctx):
+def apply(ctx, refresh_context, replan):
     """
     @type ctx: stylist.cli.Context
     """
     plan_path = None
     try:
         terraform = Terraform(ctx)
-        plan_path, exit_code = terraform.plan(True)
+        plan_path, exit_code = terraform.plan(True, refresh_context=refresh_context, reuse=not replan)
 
         if exit_code != 0:
             return exit_code
 
+        summary = terraform.plan_summary(plan_path)
+        if summary is not None:
+            display_summary(summary)
+
+            if not has_changes(summary):
+                return
+
         _apply = click.prompt(
             style('Apply saved plan to "{}"? '.format(colourize(ctx.environment)), fg="green"),
             type=Boolean(),
@@ -51,7 +121,8 @@ def apply(ctx):
         )
 
         if _apply:
-            terraform.apply(plan_path)
+            terraform.apply(plan_path, summary)
+            _show_slowest(terraform.history, terraform.stage)
         else:
             click.secho("Aborted.", fg="yellow")
     except TerraformException as e:
@@ -61,6 +132,34 @@ def apply(ctx):
             os.remove(plan_path)
 
 
+@cli.command(help="Show slowest resources of the latest apply and how their duration compares with previous applies")
+@click.option('--stage', help="Stage of the apply, current one by default")
+@click.option('--limit', default=10, help="Number of resources to show")
+@stylist_context
+def runs(ctx, stage, limit):
+    """
+    @type ctx: stylist.cli.Context
+    """
+    terraform = Terraform(ctx, stage=stage)
+
+    if not _show_slowest(terraform.history, terraform.stage, limit):
+        click.secho("No recorded applies for {}".format(colourize(terraform.stage)), fg="yellow")
+
+
+def _show_slowest(history, stage, limit=10):
+    rows = history.slowest(stage, limit)
+
+    if rows:
+        click.secho(table(
+            "SLOWEST RESOURCES ({})".format(stage),
+            rows,
+            ["RESOURCE", "ACTION", "SECONDS", "AVG (s)", "MAX (s)", "RUNS", "TREND"],
+            wraped_col=0
+        ).table)
+
+    return bool(rows)
+
+
 @cli.command(name="configure-module", help="Configure terraform module")
 @click.argument("module_name")
 @click.argument("alias")
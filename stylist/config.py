@@ -1,23 +1,99 @@
+import marshal
+from copy import deepcopy
 from os import path
 
-import anyconfig
 from schema import Schema, And, Optional
 
+from stylist.cache import atomic_write, ensure_private_dir, stat_signature
+from stylist.lazy import lazy_import
+
+anyconfig = lazy_import('anyconfig')
+
 schema = {Optional('stylist'): {Optional('provider'): {'prefix': str, 'type': str},
                                 Optional('stages'): list,
                                 Optional('name_exclusion'): list},
           Optional('sentry'): {'auth_token': str, 'org': str, 'team': str},
-          Optional('terraform'): {Optional('templates'): str},
-          Optional('docker_images'): {'python3_lambda': str}}
+          Optional('terraform'): {Optional('templates'): str,
+                                  Optional('plugin_cache_dir'): str,
+                                  Optional('isolated_data_dirs'): bool,
+                                  Optional('plan_reuse_ttl'): int,
+                                  Optional('templates_sync_interval'): int},
+          Optional('docker_images'): {'python3_lambda': str},
+          Optional('aws'): {Optional('max_pool_connections'): int,
+                            Optional('identity_ttl'): int,
+                            Optional('kms_key_ttl'): int,
+                            Optional('ssm_write_rate'): int,
+                            Optional('ssm_cache_ttl'): int,
+                            Optional('context_ttl'): int}}
 
 schema_conformer = And(schema)
 
 conform = Schema(schema_conformer, ignore_extra_keys=True).validate
 
 
+CACHE_VERSION = 1
+
+_loaded = {}
+
+
+def sources(config_file, config_filename):
+    return [path.join('/etc/stylist/', config_filename),
+            path.join(path.expanduser('~'), '.stylist', config_filename),
+            config_file]
+
+
 def get(config_file, config_filename):
-    return anyconfig.load([path.join('/etc/stylist/', config_filename),
-                           path.join(path.expanduser('~'), '.stylist', config_filename),
-                           config_file],
+    return anyconfig.load(sources(config_file, config_filename),
                           ignore_missing=True,
                           ac_parser="yaml")
+
+
+def load(config_file, config_filename, cache_file=None):
+    """
+    Merged and validated settings.
+
+    Settings are kept in memory and in optional cache file for as long as none of the config files changes, so
+    unchanged configuration is loaded with a single stat pass instead of YAML parsing and schema validation.
+    :rtype: dict
+    """
+    signature = stat_signature(sources(config_file, config_filename))
+
+    loaded = _loaded.get(config_file)
+    if not loaded or loaded[0] != signature:
+        settings = _read_cache(cache_file, signature)
+
+        if settings is None:
+            settings = conform(get(config_file, config_filename))
+            _write_cache(cache_file, signature, settings)
+
+        loaded = _loaded[config_file] = (signature, settings)
+
+    return deepcopy(loaded[1])
+
+
+def _read_cache(cache_file, signature):
+    if not cache_file:
+        return None
+
+    try:
+        with open(cache_file, 'rb') as f:
+            version, cached_signature, settings = marshal.load(f)
+    except (IOError, EOFError, ValueError, TypeError):
+        return None
+
+    if version != CACHE_VERSION or cached_signature != signature:
+        return None
+
+    return settings
+
+
+def _write_cache(cache_file, signature, settings):
+    if not cache_file:
+        return
+
+    try:
+        ensure_private_dir(path.dirname(cache_file))
+        atomic_write(cache_file, marshal.dumps((CACHE_VERSION, signature, settings)))
+    except (IOError, OSError, ValueError):
+        # not marshallable values (like yaml dates) or read-only project, just don't cache
+        pass
@@ -0,0 +1,102 @@
+"""
+Shared bits of stylist daemon client and server.
+
+Client and server talk over a per user unix socket using simple frames: one byte channel followed by four bytes
+payload length and the payload itself. Module is imported by the thin client, so it must stay free of any
+non-standard-library imports.
+"""
+import errno
+import os
+import socket
+import struct
+from os.path import dirname, expanduser, join
+
+import stylist
+
+STYLIST_DIR = join(expanduser('~'), '.stylist')
+SOCKET_PATH = join(STYLIST_DIR, 'daemon.sock')
+PID_FILE = join(STYLIST_DIR, 'daemon.pid')
+LOG_FILE = join(STYLIST_DIR, 'daemon.log')
+
+# client -> server
+REQUEST = b'A'
+STDIN = b'I'
+STDIN_EOF = b'D'
+SIGNAL = b'S'
+
+# server -> client
+STDOUT = b'O'
+STDERR = b'E'
+EXIT = b'X'
+BUSY = b'B'
+
+_HEADER = struct.Struct('!cI')
+
+
+class ConnectionClosed(Exception):
+    pass
+
+
+def send_frame(sock, channel, payload=b''):
+    sock.sendall(_HEADER.pack(channel, len(payload)) + payload)
+
+
+def recv_frame(sock):
+    """
+    :rtype: tuple
+    """
+    channel, length = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+
+    return channel, _recv_exactly(sock, length)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        try:
+            chunk = sock.recv(min(size, 65536))
+        except socket.error as e:
+            if e.args[0] == errno.EINTR:
+                continue
+            raise
+
+        if not chunk:
+            raise ConnectionClosed()
+
+        chunks.append(chunk)
+        size -= len(chunk)
+
+    return b''.join(chunks)
+
+
+def code_version():
+    """
+    Cheap marker of installed stylist version, lets running daemon notice that stylist has been upgraded
+    """
+    try:
+        return os.stat(join(dirname(stylist.__file__), 'cli.py')).st_mtime
+    except OSError:
+        return None
+
+
+def connect(path=SOCKET_PATH):
+    """
+    Connect to running daemon, return None when there is no daemon listening
+    :rtype: socket.socket
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except socket.error:
+        sock.close()
+        return None
+
+    return sock
+
+
+def read_pid():
+    try:
+        with open(PID_FILE) as f:
+            return int(f.read().strip())
+    except (IOError, ValueError):
+        return None
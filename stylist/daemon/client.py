@@ -0,0 +1,143 @@
+"""
+Thin `stylist` entry point forwarding invocation to running daemon, falls back to in-process execution when there
+is no daemon listening.
+"""
+import errno
+import json
+import os
+import select
+import signal
+import socket
+import sys
+
+from stylist import daemon
+from stylist import timing  # noqa: F401 imported early, starts the clock of startup timings
+
+# commands which are always executed in the calling process
+IN_PROCESS_COMMANDS = {
+    ('daemon',),
+    ('docker', 'enter'),
+    ('rds', 'credentials'),
+}
+
+
+def main():
+    code = forward(sys.argv[1:])
+
+    if code is None:
+        from stylist.cli import cli
+        cli()
+
+    sys.exit(code)
+
+
+def forward(argv):
+    """
+    Execute command in running daemon
+    :type argv list
+    :return: command exit code or None when command has to be executed in-process
+    """
+    if not _can_forward(argv):
+        return None
+
+    sock = daemon.connect()
+    if not sock:
+        return None
+
+    try:
+        daemon.send_frame(sock, daemon.REQUEST, json.dumps({
+            'argv': argv,
+            'cwd': os.getcwd(),
+            'env': _environment(),
+            'color': True if sys.stdout.isatty() else None,
+            'version': daemon.code_version()
+        }).encode('utf-8'))
+    except socket.error:
+        sock.close()
+        return None
+
+    try:
+        return _pump(sock)
+    except (socket.error, daemon.ConnectionClosed):
+        # command may have been already executed, so it can't be safely retried in-process
+        _write(2, b'Lost connection with stylist daemon\n')
+        return 1
+    except EnvironmentError as e:
+        if e.errno != errno.EPIPE:
+            raise
+
+        # reader of the output went away (e.g. piped to head), closing the connection stops the command
+        return 128 + signal.SIGPIPE
+    finally:
+        sock.close()
+
+
+def _can_forward(argv):
+    if os.environ.get('STYLIST_NO_DAEMON') or '_STYLIST_COMPLETE' in os.environ:
+        return False
+
+    args = tuple(a for a in argv if not a.startswith('-'))
+
+    return not any(args[:len(prefix)] == prefix for prefix in IN_PROCESS_COMMANDS)
+
+
+def _environment():
+    env = dict(os.environ)
+
+    if sys.stdout.isatty() and 'COLUMNS' not in env:
+        try:
+            import fcntl
+            import struct
+            import termios
+
+            rows, columns = struct.unpack('hh', fcntl.ioctl(1, termios.TIOCGWINSZ, '1234'))
+            env.update(COLUMNS=str(columns), LINES=str(rows))
+        except (ImportError, IOError):
+            pass
+
+    return env
+
+
+def _pump(sock):
+    signals = []
+    previous = signal.signal(signal.SIGINT, lambda signum, frame: signals.append(signum))
+
+    inputs = [sock, sys.stdin.fileno()]
+    try:
+        while True:
+            while signals:
+                daemon.send_frame(sock, daemon.SIGNAL, str(signals.pop(0)).encode('ascii'))
+
+            try:
+                readable, _, _ = select.select(inputs, [], [])
+            except select.error as e:
+                if e.args[0] == errno.EINTR:
+                    continue
+                raise
+
+            if sock in readable:
+                channel, payload = daemon.recv_frame(sock)
+
+                if channel == daemon.STDOUT:
+                    _write(1, payload)
+                elif channel == daemon.STDERR:
+                    _write(2, payload)
+                elif channel == daemon.EXIT:
+                    return int(payload)
+                elif channel == daemon.BUSY:
+                    return None
+
+            if len(inputs) > 1 and inputs[1] in readable:
+                data = os.read(inputs[1], 4096)
+                if data:
+                    daemon.send_frame(sock, daemon.STDIN, data)
+                else:
+                    daemon.send_frame(sock, daemon.STDIN_EOF)
+                    inputs.pop()
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+
+def _write(fd, data):
+    while data:
+        data = data[os.write(fd, data):]
@@ -0,0 +1,333 @@
+from __future__ import absolute_import
+
+import importlib
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from Queue import Empty, Queue
+
+import click
+
+from stylist import daemon
+from stylist.provider.aws_stats import stats
+from stylist.timing import tracer
+
+# warmed up when daemon starts, so first forwarded command doesn't pay for them
+PRELOAD_MODULES = (
+    'anyconfig', 'boto3', 'botocore.session', 'git', 'hcl', 'jinja2', 'pygments.formatters', 'pygments.lexers',
+    'terminaltables', 'yaml'
+)
+
+
+class Server(object):
+    """
+    Execute forwarded stylist commands inside long living process.
+
+    Commands are executed one at a time on the main thread with working directory, environment and standard streams
+    of the calling client, everything imported or cached by previous commands stays warm. Clients connecting while
+    another command is running are told that the daemon is busy and execute command on their own.
+    """
+
+    def __init__(self, path=daemon.SOCKET_PATH):
+        self.path = path
+        self.version = daemon.code_version()
+        self.running = False
+        self._busy = threading.Lock()
+        self._requests = Queue()
+        self._executing = False
+
+    def serve_forever(self):
+        from stylist.cli import cli
+
+        self.cli = cli
+        self._preload()
+
+        sock = self._listen()
+        self.running = True
+
+        signal.signal(signal.SIGINT, self._interrupt)
+
+        acceptor = threading.Thread(target=self._accept, args=(sock,))
+        acceptor.daemon = True
+        acceptor.start()
+
+        try:
+            while self.running:
+                try:
+                    conn = self._requests.get(timeout=1)
+                except Empty:
+                    continue
+                except KeyboardInterrupt:
+                    continue
+
+                try:
+                    self._handle(conn)
+                except (Exception, KeyboardInterrupt) as e:
+                    click.echo('Failed to handle request: {!r}'.format(e), err=True)
+                finally:
+                    try:
+                        self._busy.release()
+                    finally:
+                        conn.close()
+        finally:
+            self.running = False
+            sock.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def stop(self, *args):
+        self.running = False
+
+    def _interrupt(self, signum, frame):
+        """
+        Interrupt relayed by the client stops the command only, once it has finished late interrupts are ignored, so
+        they can't break cleanup of the request
+        """
+        if self._executing:
+            raise KeyboardInterrupt()
+
+    def _preload(self):
+        for name in self.cli.list_commands(None):
+            try:
+                self.cli.get_command(None, name)
+            except Exception:
+                pass
+
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+
+    def _listen(self):
+        if daemon.connect(self.path):
+            raise RuntimeError('Daemon is already listening on: {}'.format(self.path))
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        previous = os.umask(0o077)
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(self.path)
+            sock.listen(16)
+        finally:
+            os.umask(previous)
+
+        return sock
+
+    def _accept(self, sock):
+        while self.running:
+            try:
+                conn, _ = sock.accept()
+            except socket.error:
+                continue
+
+            if self._busy.acquire(False):
+                self._requests.put(conn)
+            else:
+                try:
+                    daemon.send_frame(conn, daemon.BUSY)
+                finally:
+                    conn.close()
+
+    def _handle(self, conn):
+        try:
+            channel, payload = daemon.recv_frame(conn)
+        except daemon.ConnectionClosed:
+            # liveness probe
+            return
+
+        if channel != daemon.REQUEST:
+            return
+
+        request = json.loads(payload.decode('utf-8'))
+
+        if request.get('version') != self.version:
+            # stylist has been upgraded, let the client run new code and go away
+            daemon.send_frame(conn, daemon.BUSY)
+            self.running = False
+            return
+
+        with _Invocation(conn, request['cwd'], request['env']) as invocation:
+            invocation.exit_code = self._run(request['argv'], request.get('color'))
+
+    def _run(self, argv, color):
+        tracer.reset()
+        stats.reset()
+
+        try:
+            self._executing = True
+            self.cli.main(args=argv, prog_name='stylist', color=color)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+
+            click.echo(e.code, err=True)
+            return 1
+        except KeyboardInterrupt:
+            return 130
+        except Exception:
+            traceback.print_exc()
+            return 1
+        finally:
+            self._executing = False
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+        return 0
+
+
+class _Invocation(object):
+    """
+    Run command in context of the client: working dir, environment and standard streams redirected to the socket
+    """
+
+    def __init__(self, conn, cwd, env):
+        self.conn = conn
+        self.cwd = cwd
+        self.env = env
+        self.exit_code = None
+        self._send_lock = threading.Lock()
+        self._closed = False
+
+    def __enter__(self):
+        self._saved_cwd = os.getcwd()
+        self._saved_env = dict(os.environ)
+        self._saved_fds = [os.dup(fd) for fd in (0, 1, 2)]
+        self._saved_stdin = sys.stdin
+
+        os.chdir(self.cwd)
+        os.environ.clear()
+        os.environ.update(self.env)
+        os.environ['STYLIST'] = "1"
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        stdin_r, self._stdin_w = os.pipe()
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+
+        for fd, target in ((stdin_r, 0), (stdout_w, 1), (stderr_w, 2)):
+            os.dup2(fd, target)
+            os.close(fd)
+
+        # fresh file object, so EOF of previous client doesn't stick to sys.stdin
+        sys.stdin = os.fdopen(os.dup(0), 'r')
+
+        self._threads = [
+            self._start(self._output, stdout_r, daemon.STDOUT),
+            self._start(self._output, stderr_r, daemon.STDERR),
+        ]
+        self._start(self._input)
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        sys.stdin.close()
+        sys.stdin = self._saved_stdin
+
+        for fd, saved in zip((0, 1, 2), self._saved_fds):
+            os.dup2(saved, fd)
+            os.close(saved)
+
+        for thread in self._threads:
+            thread.join(5)
+
+        os.environ.clear()
+        os.environ.update(self._saved_env)
+        os.chdir(self._saved_cwd)
+
+        # relay threads which are still running (output pipe inherited by a background process) are stopped by
+        # closing the channel, so nothing can be written after EXIT frame
+        if self.exit_code is not None:
+            self._send(daemon.EXIT, str(self.exit_code).encode('ascii'), last=True)
+
+    def _start(self, target, *args):
+        thread = threading.Thread(target=target, args=args)
+        thread.daemon = True
+        thread.start()
+
+        return thread
+
+    def _send(self, channel, payload=b'', last=False):
+        with self._send_lock:
+            if self._closed:
+                return
+
+            self._closed = last
+            daemon.send_frame(self.conn, channel, payload)
+
+    def _output(self, fd, channel):
+        try:
+            while True:
+                data = os.read(fd, 65536)
+                if not data:
+                    break
+
+                self._send(channel, data)
+        except (OSError, socket.error):
+            pass
+        finally:
+            os.close(fd)
+
+    def _input(self):
+        try:
+            while True:
+                channel, payload = daemon.recv_frame(self.conn)
+
+                if channel == daemon.STDIN:
+                    os.write(self._stdin_w, payload)
+                elif channel == daemon.STDIN_EOF:
+                    break
+                elif channel == daemon.SIGNAL:
+                    # deliver to daemon main thread and to all subprocesses started by the command
+                    os.killpg(os.getpgrp(), int(payload))
+        except (OSError, socket.error, daemon.ConnectionClosed):
+            pass
+        finally:
+            os.close(self._stdin_w)
+
+
+def daemonize(server):
+    """
+    Detach from terminal and run server in background, returns in the parent process only
+    """
+    if os.fork():
+        return
+
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+
+    os.chdir('/')
+
+    with open(os.devnull, 'r') as null, open(daemon.LOG_FILE, 'a') as log:
+        os.dup2(null.fileno(), 0)
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+
+    run(server)
+    os._exit(0)
+
+
+def run(server):
+    signal.signal(signal.SIGTERM, server.stop)
+
+    with open(daemon.PID_FILE, 'w') as f:
+        f.write(str(os.getpid()))
+
+    try:
+        click.echo('[{}] stylist daemon listening on: {}'.format(time.ctime(), server.path))
+        server.serve_forever()
+    finally:
+        if daemon.read_pid() == os.getpid():
+            os.unlink(daemon.PID_FILE)
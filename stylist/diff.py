@@ -0,0 +1,154 @@
+"""
+Non-interactive comparison of two flat sets of variables (SSM namespaces, tfvars files).
+
+Values are compared by digest, so plans can be saved and verified later without keeping destination values around.
+"""
+import hashlib
+import json
+
+import click
+
+from stylist.cache import atomic_write
+
+PLAN_VERSION = 1
+
+
+def digest(value):
+    if value is None:
+        return None
+
+    return hashlib.sha256(json.dumps(value, sort_keys=True)).hexdigest()
+
+
+class Diff(object):
+    def __init__(self, source, destination):
+        """
+        :type source dict
+        :type destination dict
+        """
+        self.source = source
+        self.destination = destination
+
+        self.added = sorted(k for k in source if k not in destination)
+        self.removed = sorted(k for k in destination if k not in source)
+        self.changed = sorted(k for k in source if k in destination and digest(source[k]) != digest(destination[k]))
+        self.identical = sorted(k for k in source if k in destination and k not in self.changed)
+
+    def has_changes(self, prune=False):
+        return bool(self.added or self.changed or (prune and self.removed))
+
+    def writes(self):
+        return {k: self.source[k] for k in self.added + self.changed}
+
+    def expected(self, prune=False):
+        """
+        Digests of destination values the plan has been made against, None for keys expected to be missing
+        """
+        keys = self.added + self.changed + (self.removed if prune else [])
+
+        return {k: digest(self.destination.get(k)) for k in keys}
+
+
+class PlanSection(object):
+    def __init__(self, kind, name, writes, deletes, expected, identical=0, kept=None):
+        """
+        :param kind: 'ssm' or 'tfvars'
+        :param name: namespace or tfvars file
+        :param writes: values to create or update
+        :param deletes: keys to delete
+        :param expected: digests of destination values at the time of planning
+        """
+        self.kind = kind
+        self.name = name
+        self.writes = writes
+        self.deletes = deletes
+        self.expected = expected
+        self.identical = identical
+        self.kept = kept or []
+
+    @classmethod
+    def from_diff(cls, kind, name, diff, prune=False):
+        """
+        :type diff Diff
+        """
+        return cls(kind, name, diff.writes(), diff.removed if prune else [], diff.expected(prune),
+                   len(diff.identical), [] if prune else diff.removed)
+
+    @property
+    def has_changes(self):
+        return bool(self.writes or self.deletes)
+
+    def drifted(self, destination):
+        """
+        Keys which changed in destination since the plan has been made
+        :type destination dict
+        """
+        return sorted(k for k, v in self.expected.items() if digest(destination.get(k)) != v)
+
+    def display(self):
+        click.secho('{} {}'.format(self.kind.upper(), self.name), fg='blue')
+
+        for name in sorted(self.writes):
+            if self.expected.get(name) is None:
+                click.secho('  + {}'.format(name), fg='green')
+            else:
+                click.secho('  ~ {}'.format(name), fg='yellow')
+
+        for name in sorted(self.deletes):
+            click.secho('  - {}'.format(name), fg='red')
+
+        for name in self.kept:
+            click.secho('  - {} (missing in source, kept; use --prune to delete)'.format(name), fg='white')
+
+        click.secho('  {} identical'.format(self.identical), fg='white')
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'name': self.name,
+            'writes': self.writes,
+            'deletes': self.deletes,
+            'expected': self.expected,
+            'identical': self.identical,
+            'kept': self.kept
+        }
+
+
+class Plan(object):
+    def __init__(self, source, destination, sections=None):
+        self.source = source
+        self.destination = destination
+        self.sections = sections or []
+
+    @property
+    def has_changes(self):
+        return any(section.has_changes for section in self.sections)
+
+    def display(self):
+        click.secho('Plan: {} -> {}'.format(self.source, self.destination), fg='blue')
+
+        for section in self.sections:
+            section.display()
+
+    def save(self, path):
+        """
+        Plan contains values to be written, so it's readable by the owner only
+        """
+        data = {
+            'version': PLAN_VERSION,
+            'source': self.source,
+            'destination': self.destination,
+            'sections': [section.to_dict() for section in self.sections]
+        }
+
+        atomic_write(path, json.dumps(data, indent=2), mode=0o600)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        if data.get('version') != PLAN_VERSION:
+            raise ValueError('Unsupported plan version: {}'.format(data.get('version')))
+
+        return cls(data['source'], data['destination'], [PlanSection(**s) for s in data['sections']])
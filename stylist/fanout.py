@@ -0,0 +1,119 @@
+"""
+Running read-only command body against every stage from `stylist.stages` at once.
+
+Each stage is queried in its own thread with clients of its own profile (see `AWSProvider.stage_profile`), results
+are merged into a single table with a stage column or compared key by key in a drift view.
+"""
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+
+from stylist.timing import span
+from stylist.utils import table
+
+MISSING = '-'
+
+
+class StageException(Exception):
+    def __init__(self, stage, error):
+        super(StageException, self).__init__('{}: {}'.format(stage, error))
+        self.stage = stage
+        self.error = error
+
+
+# stage of the local machine, it has no AWS profile nor infrastructure to compare
+LOCAL_STAGE = 'local'
+
+
+def get_stages(ctx):
+    """
+    Stages from `stylist.stages` which are deployed to AWS
+    :type ctx: stylist.cli.Context
+    :rtype: list
+    """
+    return [stage for stage in ctx.settings.get('stylist', {}).get('stages', []) if stage != LOCAL_STAGE]
+
+
+def fan_out(stages, func, max_workers=None):
+    """
+    Call func(stage) for every stage concurrently, at most max_workers (all stages by default) at once
+    :return: results keyed by stage (in order of stages) and StageException of each failed stage
+    :rtype: tuple
+    """
+    def run(stage):
+        with span('stage {}'.format(stage), 'fanout'):
+            return func(stage)
+
+    results = OrderedDict()
+    errors = []
+
+    if not stages:
+        return results, errors
+
+    with ThreadPoolExecutor(max_workers=min(max_workers or len(stages), len(stages))) as executor:
+        futures = [(stage, executor.submit(run, stage)) for stage in stages]
+
+        for stage, future in futures:
+            try:
+                results[stage] = future.result()
+            except Exception as e:
+                errors.append(StageException(stage, e))
+
+    return results, errors
+
+
+def merge_rows(results):
+    """
+    Rows of all stages with stage name as the first column
+    :param results: list of rows keyed by stage
+    :rtype: list
+    """
+    return [[stage] + list(row) for stage, rows in results.items() for row in rows]
+
+
+def drift(results):
+    """
+    Keys which are missing in some stage or have different value between stages, with value of every stage
+    :param results: dict of key -> value keyed by stage
+    :rtype: list
+    """
+    keys = set()
+    for values in results.values():
+        keys.update(values)
+
+    rows = []
+    for key in sorted(keys):
+        row = [values.get(key, MISSING) for values in results.values()]
+
+        if len(set(row)) > 1 or any(key not in values for values in results.values()):
+            rows.append([key] + row)
+
+    return rows
+
+
+def show_drift(title, results):
+    """
+    :param results: dict of key -> value keyed by stage
+    """
+    rows = drift(results)
+
+    if not rows:
+        click.secho('No differences between stages: {}'.format(', '.join(results.keys())), fg='green')
+        return
+
+    click.secho(table(title, rows, ['KEY'] + [stage.upper() for stage in results.keys()]).table)
+
+
+def report_errors(errors):
+    """
+    Stages which failed are reported after output of the successful ones, command fails if any stage failed
+    """
+    from stylist.cli import logger
+
+    for e in errors:
+        logger.error('Stage {}'.format(e))
+
+    if errors:
+        sys.exit(1)
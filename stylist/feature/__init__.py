@@ -3,21 +3,23 @@ import os
 import pkgutil
 import re
 import sys
-import tempfile
 from abc import abstractmethod, ABCMeta
-from os import mkdir
-from os.path import exists, join, dirname, abspath
+from os.path import join, dirname, abspath
 
 import click
-from git import Git, Repo
-from jinja2 import Environment, FileSystemLoader
 
-from stylist.wrapper.terraform import Terraform
+from stylist.cli import logger
+from stylist.helper.git_sync import DEFAULT_SYNC_INTERVAL, GitSyncException, sync_repository
+from stylist.helper.module_index import ModuleIndex
+from stylist.helper.templating import get_environment
+from stylist.wrapper.terraform import Terraform, TEMPLATES_CLONE_DIR, git_head
 
 
 class Templates(object):
     def __init__(self, ctx):
         self.ctx = ctx
+        self._module_index = None
+        self._synced = False
 
         self.terraform_modules_source = abspath(ctx.settings.get('terraform', {}).get(
             'templates',
@@ -27,23 +29,39 @@ class Templates(object):
         self.terraform_user_remote_source = \
             re.match('^https?://', self.terraform_modules_source) or self.terraform_modules_source.endswith('.git')
 
-        if self.terraform_user_remote_source:
-            self.terraform_local_modules_source = join(tempfile.gettempdir(), "stylist-templates")
-            self._init_repository(self.terraform_modules_source, self.terraform_local_modules_source)
-        else:
-            self.terraform_local_modules_source = self.terraform_modules_source
+        self.env = get_environment()
 
-        self.env = Environment(loader=FileSystemLoader([
-            join(dirname(__file__), '..', '..', 'templates', 'internal'),
-        ]))
-
-    def _init_repository(self, source, destination):
-        if not exists(destination):
-            mkdir(destination)
-            Git().clone(source, destination)
+    @property
+    def terraform_local_modules_source(self):
+        """
+        Local directory with modules, remote templates are synchronised on first use
+        """
+        if not self.terraform_user_remote_source:
+            return self.terraform_modules_source
+
+        if not self._synced:
+            interval = self.ctx.settings.get('terraform', {}).get('templates_sync_interval', DEFAULT_SYNC_INTERVAL)
+            try:
+                sync_repository(self.terraform_modules_source, TEMPLATES_CLONE_DIR, interval,
+                                force=getattr(self.ctx, 'no_cache', False))
+            except GitSyncException as e:
+                logger.error(e.message)
+                sys.exit(1)
+
+            self._synced = True
+
+        return TEMPLATES_CLONE_DIR
 
-        repo = Repo(destination)
-        repo.remote("origin").pull()
+    @property
+    def module_index(self):
+        """
+        :rtype: stylist.helper.module_index.ModuleIndex
+        """
+        if self._module_index is None:
+            revision = git_head(self.terraform_local_modules_source) if self.terraform_user_remote_source else None
+            self._module_index = ModuleIndex(self.terraform_local_modules_source, revision)
+
+        return self._module_index
 
     def get_template(self, name):
         return self.env.get_template(name)
@@ -0,0 +1,88 @@
+"""
+Keeping local checkout of remote git repository (terraform templates) up to date without touching the network on
+every command.
+
+Repository is cloned shallow with a single branch and updated at most once per interval by fetching the latest
+commit and resetting checkout to it. Concurrent stylist processes are serialised with a lock file next to the
+checkout. When the remote can't be reached the last good checkout is used.
+"""
+import os
+import shutil
+import tempfile
+import time
+from os.path import basename, dirname, getmtime, isdir, join
+
+import click
+
+from stylist.cache import file_lock
+from stylist.lazy import lazy_import
+
+git = lazy_import('git')
+
+DEFAULT_SYNC_INTERVAL = 3600
+
+SYNC_STAMP = 'stylist-sync'
+
+
+class GitSyncException(Exception):
+    pass
+
+
+def sync_repository(source, destination, interval=DEFAULT_SYNC_INTERVAL, force=False):
+    """
+    Clone source into destination, or update existing checkout when it's older than interval seconds
+    :return: True when repository has been cloned or updated
+    """
+    with file_lock(destination + '.lock'):
+        stamp = join(destination, '.git', SYNC_STAMP)
+
+        if not isdir(join(destination, '.git')):
+            _clone(source, destination)
+        elif force or _age(stamp) >= interval:
+            try:
+                _update(destination)
+            except Exception as e:
+                click.secho('Unable to update templates from {}, using last checkout: {}'.format(
+                    source, getattr(e, 'stderr', None) or e
+                ), fg='yellow', err=True)
+                return False
+        else:
+            return False
+
+        with open(stamp, 'w') as f:
+            f.write(str(int(time.time())))
+
+        return True
+
+
+def _age(path):
+    try:
+        return time.time() - getmtime(path)
+    except OSError:
+        return float('inf')
+
+
+def _clone(source, destination):
+    """
+    Clone into temporary directory next to destination, so failed clone never leaves broken checkout behind
+    """
+    tmp = tempfile.mkdtemp(prefix='.{}-'.format(basename(destination)), dir=dirname(destination))
+
+    try:
+        git.Git().clone(source, tmp, depth=1, single_branch=True, no_tags=True)
+
+        if isdir(destination):
+            shutil.rmtree(destination)
+        os.rename(tmp, destination)
+    except Exception as e:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise GitSyncException('Unable to clone templates from {}: {}'.format(source, getattr(e, 'stderr', None) or e))
+
+
+def _update(destination):
+    """
+    Checkout is a cache only, so it's moved to the latest remote commit instead of being merged
+    """
+    repo = git.Git(destination)
+    repo.fetch('origin', depth=1, no_tags=True)
+    repo.reset('--hard', 'FETCH_HEAD')
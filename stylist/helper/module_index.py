@@ -0,0 +1,112 @@
+"""
+Persistent index of terraform modules in templates directory: description and variables of every module.
+
+Index is kept in ~/.stylist/cache/modules and rebuilt incrementally, only modules whose *.tf files changed (by mtime
+and size) are parsed again. When templates come from git repository and its commit didn't change, files aren't
+even checked.
+"""
+import hashlib
+from collections import OrderedDict
+from glob import glob
+from os.path import basename, isdir, join
+
+from stylist.cache import read_json, stat_signature, user_cache_path, write_json
+from stylist.lazy import lazy_import
+
+hcl = lazy_import('hcl')
+
+INDEX_VERSION = 1
+DESCRIPTION_PREFIX = '## Desc:'
+
+
+class ModuleIndex(object):
+    def __init__(self, source_dir, revision=None):
+        """
+        :param source_dir: local directory with modules, one module per subdirectory
+        :param revision: commit of templates repository, None for local templates
+        """
+        self.source_dir = source_dir
+        self.revision = revision
+        self._modules = None
+
+    @property
+    def path(self):
+        return user_cache_path('modules', hashlib.sha1(self.source_dir).hexdigest() + '.json')
+
+    @property
+    def modules(self):
+        """
+        Modules keyed by name, sorted by name
+        :rtype: OrderedDict
+        """
+        if self._modules is None:
+            self._modules = self._load()
+
+        return self._modules
+
+    def get(self, name):
+        return self.modules.get(name)
+
+    def descriptions(self):
+        return OrderedDict((name, module['description']) for name, module in self.modules.items())
+
+    def _load(self):
+        index = read_json(self.path) or {}
+        cached = index.get('modules', {}) if index.get('version') == INDEX_VERSION else {}
+
+        if self.revision and index.get('revision') == self.revision and cached:
+            return OrderedDict(sorted(cached.items()))
+
+        modules = OrderedDict()
+        changed = False
+        for module_dir in sorted(glob(join(self.source_dir, '*'))):
+            if not isdir(module_dir):
+                continue
+
+            name = basename(module_dir)
+            signature = stat_signature(sorted(glob(join(module_dir, '*.tf'))))
+
+            entry = cached.get(name)
+            if not entry or entry.get('signature') != signature:
+                entry = _index_module(module_dir, signature)
+                changed = True
+
+            modules[name] = entry
+
+        if changed or set(cached) != set(modules) or index.get('revision') != self.revision:
+            write_json(self.path, {'version': INDEX_VERSION, 'revision': self.revision, 'modules': modules})
+
+        return modules
+
+
+def _index_module(module_dir, signature):
+    """
+    :param signature: signature of *.tf files of the module, list of [path, mtime, size]
+    """
+    variables = []
+    for tf_file, _, _ in signature:
+        try:
+            with open(tf_file, 'r') as f:
+                defined = hcl.load(f).get('variable') or {}
+        except Exception:
+            continue
+
+        for name, config in defined.items():
+            variables.append([name, (config or {}).get('default')])
+
+    return {
+        'source': module_dir,
+        'description': _description(join(module_dir, 'module.tf')),
+        'variables': variables,
+        'signature': signature
+    }
+
+
+def _description(path):
+    try:
+        with open(path, 'r') as f:
+            line = f.readline().strip()
+    except IOError:
+        return ''
+
+    return line.replace(DESCRIPTION_PREFIX, '') if line.startswith(DESCRIPTION_PREFIX) else ''
@@ -132,7 +132,7 @@ class DbContext(object):
         raise NotSupportedEngineException()
 
     def get_instance_type(self, instance):
-        rds = self.ctx.provider.session.client('rds')
+        rds = self.ctx.provider.client('rds')
         db_instance = rds.describe_db_instances(DBInstanceIdentifier=instance)
 
         return next(iter(db_instance.get('DBInstances') or []), {}).get('Engine')
@@ -0,0 +1,58 @@
+"""
+Single jinja2 environment for stylist's internal templates (templates/internal), shared by all features and terraform.
+
+Compiled templates are kept in memory for the life of the process (or daemon) and their bytecode in
+~/.stylist/cache/jinja, so following commands only load it instead of parsing template sources again. Bytecode is
+keyed by template source checksum, changed templates are compiled again.
+"""
+import threading
+from os.path import abspath, dirname, join
+
+from stylist.cache import ensure_dir, user_cache_path
+from stylist.lazy import lazy_import
+
+jinja2 = lazy_import('jinja2')
+
+INTERNAL_TEMPLATES_DIR = abspath(join(dirname(__file__), '..', '..', 'templates', 'internal'))
+
+_environment = None
+_rendered = {}
+_lock = threading.Lock()
+
+
+def get_environment():
+    """
+    :rtype: jinja2.Environment
+    """
+    global _environment
+
+    with _lock:
+        if _environment is None:
+            _environment = jinja2.Environment(
+                loader=jinja2.FileSystemLoader([INTERNAL_TEMPLATES_DIR]),
+                bytecode_cache=_bytecode_cache()
+            )
+
+        return _environment
+
+
+def render_string(source):
+    """
+    Render static template given as a string, result is computed once per process
+    """
+    with _lock:
+        if source not in _rendered:
+            _rendered[source] = jinja2.Template(source).render()
+
+        return _rendered[source]
+
+
+def _bytecode_cache():
+    directory = user_cache_path('jinja')
+    try:
+        ensure_dir(directory)
+    except OSError:
+        # cache is an optimisation only, read only home directory can't break the command
+        return None
+
+    return jinja2.FileSystemBytecodeCache(directory)
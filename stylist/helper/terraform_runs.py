@@ -0,0 +1,212 @@
+"""
+Analysis of terraform plans and applies.
+
+Plans are summarised from `terraform show -json` grouped by module. Applies are timed per resource from the
+"<address>: Creation complete after 1m2s" lines terraform prints for every resource, each apply is kept as a json
+file in terraform/.stylist-runs/ so slow resources can be compared across runs.
+"""
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from glob import glob
+from os.path import basename, join
+
+import click
+
+from stylist.cache import atomic_write, ensure_private_dir, read_json
+
+RUNS_DIR = '.stylist-runs'
+HISTORY_SIZE = 50
+
+ACTIONS = {
+    'create': ('+', 'green'),
+    'update': ('~', 'yellow'),
+    'replace': ('-/+', 'yellow'),
+    'delete': ('-', 'red'),
+}
+
+_ANSI = re.compile(r'\x1b\[[0-9;]*m')
+_COMPLETE = re.compile(
+    r'^(?P<address>\S+): (?P<action>Creation|Modifications|Destruction) complete after (?P<elapsed>(\d+[hms])+)'
+)
+_ACTION_NAMES = {'Creation': 'create', 'Modifications': 'update', 'Destruction': 'delete'}
+
+
+def _action(actions):
+    if 'create' in actions and 'delete' in actions:
+        return 'replace'
+
+    for action in ('create', 'update', 'delete'):
+        if action in actions:
+            return action
+
+    return None
+
+
+def plan_summary(plan):
+    """
+    Resources changed by plan grouped by module, root module is listed as "root"
+    :param plan: output of `terraform show -json <plan>`
+    :return: module -> dict with add, change, destroy counts and list of (action, address)
+    :rtype: OrderedDict
+    """
+    modules = OrderedDict()
+    resources = sorted(plan.get('resource_changes') or [],
+                       key=lambda r: (r.get('module_address') or '', r.get('address')))
+
+    for resource in resources:
+        action = _action(resource.get('change', {}).get('actions', []))
+        if not action:
+            continue
+
+        module = modules.setdefault(resource.get('module_address') or 'root',
+                                    {'add': 0, 'change': 0, 'destroy': 0, 'resources': []})
+
+        # replacement counts as one add and one destroy, same as in terraform plan summary
+        module['add'] += action in ('create', 'replace')
+        module['change'] += action == 'update'
+        module['destroy'] += action in ('delete', 'replace')
+        module['resources'].append((action, resource.get('address')))
+
+    return modules
+
+
+def totals(summary):
+    """
+    :rtype: dict
+    """
+    counts = {'add': 0, 'change': 0, 'destroy': 0}
+    for module in summary.values():
+        for key in counts:
+            counts[key] += module[key]
+
+    return counts
+
+
+def has_changes(summary):
+    return any(module['resources'] for module in summary.values())
+
+
+def display_summary(summary):
+    if not has_changes(summary):
+        click.secho('No changes', fg='green')
+        return
+
+    for name, module in summary.items():
+        click.secho('{} ({} to add, {} to change, {} to destroy)'.format(
+            name, module['add'], module['change'], module['destroy']
+        ), fg='blue')
+
+        for action, address in module['resources']:
+            symbol, colour = ACTIONS[action]
+            click.secho('  {:>3} {}'.format(symbol, address), fg=colour)
+
+    click.secho('Plan: {add} to add, {change} to change, {destroy} to destroy.'.format(**totals(summary)), fg='blue')
+
+
+def parse_duration(text):
+    """
+    Seconds in terraform duration like 1h2m3s
+    :rtype: int
+    """
+    units = {'h': 3600, 'm': 60, 's': 1}
+
+    return sum(int(value) * units[unit] for value, unit in re.findall(r'(\d+)([hms])', text))
+
+
+class ApplyRecorder(object):
+    """
+    Collects duration of every resource from apply output, fed line by line
+    """
+
+    def __init__(self):
+        self.resources = OrderedDict()
+
+    def feed(self, line):
+        match = _COMPLETE.match(_ANSI.sub('', line).strip())
+        if match:
+            self.resources[match.group('address')] = {
+                'action': _ACTION_NAMES[match.group('action')],
+                'seconds': parse_duration(match.group('elapsed'))
+            }
+
+
+class RunHistory(object):
+    def __init__(self, terraform_dir):
+        self.path = join(terraform_dir, RUNS_DIR)
+
+    def record(self, stage, started, finished, exit_code, resources, summary=None):
+        run = {
+            'stage': stage,
+            'started': started,
+            'duration': finished - started,
+            'exit_code': exit_code,
+            'changes': totals(summary) if summary is not None else None,
+            'resources': resources
+        }
+
+        name = '{}-{}.json'.format(time.strftime('%Y%m%dT%H%M%S', time.localtime(started)), stage)
+        ensure_private_dir(self.path)
+        atomic_write(join(self.path, name), json.dumps(run, indent=2))
+        self._prune()
+
+        return run
+
+    def runs(self, stage=None):
+        """
+        Recorded applies, oldest first
+        :rtype: list
+        """
+        runs = []
+        for path in sorted(glob(join(self.path, '*.json'))):
+            run = read_json(path)
+            if run and (stage is None or run.get('stage') == stage):
+                runs.append(run)
+
+        return sorted(runs, key=lambda r: r.get('started'))
+
+    def slowest(self, stage=None, limit=10):
+        """
+        Slowest resources of the latest apply with their duration across previous applies
+        :return: rows of address, action, last duration, average, maximum and number of previous runs, trend
+        :rtype: list
+        """
+        runs = self.runs(stage)
+        if not runs:
+            return []
+
+        last = runs[-1]
+        rows = []
+        for address, resource in last.get('resources', {}).items():
+            previous = [r['resources'][address]['seconds'] for r in runs[:-1] if address in r.get('resources', {})]
+            average = float(sum(previous)) / len(previous) if previous else None
+
+            rows.append([
+                address,
+                resource['action'],
+                resource['seconds'],
+                '{:.1f}'.format(average) if average is not None else '-',
+                max(previous) if previous else '-',
+                len(previous),
+                _trend(resource['seconds'], average)
+            ])
+
+        return sorted(rows, key=lambda r: -r[2])[:limit]
+
+    def _prune(self):
+        files = sorted(glob(join(self.path, '*.json')), key=basename)
+
+        for path in files[:-HISTORY_SIZE]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _trend(seconds, average):
+    if not average:
+        return '-'
+
+    return '{:+.0f}%'.format((seconds - average) * 100 / average)
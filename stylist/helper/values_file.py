@@ -0,0 +1,136 @@
+"""
+Reading and writing flat name -> value mappings as dotenv, json or yaml files.
+
+Writers consume an iterable of (name, value) pairs and write each pair as soon as it arrives.
+"""
+import json
+import re
+from collections import OrderedDict
+
+import yaml
+
+FORMATS = ('dotenv', 'json', 'yaml')
+
+_SAFE_VALUE = re.compile(r'^[\w@%+=:,./-]*$')
+_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'}
+_UNESCAPES = {v[1]: k for k, v in _ESCAPES.items()}
+
+
+class ValuesFileException(Exception):
+    pass
+
+
+def detect_format(path, default='dotenv'):
+    path = (path or '').lower()
+
+    if path.endswith('.json'):
+        return 'json'
+
+    if path.endswith('.yml') or path.endswith('.yaml'):
+        return 'yaml'
+
+    return default
+
+
+def read_values(f, fmt):
+    """
+    :type f file
+    :rtype: OrderedDict
+    """
+    if fmt == 'dotenv':
+        values = OrderedDict(_read_dotenv(f))
+    elif fmt == 'json':
+        values = json.load(f, object_pairs_hook=OrderedDict)
+    else:
+        values = yaml.safe_load(f)
+
+    if not isinstance(values, dict):
+        raise ValuesFileException('File has to contain a mapping of names to values')
+
+    for name, value in values.items():
+        if isinstance(value, (dict, list)):
+            raise ValuesFileException('Value of "{}" has to be a scalar'.format(name))
+
+        values[name] = _to_string(value)
+
+    return values
+
+
+def write_values(f, fmt, pairs):
+    """
+    :type f file
+    :param pairs: iterable of (name, value)
+    :return: number of written values
+    """
+    return {'dotenv': _write_dotenv, 'json': _write_json, 'yaml': _write_yaml}[fmt](f, pairs)
+
+
+def _to_string(value):
+    """
+    Values are compared with unicode values from SSM, so files are decoded as UTF-8
+    """
+    if value is None:
+        return ''
+
+    if isinstance(value, str):
+        return value.decode('utf-8')
+
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+
+    return value if isinstance(value, basestring) else str(value)
+
+
+def _read_dotenv(f):
+    for number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        if line.startswith('export '):
+            line = line[len('export '):]
+
+        if '=' not in line:
+            raise ValuesFileException('Invalid line {}: {}'.format(number, line))
+
+        name, value = line.split('=', 1)
+        value = value.strip()
+
+        if len(value) > 1 and value[0] == value[-1] == '"':
+            value = re.sub(r'\\(.)', lambda m: _UNESCAPES.get(m.group(1), m.group(1)), value[1:-1])
+        elif len(value) > 1 and value[0] == value[-1] == "'":
+            value = value[1:-1]
+
+        yield name.strip(), value
+
+
+def _write_dotenv(f, pairs):
+    count = 0
+    for name, value in pairs:
+        if not _SAFE_VALUE.match(value):
+            value = u'"{}"'.format(u''.join(_ESCAPES.get(c, c) for c in value))
+
+        f.write(u'{}={}\n'.format(name, value).encode('utf-8'))
+        count += 1
+
+    return count
+
+
+def _write_json(f, pairs):
+    count = 0
+    f.write('{')
+    for name, value in pairs:
+        f.write('{}\n  {}: {}'.format(',' if count else '', json.dumps(name), json.dumps(value)))
+        count += 1
+    f.write('\n}\n')
+
+    return count
+
+
+def _write_yaml(f, pairs):
+    count = 0
+    for name, value in pairs:
+        f.write(yaml.safe_dump({name: value}, default_flow_style=False, allow_unicode=True, encoding='utf-8'))
+        count += 1
+
+    return count
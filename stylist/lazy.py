@@ -0,0 +1,39 @@
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module which is imported on first attribute access.
+
+    Heavy dependencies (boto3, GitPython, jinja2, pygments...) are referenced through lazy modules, so commands which
+    never touch them don't pay for their import at startup.
+    """
+
+    def __init__(self, name):
+        super(LazyModule, self).__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_lazy_module'] = module
+
+        return module
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __repr__(self):
+        return "<lazy module '{}'>".format(self.__name__)
+
+
+def lazy_import(name):
+    """
+    Return already imported module or lazy proxy which will import it when used for the first time
+    :type name str
+    :rtype: types.ModuleType
+    """
+    return sys.modules.get(name) or LazyModule(name)
@@ -0,0 +1,112 @@
+import re
+from os.path import isdir, isfile, join, normpath
+
+from stylist.cache import read_json, stat_signature, write_json
+
+_SECTION = re.compile(r'^\[\s*([^\s\]"]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+_VARIABLE = re.compile(r'^([A-Za-z][A-Za-z0-9-]*)\s*(?:=\s*(.*))?$')
+
+
+def find_git_config(working_dir):
+    """
+    Locate config file of git repository checked out in working_dir.
+
+    Besides regular repositories handles `.git` files with `gitdir:` pointer used by worktrees (config is shared
+    through `commondir`) and submodules.
+    :rtype: str
+    """
+    git_path = join(working_dir, '.git')
+
+    if isdir(git_path):
+        return join(git_path, 'config')
+
+    if not isfile(git_path):
+        return None
+
+    with open(git_path, 'r') as f:
+        pointer = f.readline().strip()
+
+    if not pointer.startswith('gitdir:'):
+        return None
+
+    git_dir = normpath(join(working_dir, pointer[len('gitdir:'):].strip()))
+
+    commondir_file = join(git_dir, 'commondir')
+    if isfile(commondir_file):
+        with open(commondir_file, 'r') as f:
+            git_dir = normpath(join(git_dir, f.read().strip()))
+
+    return join(git_dir, 'config')
+
+
+def read_remote_url(config_path, remote='origin'):
+    """
+    Read url of named remote straight from git config file
+    :rtype: str
+    """
+    section = None
+
+    try:
+        with open(config_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line[0] in '#;':
+                    continue
+
+                match = _SECTION.match(line)
+                if match:
+                    name, subsection = match.groups()
+                    if subsection is None and '.' in name:
+                        # deprecated [remote.origin] syntax
+                        name, subsection = name.split('.', 1)
+
+                    section = (name.lower(), subsection)
+                    continue
+
+                match = _VARIABLE.match(line)
+                if match and section == ('remote', remote) and match.group(1).lower() == 'url':
+                    return _parse_value(match.group(2) or '')
+    except IOError:
+        return None
+
+    return None
+
+
+def _parse_value(value):
+    if value.startswith('"'):
+        return value[1:value.find('"', 1)] if '"' in value[1:] else value[1:]
+
+    return re.split(r'\s[#;]', value, 1)[0].strip()
+
+
+def apply_exclusions(name, exclusions):
+    for _rep in exclusions or []:
+        name = name.replace(_rep, '')
+
+    return name
+
+
+def project_name(working_dir, exclusions=None, cache_file=None):
+    """
+    Derive project name from origin url of git repository in working_dir.
+
+    Resolved name is memoised in cache_file against git config mtime and given exclusions.
+    :rtype: str
+    """
+    config_path = find_git_config(working_dir)
+    if not config_path:
+        return None
+
+    signature = [stat_signature([config_path]), list(exclusions or [])]
+
+    cached = read_json(cache_file, {}) if cache_file else {}
+    if cached.get('signature') == signature:
+        return cached.get('name')
+
+    url = read_remote_url(config_path)
+    name = apply_exclusions(url.split('/')[-1].replace(".git", ''), exclusions) if url else None
+
+    if cache_file:
+        write_json(cache_file, {'signature': signature, 'name': name})
+
+    return name
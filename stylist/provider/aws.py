@@ -1,35 +1,248 @@
+import hashlib
 import os
+import threading
+import time
 from ConfigParser import ConfigParser
+from concurrent.futures import ThreadPoolExecutor
 
-import boto3
 from threads_aws_utils import SSM as BaseSSM
 
-from stylist.provider import Provider
-from stylist.utils import compare_dicts
+from stylist.cache import read_json, stat_signature, user_cache_path, write_json
+from stylist.diff import Diff
+from stylist.lazy import lazy_import
+from stylist.provider import Provider, aws_stats
+from stylist.provider.ssm_cache import ParameterCache, fingerprint
+from stylist.provider.throttling import TokenBucket, call_with_backoff
+from stylist.timing import span, tracer
+
+boto3 = lazy_import('boto3')
+botocore_config = lazy_import('botocore.config')
+
+DEFAULT_MAX_POOL_CONNECTIONS = 10
+DEFAULT_IDENTITY_TTL = 86400
+DEFAULT_KMS_KEY_TTL = 86400
+DEFAULT_CONTEXT_TTL = 3600
+# PutParameter calls per second, parameter store throttles sustained higher rates
+DEFAULT_SSM_WRITE_RATE = 5
+
+PARAMETER_STORE_KEY_ALIAS = 'alias/parameter_store_key'
+
+# GetParameters accepts at most 10 names
+SSM_BATCH_SIZE = 10
+SSM_WORKERS = 8
+CONTEXT_WORKERS = 8
+
+IDENTITY_CACHE_FILE = user_cache_path('identity.json')
+KMS_KEY_CACHE_FILE = user_cache_path('kms-keys.json')
+CONTEXT_CACHE_FILE = user_cache_path('terraform-context.json')
+
+# sessions and clients outlive single command when running inside stylist daemon
+_sessions = {}
+_clients = {}
+_pool_lock = threading.RLock()
+_kms_keys = {}
+
+# service models and endpoints are loaded once and shared by all sessions
+_SHARED_COMPONENTS = ('data_loader', 'endpoint_resolver')
+_components = {}
+
+
+def _credentials_signature():
+    """
+    Sessions are reused only as long as nothing which could change resolved credentials has changed
+    """
+    files = [
+        os.environ.get('AWS_SHARED_CREDENTIALS_FILE', os.path.expanduser('~/.aws/credentials')),
+        os.environ.get('AWS_CONFIG_FILE', os.path.expanduser('~/.aws/config'))
+    ]
+    env = sorted((k, v) for k, v in os.environ.items() if k.startswith('AWS_'))
+
+    return repr((stat_signature(files), env))
+
+
+def _cached(cache_file, key, ttl, fetch, signature=None, refresh=False):
+    """
+    Value stored under key in json cache file, fetched and stored again when missing, expired, signature doesn't
+    match or refresh is requested. None values are never cached.
+    """
+    now = time.time()
+
+    entry = {} if refresh else read_json(cache_file, {}).get(key) or {}
+    if 'value' in entry and entry.get('signature') == signature and entry.get('expires', 0) > now:
+        return entry['value']
+
+    value = fetch()
+
+    if value is not None:
+        # re-read, so entries written meanwhile by parallel commands are kept
+        cached = read_json(cache_file, {})
+        cached[key] = {'signature': signature, 'expires': now + ttl, 'value': value}
+        write_json(cache_file, cached)
+
+    return value
+
+
+def _forget(cache_file, key):
+    cached = read_json(cache_file, {})
+    if cached.pop(key, None) is not None:
+        write_json(cache_file, cached)
+
+
+def _after_call(**kwargs):
+    call = aws_stats.after_call(**kwargs)
+    if call:
+        tracer.record('{}.{}'.format(call.service, call.operation), 'aws', call.start, call.start + call.duration)
+
+
+def _direct_child(namespace, name):
+    """
+    Parameter is right in the namespace, not in one of its sub-paths
+    """
+    return '/' not in name[len(namespace):].lstrip('/')
+
+
+def _share_components(botocore_session):
+    for name in _SHARED_COMPONENTS:
+        if name in _components:
+            botocore_session.register_component(name, _components[name])
+        else:
+            _components[name] = botocore_session.get_component(name)
 
 
 class SSM(BaseSSM):
-    def __init__(self, ssm, ctx):
+    def __init__(self, ssm, ctx, profile=None):
         super(SSM, self).__init__(ssm)
         self.ctx = ctx
+        self.profile = profile
+        self._cache = None
+
+    @property
+    def cache(self):
+        """
+        Local cache of parameter values, enabled with `aws.ssm_cache_ttl` and bypassed with `--no-cache`
+        :rtype: ParameterCache
+        """
+        if self._cache is None:
+            ttl = 0 if self.ctx.no_cache else self.ctx.provider.aws_setting('ssm_cache_ttl', 0)
+            self._cache = ParameterCache(self.profile or self.ctx.provider.profile, self.ssm.meta.region_name, ttl)
+
+        return self._cache
 
     def get_full_parameters(self, *args, **kwargs):
+        """
+        Name, type, value and modification details of every parameter in given namespaces
+        :rtype: list
+        """
+        env = kwargs.get('env', False)
+
         _all = []
-        for resource in list(args):
-            _all += self._fetch_all_parameters(resource, kwargs.get('env', False))
+        for namespace, parameters, values in self.fetch_namespaces(args):
+            _all += self._full_rows(namespace, parameters, values, env)
 
         return _all
 
     def get_short_parameters(self, *args, **kwargs):
-        kwargs['env'] = False
-        kwargs['exclude_namespace'] = True
-        params = self.get_parameters(*args, **kwargs)
+        """
+        Values of all parameters in given namespaces keyed by name without namespace
+        :rtype: dict
+        """
+        params = {}
+        for values in self.namespace_values(args):
+            params.update(values)
 
         return params
 
-    def _fetch_all_parameters(self, resource, env=False):
+    def fetch_namespaces(self, resources):
+        """
+        Generate namespace, parameters metadata and values (keyed by full name) for each resource, in order.
+
+        Namespaces are listed concurrently, values are fetched in batches as soon as each page of the listing
+        arrives, values which didn't change since they have been cached aren't fetched at all.
+        """
+        with ThreadPoolExecutor(max_workers=SSM_WORKERS) as executor:
+            listings = [executor.submit(self._describe_namespace, resource, executor) for resource in resources]
+
+            for listing in listings:
+                namespace, parameters, values, batches, stale = listing.result()
+
+                for batch in batches:
+                    values.update(batch.result())
+
+                if stale:
+                    self.cache.store(namespace, parameters, values)
+
+                yield namespace, parameters, values
+
+    def _describe_namespace(self, resource, executor):
+        """
+        Page through parameters of namespace and schedule fetching of values which aren't cached, doesn't wait for
+        the values so it never blocks a worker of the executor
+        """
         namespace = self._resolve_namespace(resource)
-        parameters = self.ssm.describe_parameters(
+        cached = self.cache.load(namespace)
+
+        parameters = []
+        values = {}
+        batches = []
+        for page in self._describe_pages(namespace):
+            names = []
+            for param in page.get('Parameters', []):
+                entry = cached.get(param.get('Name'))
+
+                if entry and entry.get('fingerprint') == fingerprint(param):
+                    values[param.get('Name')] = {'Name': param.get('Name'), 'Type': entry.get('Type'),
+                                                 'Value': entry.get('Value')}
+                else:
+                    names.append(param.get('Name'))
+
+            parameters += page.get('Parameters', [])
+
+            for i in range(0, len(names), SSM_BATCH_SIZE):
+                batches.append(executor.submit(self._get_values, names[i:i + SSM_BATCH_SIZE]))
+
+        # cache is rewritten only when some value has been fetched or parameter removed
+        stale = bool(batches) or len(cached) != len(values)
+
+        return namespace, parameters, values, batches, stale
+
+    def iter_parameters(self, resource):
+        """
+        Generate name (without namespace) and value of every parameter in namespace page by page, values of the
+        next page are fetched while the previous one is being consumed
+        """
+        namespace = self._resolve_namespace(resource)
+
+        with ThreadPoolExecutor(max_workers=SSM_WORKERS) as executor:
+            previous = None
+            for page in self._describe_pages(namespace):
+                names = [param.get('Name') for param in page.get('Parameters', [])]
+                current = (names, [
+                    executor.submit(self._get_values, names[i:i + SSM_BATCH_SIZE])
+                    for i in range(0, len(names), SSM_BATCH_SIZE)
+                ])
+
+                if previous:
+                    for item in self._page_values(namespace, *previous):
+                        yield item
+
+                previous = current
+
+            if previous:
+                for item in self._page_values(namespace, *previous):
+                    yield item
+
+    @staticmethod
+    def _page_values(namespace, names, batches):
+        values = {}
+        for batch in batches:
+            values.update(batch.result())
+
+        for name in names:
+            if name in values:
+                yield SSM.normalize_name(namespace, name, False, True), values[name].get('Value')
+
+    def _describe_pages(self, namespace):
+        return self.ssm.get_paginator('describe_parameters').paginate(
             ParameterFilters=[
                 {
                     'Key': 'Name',
@@ -39,13 +252,18 @@ class SSM(BaseSSM):
                     ]
                 },
             ],
-            MaxResults=50
+            PaginationConfig={'PageSize': 50}
         )
 
-        values = self.get_parameters(resource, env=False, full=True)
+    def _get_values(self, names):
+        response = self.ssm.get_parameters(Names=names, WithDecryption=True)
 
+        return {param.get('Name'): param for param in response.get('Parameters', [])}
+
+    @staticmethod
+    def _full_rows(namespace, parameters, values, env):
         params = []
-        for param in parameters.get('Parameters', []):
+        for param in parameters:
             params.append([
                 SSM.normalize_name(namespace, param.get('Name'), env, False),
                 values.get(param.get('Name'), {}).get('Type'),
@@ -56,22 +274,47 @@ class SSM(BaseSSM):
 
         return params
 
-    def write(self, namespace, parameter, value, encrypt=True, session=None, tags=None):
-        kms = (session or self.ctx.provider.session).client("kms")
+    def write(self, namespace, parameter, value, encrypt=True, profile=None, tags=None):
+        return self._put(namespace, parameter, value, self._write_key(encrypt, profile), tags)
 
-        key_id = None
-        if encrypt:
-            aliases = kms.list_aliases()
+    def write_many(self, namespace, values, encrypt=True, profile=None, tags=None):
+        """
+        Write parameters concurrently, rate limited to stay below PutParameter limits.
 
-            key_id = (next(iter(filter(
-                lambda x: x.get('AliasName') == 'alias/parameter_store_key',
-                aliases.get('Aliases', {})
-            ))) or {}).get('TargetKeyId')
+        Failure of single parameter doesn't stop the others.
+        :type values dict
+        :return: full names of written parameters and errors of failed ones, both keyed by parameter name
+        :rtype: tuple
+        """
+        key_id = self._write_key(encrypt, profile)
+        bucket = TokenBucket(self.ctx.provider.aws_setting('ssm_write_rate', DEFAULT_SSM_WRITE_RATE))
+
+        with ThreadPoolExecutor(max_workers=SSM_WORKERS) as executor:
+            futures = {
+                parameter: executor.submit(self._put, namespace, parameter, value, key_id, tags, bucket)
+                for parameter, value in values.items()
+            }
+
+        written, failed = {}, {}
+        for parameter, future in futures.items():
+            if future.exception():
+                failed[parameter] = future.exception()
+            else:
+                written[parameter] = future.result()
+
+        return written, failed
+
+    def _write_key(self, encrypt, profile):
+        key_id = self.ctx.provider.parameter_store_key(profile) if encrypt else None
 
         if not key_id and encrypt:
             raise Exception('Unable to locate KMS key with parameter_store_key alias and encryption required')
 
+        return key_id
+
+    def _put(self, namespace, parameter, value, key_id, tags=None, bucket=None):
         full_name = self.get_full_name(*namespace.split(':'), parameter=parameter)
+        encrypt = key_id is not None
 
         args = {
             'Name': full_name,
@@ -83,10 +326,18 @@ class SSM(BaseSSM):
         if encrypt:
             args['KeyId'] = key_id
 
-        self.ssm.put_parameter(**args)
+        if bucket:
+            bucket.acquire()
+
+        call_with_backoff(self.ssm.put_parameter, **args)
 
         if tags:
-            self.ssm.add_tags_to_resource(
+            # tagging counts against the same SSM throughput as put_parameter
+            if bucket:
+                bucket.acquire()
+
+            call_with_backoff(
+                self.ssm.add_tags_to_resource,
                 ResourceType='Parameter',
                 ResourceId=full_name,
                 Tags=[{'Key': k, 'Value': v} for k, v in tags.items()]
@@ -95,12 +346,9 @@ class SSM(BaseSSM):
         return full_name
 
     def get_encryption_key(self):
-        aliases = self.ctx.provider.session.client("kms").list_aliases()
+        key_id = self.ctx.provider.parameter_store_key()
 
-        return next(iter(filter(
-            lambda x: x.get('AliasName') == 'alias/parameter_store_key',
-            aliases.get('Aliases', {})
-        ))) or {}
+        return {'AliasName': PARAMETER_STORE_KEY_ALIAS, 'TargetKeyId': key_id} if key_id else {}
 
     def find_by_tag(self, tag, value):
         params = self.ssm.describe_parameters(
@@ -133,24 +381,37 @@ class SSM(BaseSSM):
             Name=self.get_full_name(*namespace.split(':'), parameter=parameter)
         )
 
+    def namespace_values(self, resources):
+        """
+        Values of parameters keyed by name without namespace, one dict per resource. Only parameters directly in the
+        namespace are included, listing returns parameters of nested paths as well
+        :rtype: list
+        """
+        return [
+            {self.normalize_name(namespace, name, False, True): value.get('Value')
+             for name, value in values.items() if _direct_child(namespace, name)}
+            for namespace, _, values in self.fetch_namespaces(resources)
+        ]
+
     @staticmethod
-    def sync_vars(source, destination, namespace):
+    def sync_vars(source, destination, namespaces):
         """
-        Sync SSM variables between profiles
+        Compare SSM variables between profiles, both sides are fetched concurrently
         :type source SSM
         :type destination SSM
-        :type namespace str
-        :return:
+        :type namespaces list
+        :return: diff of each namespace
+        :rtype: list
         """
-        return compare_dicts(
-            source.get_short_parameters(namespace),
-            destination.get_short_parameters(namespace)
-        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            source_values = executor.submit(source.namespace_values, namespaces)
+            destination_values = executor.submit(destination.namespace_values, namespaces)
+
+            return [Diff(s, d) for s, d in zip(source_values.result(), destination_values.result())]
 
 
 class AWSProvider(Provider):
     name = "aws"
-    _account_id = None
 
     known_params = {
         "profile": ("AWS cli profile name for env {env_name}", {"type": str, "default": "default"})
@@ -161,27 +422,176 @@ class AWSProvider(Provider):
         return self.get_session(self.profile)
 
     def get_session(self, profile):
-        return boto3.Session(profile_name=profile)
+        with _pool_lock:
+            return self._get_session(profile, _credentials_signature())
 
-    def get_session_for_stage(self, stage):
-        print self.ctx.settings
-        return self.get_session(
-            '{}{}'.format(
-                self.ctx.settings.get('stylist', {}).get('provider', {}).get('prefix'),
-                stage
-            )
+    def _get_session(self, profile, signature):
+        key = (profile, signature)
+
+        if key not in _sessions:
+            with span('session {}'.format(profile), 'aws'):
+                session = boto3.Session(profile_name=profile)
+                _share_components(session._session)
+
+            # record every API call made by clients created from this session
+            session.events.register('before-call', aws_stats.before_call)
+            session.events.register('needs-retry', aws_stats.needs_retry)
+            session.events.register('after-call', _after_call)
+
+            _sessions[key] = session
+
+        return _sessions[key]
+
+    def client(self, service, profile=None, region=None):
+        """
+        Shared client of given service, created once per profile, region and credentials
+        :rtype: botocore.client.BaseClient
+        """
+        profile = profile or self.profile
+
+        with _pool_lock:
+            signature = _credentials_signature()
+            session = self._get_session(profile, signature)
+            key = (profile, signature, region or session.region_name, service)
+
+            if key not in _clients:
+                with span('client {}'.format(service), 'aws'):
+                    _clients[key] = session.client(service, region_name=region, config=self._client_config())
+
+            return _clients[key]
+
+    def _client_config(self):
+        return botocore_config.Config(
+            max_pool_connections=self.aws_setting('max_pool_connections', DEFAULT_MAX_POOL_CONNECTIONS)
         )
 
+    def stage_profile(self, stage):
+        return '{}{}'.format(self.ctx.settings.get('stylist', {}).get('provider', {}).get('prefix', ''), stage)
+
+    def get_session_for_stage(self, stage):
+        return self.get_session(self.stage_profile(stage))
+
     @property
     def account_id(self):
-        if not self._account_id:
-            self._account_id = self.session.client('sts').get_caller_identity()["Account"]
+        return self.caller_identity['Account']
+
+    @property
+    def caller_identity(self):
+        return self.get_caller_identity()
+
+    def get_caller_identity(self, profile=None):
+        """
+        Account, Arn and UserId of given (by default current) profile.
 
-        return self._account_id
+        Identity is cached in ~/.stylist/cache for `aws.identity_ttl` seconds, cached entry is discarded as soon as
+        credentials or AWS environment variables change.
+        :rtype: dict
+        """
+        profile = profile or self.profile
+
+        def fetch():
+            response = self.client('sts', profile=profile).get_caller_identity()
+            return {k: response[k] for k in ('Account', 'Arn', 'UserId')}
+
+        # credentials signature contains secrets from environment, only its digest goes to disk
+        return _cached(
+            IDENTITY_CACHE_FILE, profile or '', self.aws_setting('identity_ttl', DEFAULT_IDENTITY_TTL), fetch,
+            signature=hashlib.sha1(_credentials_signature()).hexdigest()
+        )
+
+    def parameter_store_key(self, profile=None):
+        """
+        Id of KMS key used to encrypt SSM parameters, resolved from its alias once per account and region and cached
+        for `aws.kms_key_ttl` seconds
+        :rtype: str
+        """
+        kms = self.client('kms', profile=profile)
+        key = '{}:{}'.format(self.get_caller_identity(profile)['Account'], kms.meta.region_name)
+
+        expires, key_id = _kms_keys.get(key, (0, None))
+        if expires > time.time():
+            return key_id
+
+        def fetch():
+            try:
+                return kms.describe_key(KeyId=PARAMETER_STORE_KEY_ALIAS)['KeyMetadata']['KeyId']
+            except kms.exceptions.NotFoundException:
+                return None
+
+        ttl = self.aws_setting('kms_key_ttl', DEFAULT_KMS_KEY_TTL)
+        key_id = _cached(KMS_KEY_CACHE_FILE, key, ttl, fetch)
+
+        if key_id:
+            _kms_keys[key] = (time.time() + ttl, key_id)
+
+        return key_id
+
+    def terraform_context(self, refresh=False, profile=None):
+        """
+        Listener ARN of every load balancer (`alb_<name>_arn_<protocol>`) and id of every API Gateway REST API
+        (`api_<name>`) in current account and region, cached for `aws.context_ttl` seconds.
+        :rtype: dict
+        """
+        def fetch():
+            with span('discover terraform context', 'aws'):
+                return self._discover_context(profile)
+
+        return _cached(CONTEXT_CACHE_FILE, self._context_key(profile),
+                       self.aws_setting('context_ttl', DEFAULT_CONTEXT_TTL), fetch, refresh=refresh)
+
+    def forget_terraform_context(self, profile=None):
+        """
+        Drop cached context, infrastructure it describes may have been changed by terraform apply
+        """
+        _forget(CONTEXT_CACHE_FILE, self._context_key(profile))
+
+    def _context_key(self, profile=None):
+        return '{}:{}'.format(self.get_caller_identity(profile)['Account'],
+                              self.client('elbv2', profile=profile).meta.region_name)
+
+    def _discover_context(self, profile=None):
+        alb = self.client('elbv2', profile=profile)
+
+        with ThreadPoolExecutor(max_workers=CONTEXT_WORKERS) as executor:
+            apis = executor.submit(self._paginate, self.client('apigateway', profile=profile), 'get_rest_apis', 'items')
+            balancers = self._paginate(alb, 'describe_load_balancers', 'LoadBalancers')
+
+            listeners = [
+                executor.submit(self._paginate, alb, 'describe_listeners', 'Listeners',
+                                LoadBalancerArn=lb.get('LoadBalancerArn'))
+                for lb in balancers
+            ]
+
+            context = {}
+            for lb, lb_listeners in zip(balancers, listeners):
+                for listener in lb_listeners.result():
+                    key = "alb_{}_arn_{}".format(lb.get("LoadBalancerName"), listener.get("Protocol").lower())
+                    context[key] = listener.get("ListenerArn")
+
+            for api in apis.result():
+                context['api_{}'.format(api.get('name'))] = api.get('id')
+
+        return context
+
+    @staticmethod
+    def _paginate(client, operation, key, **kwargs):
+        items = []
+        for page in client.get_paginator(operation).paginate(**kwargs):
+            items += page.get(key, [])
+
+        return items
+
+    def aws_setting(self, name, default):
+        return self.ctx.settings.get('aws', {}).get(name, default)
 
     @property
     def ssm(self):
-        return SSM(self.session.client('ssm'), self.ctx)
+        return SSM(self.client('ssm'), self.ctx, self.profile)
+
+    def ssm_for_stage(self, stage):
+        profile = self.stage_profile(stage)
+
+        return SSM(self.client('ssm', profile=profile), self.ctx, profile)
 
     @property
     def credentials(self):
@@ -0,0 +1,121 @@
+"""
+Statistics of AWS API calls made by clients created through AWSProvider.
+
+Calls are recorded by botocore event handlers registered on every session: `before-call` starts the clock,
+`needs-retry` counts attempts and throttled responses, `after-call` records latency and HTTP status. Summary is
+printed with `--aws-stats` and all calls are written as JSON with `--aws-stats-file`.
+"""
+import json
+import threading
+import time
+
+from stylist.provider.throttling import THROTTLING_ERRORS
+
+
+class Call(object):
+    __slots__ = ('service', 'operation', 'start', 'duration', 'status', 'error', 'retries', 'throttled')
+
+    def __init__(self, service, operation, start, duration, status, error, retries, throttled):
+        self.service = service
+        self.operation = operation
+        self.start = start
+        self.duration = duration
+        self.status = status
+        self.error = error
+        self.retries = retries
+        self.throttled = throttled
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class CallStats(object):
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
+
+    def record(self, service, operation, start, end, status, error=None, retries=0, throttled=0):
+        call = Call(service, operation, start, end - start, status, error, retries, throttled)
+
+        with self._lock:
+            self.calls.append(call)
+
+        return call
+
+    def summary(self):
+        """
+        Service, operation, calls, errors, retries, throttled responses, total and maximum latency per operation,
+        most frequently called first
+        :rtype: list
+        """
+        rows = {}
+        for call in self.calls:
+            key = (call.service, call.operation)
+            if key not in rows:
+                rows[key] = [call.service, call.operation, 0, 0, 0, 0, 0.0, 0.0]
+
+            row = rows[key]
+            row[2] += 1
+            row[3] += 1 if call.status >= 300 else 0
+            row[4] += call.retries
+            row[5] += call.throttled
+            row[6] += call.duration
+            row[7] = max(row[7], call.duration)
+
+        return sorted(rows.values(), key=lambda r: (-r[2], -r[6]))
+
+    def to_dict(self):
+        keys = ['service', 'operation', 'calls', 'errors', 'retries', 'throttled', 'total', 'max']
+
+        return {
+            'summary': [dict(zip(keys, row)) for row in self.summary()],
+            'calls': [call.to_dict() for call in self.calls]
+        }
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+stats = CallStats()
+
+
+def before_call(context, **kwargs):
+    context['stylist_started'] = time.time()
+    context['stylist_attempts'] = 0
+    context['stylist_throttled'] = 0
+
+
+def needs_retry(request_dict, attempts, response=None, **kwargs):
+    """
+    Called after every attempt, before botocore decides whether to retry, never affects that decision
+    """
+    context = request_dict.get('context') or {}
+    context['stylist_attempts'] = attempts
+
+    if response and response[1].get('Error', {}).get('Code') in THROTTLING_ERRORS:
+        context['stylist_throttled'] = context.get('stylist_throttled', 0) + 1
+
+
+def after_call(context, model, http_response, parsed, **kwargs):
+    """
+    :rtype: Call
+    """
+    started = context.pop('stylist_started', None)
+    if not started:
+        return None
+
+    return stats.record(
+        model.service_model.service_name,
+        model.name,
+        started,
+        time.time(),
+        http_response.status_code,
+        error=parsed.get('Error', {}).get('Code'),
+        retries=max(context.pop('stylist_attempts', 1) - 1, 0),
+        throttled=context.pop('stylist_throttled', 0)
+    )
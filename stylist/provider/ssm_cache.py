@@ -0,0 +1,129 @@
+"""
+Opt-in local cache of SSM parameter values, encrypted at rest.
+
+Values are encrypted with Fernet (`cryptography` package) using a key kept in the OS keyring, or in
+~/.stylist/ssm-cache.key when no keyring is available. Cached value is used only as long as Version and
+LastModifiedDate reported by describe_parameters match the cached ones.
+"""
+import hashlib
+import json
+from os.path import expanduser, join
+
+import click
+
+from stylist.cache import atomic_write, user_cache_path
+
+CACHE_DIR = user_cache_path('ssm')
+SECRET_FILE = join(expanduser('~'), '.stylist', 'ssm-cache.key')
+
+KEYRING_SERVICE = 'stylist'
+KEYRING_USERNAME = 'ssm-cache'
+
+_fernet = []
+
+
+def fingerprint(parameter):
+    """
+    Cheap version of parameter as reported by describe_parameters
+    :rtype: list
+    """
+    return [parameter.get('Version'), str(parameter.get('LastModifiedDate'))]
+
+
+def get_fernet():
+    """
+    Fernet instance with cache key, None when cryptography isn't installed
+    """
+    if not _fernet:
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            click.secho('SSM cache is disabled, it requires cryptography package (pip install stylist[cache])',
+                        fg='yellow', err=True)
+            _fernet.append(None)
+        else:
+            _fernet.append(Fernet(_secret(Fernet.generate_key)))
+
+    return _fernet[0]
+
+
+def _secret(generate):
+    try:
+        import keyring
+
+        key = keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME)
+        if not key:
+            key = generate()
+            keyring.set_password(KEYRING_SERVICE, KEYRING_USERNAME, key)
+
+        return str(key)
+    except Exception:
+        # no keyring package or no usable backend (headless machines, containers)
+        pass
+
+    try:
+        with open(SECRET_FILE, 'rb') as f:
+            return f.read().strip()
+    except IOError:
+        key = generate()
+        atomic_write(SECRET_FILE, key, mode=0o600)
+
+        return key
+
+
+class ParameterCache(object):
+    def __init__(self, profile, region, ttl):
+        """
+        :param ttl: maximum age of cached values in seconds, cache is disabled when 0
+        """
+        self.profile = profile
+        self.region = region
+        self.ttl = ttl
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and get_fernet() is not None
+
+    def load(self, namespace):
+        """
+        Cached parameters of namespace keyed by name, empty when there is no valid cache entry
+        :rtype: dict
+        """
+        if not self.enabled:
+            return {}
+
+        from cryptography.fernet import InvalidToken
+
+        try:
+            with open(self._path(namespace), 'rb') as f:
+                return json.loads(get_fernet().decrypt(f.read(), ttl=self.ttl))
+        except (IOError, ValueError, InvalidToken):
+            return {}
+
+    def store(self, namespace, parameters, values):
+        """
+        :param parameters: parameters metadata from describe_parameters
+        :param values: parameters from get_parameters keyed by name
+        """
+        if not self.enabled:
+            return
+
+        data = {}
+        for parameter in parameters:
+            value = values.get(parameter.get('Name'))
+            if value:
+                data[parameter.get('Name')] = {
+                    'fingerprint': fingerprint(parameter),
+                    'Type': value.get('Type'),
+                    'Value': value.get('Value')
+                }
+
+        try:
+            atomic_write(self._path(namespace), get_fernet().encrypt(json.dumps(data)), mode=0o600)
+        except (IOError, OSError):
+            pass
+
+    def _path(self, namespace):
+        key = '\0'.join([self.profile or '', self.region or '', namespace])
+
+        return join(CACHE_DIR, hashlib.sha1(key).hexdigest())
@@ -0,0 +1,53 @@
+import random
+import threading
+import time
+
+THROTTLING_ERRORS = ('ThrottlingException', 'Throttling', 'TooManyUpdates', 'RequestLimitExceeded')
+
+
+class TokenBucket(object):
+    """
+    Client side rate limiter shared by worker threads, allows bursts up to capacity and rate calls per second after
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+
+def is_throttling(e):
+    return getattr(e, 'response', {}).get('Error', {}).get('Code') in THROTTLING_ERRORS
+
+
+def call_with_backoff(func, retries=5, base=0.5, cap=10, **kwargs):
+    """
+    Call AWS api, retrying throttled calls with full jitter exponential backoff on top of botocore own retries
+    """
+    attempt = 0
+    while True:
+        try:
+            return func(**kwargs)
+        except Exception as e:
+            if attempt >= retries or not is_throttling(e):
+                raise
+
+        time.sleep(random.uniform(0, min(cap, base * 2 ** attempt)))
+        attempt += 1
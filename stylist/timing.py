@@ -0,0 +1,101 @@
+"""
+Span API recording wall time of stylist phases: imports, configuration, AWS sessions and API calls, subprocesses
+and command body.
+
+Spans are always recorded (it's a couple of list appends per command), summary and Chrome trace-event file are
+produced only when requested with `--timings` / `STYLIST_TRACE` and `--trace-file` / `STYLIST_TRACE_FILE`.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Span(object):
+    __slots__ = ('name', 'category', 'start', 'end', 'thread', 'args')
+
+    def __init__(self, name, category, start, end, thread, args):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.end = end
+        self.thread = thread
+        self.args = args
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+class Tracer(object):
+    def __init__(self):
+        self.started = time.time()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.spans = []
+
+    @contextmanager
+    def span(self, name, category='stylist', **args):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.time(), **args)
+
+    def record(self, name, category, start, end, **args):
+        span = Span(name, category, start, end, threading.current_thread().ident, args)
+
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self):
+        """
+        Total time and number of calls per span, in order of first occurrence
+        :rtype: list
+        """
+        rows = {}
+        order = []
+        for span in self.spans:
+            key = (span.category, span.name)
+            if key not in rows:
+                rows[key] = [span.category, span.name, 0, 0.0]
+                order.append(key)
+
+            rows[key][2] += 1
+            rows[key][3] += span.duration
+
+        return [rows[k] for k in order]
+
+    def chrome_trace(self):
+        """
+        Spans in Chrome trace-event format, open with chrome://tracing or https://ui.perfetto.dev
+        :rtype: dict
+        """
+        pid = os.getpid()
+
+        return {
+            'traceEvents': [{
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': int((span.start - self.started) * 1e6),
+                'dur': int(span.duration * 1e6),
+                'pid': pid,
+                'tid': span.thread,
+                'args': span.args
+            } for span in self.spans],
+            'displayTimeUnit': 'ms'
+        }
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+tracer = Tracer()
+span = tracer.span
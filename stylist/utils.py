@@ -9,10 +9,12 @@ from textwrap import wrap
 import sys
 import click
 import math
-from pygments import highlight, lexers, formatters
-from terminaltables import SingleTable
+from stylist.lazy import lazy_import
 
-from stylist.click.types import Boolean
+pygments = lazy_import('pygments')
+lexers = lazy_import('pygments.lexers')
+formatters = lazy_import('pygments.formatters')
+terminaltables = lazy_import('terminaltables')
 
 
 def colourize(name):
@@ -36,7 +38,7 @@ def highlight_json(text, format=False):
     if isinstance(text, (dict, list)):
         text = json.dumps(text)
 
-    return highlight(
+    return pygments.highlight(
         unicode(text, 'UTF-8'),
         lexers.JsonLexer(),
         formatters.TerminalFormatter()
@@ -57,7 +59,7 @@ def table(title, data, headers=None, wraped_col=1):
 
     _data = [headers] + data
 
-    _table = SingleTable(_data, click.style(title, fg="blue"))
+    _table = terminaltables.SingleTable(_data, click.style(title, fg="blue"))
     _table.inner_row_border = True
 
     max_width = math.fabs(_table.column_max_width(wraped_col)) or 30
@@ -126,45 +128,3 @@ def random_password(size=15):
     chars = (string.letters + string.digits + string.punctuation).translate(None, '\'";:@%{}*$/&#?[]`~\\')
 
     return ''.join((random.choice(chars)) for x in range(size)).replace("'", '-').replace('?', '*')
-
-
-def compare_dicts(source, destination):
-    """
-    :type source dict
-    :type destination dict
-    :return: dict
-    """
-    source_vars = source.copy()
-    destination_vars = destination.copy()
-
-    def prompt(name, source, dest, default):
-        return click.prompt(
-            click.style(
-                '{name}: "{source_value}" -> "{dest_value}"'.format(name=name, source_value=source, dest_value=dest),
-                fg='yellow' if val != default else 'green'
-            ),
-            default=default
-        )
-
-    # merge values
-    for name in sorted(source_vars.iterkeys()):
-        val = source_vars.get(name)
-        destination_vars[name] = prompt(
-            name, val, destination_vars.get(name, ""),
-            val if name not in destination_vars else destination_vars.get(name, "")
-        )
-
-    for name in sorted(destination_vars.iterkeys()):
-        if name in source_vars:
-            continue
-
-        val = click.prompt(
-            'Parameter "{}" has been removed from source profile, delete it from destination as well?'.format(name),
-            type=Boolean(),
-            default=True
-        )
-
-        if val:
-            del destination_vars[name]
-
-    return destination_vars
@@ -4,6 +4,8 @@ from os.path import expanduser
 import click
 import os
 
+from stylist.timing import span
+
 
 class ApexException(Exception):
     def __init__(self, cmd, message, errno):
@@ -30,16 +32,18 @@ class Apex(object):
         self.ctx = ctx
 
     def run(self, args, dockerfile_dir=None, stdout=None, stderr=None):
+        name = 'apex ' + args[0]
         args = ['apex', '--profile', self.ctx.provider.profile, '-e', self.ctx.environment] + args
 
-        p = subprocess.Popen(
-            args,
-            stdout=stdout or click.get_text_stream('stdout'),
-            stderr=stderr or click.get_text_stream('stderr'),
-            cwd=dockerfile_dir,
-            env=dict(os.environ, **{'AWS_SHARED_CREDENTIALS_FILE': expanduser('~/.aws/credentials')})
-        )
-        out, err = p.communicate()
+        with span(name, 'subprocess'):
+            p = subprocess.Popen(
+                args,
+                stdout=stdout or click.get_text_stream('stdout'),
+                stderr=stderr or click.get_text_stream('stderr'),
+                cwd=dockerfile_dir,
+                env=dict(os.environ, **{'AWS_SHARED_CREDENTIALS_FILE': expanduser('~/.aws/credentials')})
+            )
+            out, err = p.communicate()
 
         if p.returncode != 0:
             raise ApexException(args, err, p.returncode)
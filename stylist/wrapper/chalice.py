@@ -4,6 +4,8 @@ from os.path import join
 import click
 import os
 
+from stylist.timing import span
+
 
 class ChaliceException(Exception):
     def __init__(self, cmd, message, errno):
@@ -32,14 +34,15 @@ class Chalice(object):
     def run(self, args, stdout=None, stderr=None, cwd=None):
         args = ['chalice'] + args + ['--profile', self.ctx.provider.profile]
 
-        p = subprocess.Popen(
-            args,
-            stdout=stdout or click.get_text_stream('stdout'),
-            stderr=stderr or click.get_text_stream('stderr'),
-            cwd=cwd or join(self.ctx.working_dir, self.ctx.name),
-            env=os.environ
-        )
-        out, err = p.communicate()
+        with span('chalice ' + args[1], 'subprocess'):
+            p = subprocess.Popen(
+                args,
+                stdout=stdout or click.get_text_stream('stdout'),
+                stderr=stderr or click.get_text_stream('stderr'),
+                cwd=cwd or join(self.ctx.working_dir, self.ctx.name),
+                env=os.environ
+            )
+            out, err = p.communicate()
 
         if p.returncode != 0:
             raise ChaliceException(args, err, p.returncode)
@@ -9,6 +9,8 @@ from os.path import dirname, join
 
 import click
 
+from stylist.timing import span
+
 
 class NotADockerProjectException(Exception):
     pass
@@ -94,7 +96,7 @@ class Docker(object):
 
     def __init__(self, ctx, subproject):
         self.ctx = ctx
-        self.ecr = ctx.provider.session.client('ecr')
+        self.ecr = ctx.provider.client('ecr')
         self.repositories = Docker.Repositories(self.ecr, self.ctx, subproject)
         self.project_name = self._get_project_name()
         self.subproject = subproject
@@ -160,6 +162,20 @@ class Docker(object):
 
         return [json.loads(line) for line in out.strip().split("\n") if line]
 
+    def remote_images(self, docker_file, profile=None):
+        """
+        Images pushed to ECR repository of docker file, by default in account of current profile
+        :rtype: list
+        """
+        ecr = self.ctx.provider.client('ecr', profile=profile) if profile else self.ecr
+        paginator = ecr.get_paginator('describe_images')
+
+        images = []
+        for page in paginator.paginate(repositoryName=self.get_repository_name(docker_file)):
+            images += page.get('imageDetails', [])
+
+        return images
+
     def get_latest_build_tag(self, dockerfile_path):
         images = self.images(dockerfile_path)
         latest_hash = next(enumerate(filter(lambda x: x.get('Tag') == 'latest', images)))[1].get('ID')
@@ -181,13 +197,14 @@ class Docker(object):
     def run_docker(self, flags, dockerfile_dir=None, stdout=None, stderr=None):
         args = ['docker'] + flags
 
-        p = subprocess.Popen(
-            args,
-            stdout=stdout or click.get_text_stream('stdout'),
-            stderr=stderr or click.get_text_stream('stderr'),
-            cwd=dockerfile_dir
-        )
-        out, err = p.communicate()
+        with span('docker ' + flags[0], 'subprocess'):
+            p = subprocess.Popen(
+                args,
+                stdout=stdout or click.get_text_stream('stdout'),
+                stderr=stderr or click.get_text_stream('stderr'),
+                cwd=dockerfile_dir
+            )
+            out, err = p.communicate()
 
         if p.returncode != 0:
             raise DockerException(args, err, p.returncode)
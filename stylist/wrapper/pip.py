@@ -6,6 +6,7 @@ from os.path import join, isfile
 import click
 
 from stylist.cli import logger
+from stylist.timing import span
 
 
 class PipException(Exception):
@@ -31,16 +32,18 @@ class Pip(object):
 
                 args += [dependency]
 
-                p = subprocess.Popen(args, stdout=click.get_text_stream("stdout"),
-                                     stderr=click.get_text_stream("stderr"))
-                out, err = p.communicate()
+                with span('pip install', 'subprocess'):
+                    p = subprocess.Popen(args, stdout=click.get_text_stream("stdout"),
+                                         stderr=click.get_text_stream("stderr"))
+                    out, err = p.communicate()
             except Exception as e:
                 logger.exception(e.message)
                 raise e
 
     def list_dependencies(self):
-        p = subprocess.Popen([self.pip, "freeze", "-l"], stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE)
-        out, err = p.communicate()
+        with span('pip freeze', 'subprocess'):
+            p = subprocess.Popen([self.pip, "freeze", "-l"], stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE)
+            out, err = p.communicate()
 
         return out.split("\n")
@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 
+import hashlib
 import json
 import os
 import re
@@ -7,18 +8,24 @@ import shutil
 import subprocess
 import sys
 import tempfile
+import threading
 import time
 from glob import glob
-from os.path import isfile, join, isdir, exists, dirname, basename
+from os.path import isfile, join, isdir, exists, dirname, basename, expanduser
 
 import click
-import hcl
 from click import style, prompt
-from jinja2 import Template
 
+from stylist.cache import atomic_write, ensure_dir, ensure_private_dir, read_json, write_json
 from stylist.cli import logger
 from stylist.commands.cmd_check import which
-from stylist.utils import compare_dicts
+from stylist.diff import Diff
+from stylist.helper.templating import render_string
+from stylist.helper.terraform_runs import ApplyRecorder, RunHistory, plan_summary, totals
+from stylist.lazy import lazy_import
+from stylist.timing import span
+
+hcl = lazy_import('hcl')
 
 PROVIDER_TEMPLATE = """
 provider "aws" {
@@ -32,6 +39,21 @@ variable "context" {
 }
 """
 
+# local clone of remote terraform templates repository
+TEMPLATES_CLONE_DIR = join(tempfile.gettempdir(), "stylist-templates")
+
+# providers are downloaded once per machine and shared by all projects
+PLUGIN_CACHE_DIR = join(expanduser('~'), '.stylist', 'terraform-plugins')
+
+# logs of terraform runs which don't write to terminal, relative to terraform directory
+LOGS_DIR = '.stylist-logs'
+
+# latest successful plan of each stage, reused by apply when nothing has changed
+PLANS_DIR = '.stylist-plans'
+DEFAULT_PLAN_REUSE_TTL = 900
+
+_init_lock = threading.Lock()
+
 
 class TerraformException(Exception):
     def __init__(self, message, errno=None):
@@ -39,53 +61,123 @@ class TerraformException(Exception):
         self.errno = errno
 
 
+class Workspaces(object):
+    """
+    Terraform workspaces of a data dir, current one is read from <data dir>/environment the same way terraform does,
+    so terraform is started only when workspace has to be created or switched
+    """
+
+    def __init__(self, terraform):
+        """
+        :type terraform Terraform
+        """
+        self.terraform = terraform
+
+    @property
+    def current(self):
+        try:
+            with open(join(self.terraform.data_dir, 'environment'), 'r') as f:
+                return f.read().strip() or 'default'
+        except IOError:
+            return 'default'
+
+    def select(self, name):
+        if self.current == name:
+            return
+
+        # workspaces of remote backends aren't visible locally, so creating one is attempted only when select fails,
+        # new workspace is selected right after it's created
+        if self.terraform._exec(['workspace', 'select', name]) == 0:
+            return
+
+        if self.terraform._exec(['workspace', 'new', name]) != 0:
+            raise TerraformException("Unable to select terraform workspace: {}".format(name), 1)
+
+
 class Terraform(object):
     STYLIST_VAR_NAMES = ('context',)
 
-    def __init__(self, ctx, templates=None):
+    def __init__(self, ctx, templates=None, stage=None, isolated=None, output=None):
+        """
+        :param stage: stage to run terraform for, current environment by default
+        :param isolated: force (or disable) isolated data dir, `terraform.isolated_data_dirs` by default
+        :param output: file to which output of terraform is written instead of stdout and stderr
+        """
         self.ctx = ctx
         self.cmd = which('terraform')
         self.templates = templates
+        self.stage = stage or ctx.environment
+        self._isolated = isolated
+        self.output = output
+        self.planned_state = None
+        self.workspaces = Workspaces(self)
 
     @property
     def terraform_dir(self):
         return join(self.ctx.working_dir, "terraform")
 
+    @property
+    def profile(self):
+        return self.ctx.provider.stage_profile(self.stage)
+
+    @property
+    def isolated(self):
+        """
+        Each stage has its own data dir, so switching stages never touches modules, plugins and backend of the others
+        """
+        if self._isolated is not None:
+            return self._isolated
+
+        return bool(self.ctx.settings.get('terraform', {}).get('isolated_data_dirs')) and \
+            'TF_DATA_DIR' not in os.environ
+
+    @property
+    def data_dir(self):
+        if self.isolated:
+            return join(self.terraform_dir, '.terraform-{}'.format(self.stage))
+
+        return join(self.terraform_dir, os.environ.get('TF_DATA_DIR', '.terraform'))
+
     @property
     def tfupdate_path(self):
+        if self.isolated:
+            return join(self.data_dir, '.tfupdate')
+
         return join(self.terraform_dir, '.tfupdate')
 
     @property
     def env_vars_file(self):
-        return join(self.terraform_dir, 'env.{}.tfvars'.format(self.ctx.environment))
-
-    def plan(self, save=False, force_update=False):
-        vars_file = self._ensure_env()
+        return join(self.terraform_dir, 'env.{}.tfvars'.format(self.stage))
+
+    def plan(self, save=False, force_update=False, refresh_context=False, reuse=False):
+        """
+        Every successful plan is kept in terraform/.stylist-plans/, with reuse it is returned instead of planning
+        again as long as it's recent and none of its inputs nor the state has changed since
+        :param save: return path of temporary copy of the plan, it's up to the caller to remove it
+        :return: path of the plan (None when not saved) and exit code of terraform
+        """
+        # fresh data dir has to be initialised before its workspace can be selected
+        self._check_env()
+        self.setup()
         self._update_modules(force_update)
+        vars_file = self._ensure_env()
 
         args = ['plan']
 
         if isfile(vars_file):
             args += ['-var-file', vars_file]
 
-        aws_session = self.ctx.provider.session
-        alb = aws_session.client('elbv2')
+        provider = self.ctx.provider
 
         inject_vars = {
-            'aws_account_id': self.ctx.provider.account_id,
-            'aws_region': aws_session.region_name,
-            'aws_profile': self.ctx.provider.profile,
-            'environment': self.ctx.environment,
+            'aws_account_id': provider.get_caller_identity(self.profile)['Account'],
+            'aws_region': provider.get_session(self.profile).region_name,
+            'aws_profile': self.profile,
+            'environment': self.stage,
             'project_name': self.ctx.name
         }
 
-        for lb in alb.describe_load_balancers().get('LoadBalancers'):
-            for listener in alb.describe_listeners(LoadBalancerArn=lb.get("LoadBalancerArn")).get("Listeners"):
-                key = "alb_{}_arn_{}".format(lb.get("LoadBalancerName"), listener.get("Protocol").lower())
-                inject_vars[key] = listener.get("ListenerArn")
-
-        for api in aws_session.client('apigateway').get_rest_apis(limit=200).get('items'):
-            inject_vars['api_{}'.format(api.get('name'))] = api.get('id')
+        inject_vars.update(provider.terraform_context(refresh_context, self.profile))
 
         params = []
         for k, v in inject_vars.items():
@@ -93,41 +185,180 @@ class Terraform(object):
 
         args += ['--var', 'context={%s}' % ", ".join(params)]
 
-        output = None
-        if save:
-            f = tempfile.NamedTemporaryFile(prefix="tf-plan.", delete=False)
-            f.close()
+        fingerprint = self._plan_fingerprint(vars_file, inject_vars)
+        self.planned_state = self.state_version()
 
-            args += ['-out=' + f.name]
+        if not (save and reuse and self._reusable(fingerprint)):
+            artifact = self._plan_artifact('tfplan')
+            ensure_private_dir(dirname(artifact))
+            args += ['-out=' + artifact]
 
-            output = f.name
+            exit_code = self._exec(args)
+            self._store_plan(fingerprint, exit_code)
 
-        self.setup()
+            if exit_code != 0 or not save:
+                return None, exit_code
+
+        f = tempfile.NamedTemporaryFile(prefix="tf-plan.", delete=False)
+        f.close()
+        shutil.copyfile(self._plan_artifact('tfplan'), f.name)
 
-        return output, self._exec(args)
+        return f.name, 0
 
-    def apply(self, plan):
+    def apply(self, plan, summary=None):
+        """
+        Apply saved plan, duration of each resource is recorded in run history
+        :param summary: summary of the plan, see plan_summary
+        """
         self._ensure_env()
 
+        if self.planned_state is not None and self.planned_state != self.state_version():
+            raise TerraformException("State of {} has changed since the plan has been made, plan again".format(
+                self.stage), 1)
+
         args = ['apply', plan]
 
-        return self._exec(args)
+        recorder = ApplyRecorder()
+        started = time.time()
+        exit_code = self._exec(args, on_line=recorder.feed)
+
+        try:
+            self.history.record(self.stage, started, time.time(), exit_code, recorder.resources, summary)
+        except (IOError, OSError) as e:
+            logger.warning("Unable to record terraform run: {}".format(e))
+
+        # even failed apply may have created load balancers or APIs
+        self.ctx.provider.forget_terraform_context(self.profile)
+
+        return exit_code
+
+    @property
+    def history(self):
+        return RunHistory(self.terraform_dir)
+
+    @property
+    def state_file(self):
+        if self.stage == 'default':
+            return join(self.terraform_dir, 'terraform.tfstate')
+
+        return join(self.terraform_dir, 'terraform.tfstate.d', self.stage, 'terraform.tfstate')
+
+    def state_version(self):
+        """
+        Lineage and serial of local state, None when there is no local state (new workspace or remote backend)
+        :rtype: list
+        """
+        state = read_json(self.state_file)
+
+        return [state.get('lineage'), state.get('serial')] if state else None
+
+    def _plan_artifact(self, extension):
+        return join(self.terraform_dir, PLANS_DIR, '{}.{}'.format(self.stage, extension))
+
+    def _plan_fingerprint(self, vars_file, inject_vars):
+        digest = hashlib.sha256(self.modules_fingerprint())
+        # plan is tied to modules installed in data dir it has been made with (isolated dirs of --all-stages)
+        digest.update(json.dumps([self.stage, self.data_dir, inject_vars], sort_keys=True))
+
+        # code of local path modules (bundled templates included) isn't versioned, so it's hashed as a whole
+        local_files = [tf_file for module_dir in self._local_module_dirs()
+                       for tf_file in sorted(glob(join(module_dir, '*.tf')))]
+
+        for path in sorted(glob(join(self.terraform_dir, '*.tf'))) + [vars_file] + local_files:
+            digest.update(path)
+            if isfile(path):
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+
+        return digest.hexdigest()
+
+    def _local_module_dirs(self):
+        """
+        Directories of modules with local path source, followed through modules they use themselves
+        :rtype: list
+        """
+        found = []
+        pending = [self.terraform_dir]
+
+        while pending:
+            directory = pending.pop(0)
+
+            for tf_file in sorted(glob(join(directory, '*.tf'))):
+                dependencies = self._init_dependencies(tf_file)
+                if not isinstance(dependencies, dict):
+                    continue
+
+                for source, _ in dependencies['module'].values():
+                    if not _is_local_source(source):
+                        continue
+
+                    module_dir = os.path.normpath(join(directory, source))
+                    if module_dir not in found and module_dir != self.terraform_dir:
+                        found.append(module_dir)
+                        pending.append(module_dir)
+
+        return sorted(found)
+
+    def _reusable(self, fingerprint):
+        ttl = self.ctx.settings.get('terraform', {}).get('plan_reuse_ttl', DEFAULT_PLAN_REUSE_TTL)
+        saved = read_json(self._plan_artifact('json')) or {}
 
-    def sync_vars(self, source_profile, destination_profile):
-        source_file = join(self.terraform_dir, 'env.{}.tfvars'.format(source_profile))
-        if not isfile(source_file):
+        if getattr(self.ctx, 'no_cache', False) or not ttl or not isfile(self._plan_artifact('tfplan')):
+            return False
+
+        # without local state there is no way to tell that nothing has been applied since
+        if self.planned_state is None or saved.get('state') != self.planned_state:
+            return False
+
+        if saved.get('fingerprint') != fingerprint or saved.get('created', 0) + ttl < time.time():
+            return False
+
+        self._echo("Reusing plan of {} made {}s ago, its inputs and state haven't changed".format(
+            self.stage, int(time.time() - saved['created'])))
+
+        return True
+
+    def _store_plan(self, fingerprint, exit_code):
+        if exit_code != 0:
+            if isfile(self._plan_artifact('json')):
+                os.remove(self._plan_artifact('json'))
+            return
+
+        write_json(self._plan_artifact('json'), {
+            'fingerprint': fingerprint,
+            'state': self.planned_state,
+            'created': time.time()
+        })
+
+    def vars_file(self, profile):
+        return join(self.terraform_dir, 'env.{}.tfvars'.format(profile))
+
+    def read_vars(self, profile):
+        return self._get_vars(self.vars_file(profile))
+
+    def vars_diff(self, source_profile, destination_profile):
+        """
+        :rtype: stylist.diff.Diff
+        """
+        if not isfile(self.vars_file(source_profile)):
             raise TerraformException("Missing tfvars file for source profile: {}".format(source_profile), 1)
 
-        destination_file = join(self.terraform_dir, 'env.{}.tfvars'.format(destination_profile))
+        return Diff(self.read_vars(source_profile), self.read_vars(destination_profile))
 
-        destination_vars = compare_dicts(self._get_vars(source_file), self._get_vars(destination_file))
+    def apply_vars(self, profile, section):
+        """
+        Write planned changes to tfvars file of given profile
+        :type section stylist.diff.PlanSection
+        """
+        destination_vars = self.read_vars(profile)
+        destination_vars.update(section.writes)
+        for name in section.deletes:
+            destination_vars.pop(name, None)
 
-        with open(destination_file, 'w+') as f:
-            for name, value in destination_vars.items():
+        with open(self.vars_file(profile), 'w+') as f:
+            for name, value in sorted(destination_vars.items()):
                 f.write("{name} = {value}\n".format(name=name, value=json.dumps(value)))
 
-        click.secho("All done.", fg="green")
-
     def _get_vars(self, tfvars_file):
         try:
             with open(tfvars_file, 'r') as fp:
@@ -138,36 +369,184 @@ class Terraform(object):
             return {}
 
     def _ensure_env(self):
-        vars_file = join(self.terraform_dir, 'env.{env}.tfvars'.format(env=self.ctx.environment))
+        vars_file = join(self.terraform_dir, 'env.{env}.tfvars'.format(env=self.stage))
+
+        self._check_env()
+        self.workspaces.select(self.stage)
 
-        if self.ctx.environment == 'local':
+        return vars_file
+
+    def _check_env(self):
+        if self.stage == 'local':
             raise TerraformException("You can't use terraform on local env")
 
-        if not isdir(join(self.terraform_dir, 'terraform.tfstate.d', self.ctx.environment)):
-            self._exec(['workspace', 'new', self.ctx.environment])
+    def _update_modules(self, force=False):
+        """
+        Run `terraform init --upgrade` only when modules, providers or templates changed since the last init
+        """
+        fingerprint = self.modules_fingerprint()
 
-        self._exec(['workspace', 'select', self.ctx.environment])
+        try:
+            with open(self.tfupdate_path, 'r') as f:
+                last_fingerprint = f.read().strip()
+        except IOError:
+            last_fingerprint = None
+
+        if force or fingerprint != last_fingerprint or not isdir(self.data_dir):
+            # plugin cache directory is shared and terraform doesn't lock it
+            with _init_lock:
+                # terraform ignores plugin cache directory which doesn't exist
+                ensure_dir(self.plugin_cache_dir)
+                if self.isolated:
+                    ensure_private_dir(self.data_dir)
+                code = self._exec(['init', '--upgrade=true'])
+
+            if code == 0:
+                with open(self.tfupdate_path, 'w+') as f:
+                    f.write(fingerprint)
+
+    def modules_fingerprint(self):
+        """
+        Digest of everything `terraform init` depends on: module sources and versions, provider versions, terraform
+        settings, provider template and revision of remote templates repository
+        :rtype: str
+        """
+        digest = hashlib.sha256(PROVIDER_TEMPLATE)
+        digest.update(self._templates_revision() or '')
+
+        for tf_file in sorted(glob(join(self.terraform_dir, '*.tf'))):
+            digest.update(basename(tf_file))
+            digest.update(json.dumps(self._init_dependencies(tf_file), sort_keys=True))
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def _init_dependencies(tf_file):
+        try:
+            with open(tf_file, 'r') as f:
+                content = f.read()
+        except IOError:
+            return None
 
-        return vars_file
+        try:
+            obj = hcl.loads(content)
+        except Exception:
+            # file which can't be parsed is tracked as a whole
+            return content
+
+        providers = {}
+        for name, config in (obj.get('provider') or {}).items():
+            configs = config if isinstance(config, list) else [config]
+            providers[name] = [c.get('version') for c in configs]
+
+        return {
+            'module': {name: [module.get('source'), module.get('version')]
+                       for name, module in (obj.get('module') or {}).items()},
+            'provider': providers,
+            'terraform': obj.get('terraform')
+        }
 
-    def _update_modules(self, force=False):
-        last_update = os.path.getmtime(self.tfupdate_path) if isfile(self.tfupdate_path) else 0
+    def _templates_revision(self):
+        source = self.ctx.settings.get('terraform', {}).get('templates', '')
+
+        if re.match('^https?://', source) or source.endswith('.git'):
+            return git_head(TEMPLATES_CLONE_DIR)
+
+        return None
 
-        if force or int(last_update) < int(time.time()) - 3600:
-            self._exec(['init', '--upgrade=true'])
-            with open(self.tfupdate_path, 'w+') as f:
-                f.write(str(int(time.time())))
+    def plan_changes(self, plan_path):
+        """
+        Number of resources to add, change and destroy by saved plan
+        :return: dict with add, change and destroy keys, None when plan can't be shown as json (terraform < 0.12)
+        :rtype: dict
+        """
+        summary = self.plan_summary(plan_path)
 
-    def _exec(self, args):
-        click.secho("Executing: " + " ".join([self.cmd] + args), fg="blue")
+        return totals(summary) if summary is not None else None
 
-        p = subprocess.Popen([self.cmd] + args, cwd=self.terraform_dir,
-                             stdout=click.get_text_stream("stdout"),
-                             stderr=click.get_text_stream("stderr"))
-        p.communicate()
+    def plan_summary(self, plan_path):
+        """
+        Changes of saved plan grouped by module, read from `terraform show -json`
+        :return: see stylist.helper.terraform_runs.plan_summary, None when plan can't be shown as json
+        :rtype: OrderedDict
+        """
+        code, out = self._capture(['show', '-json', plan_path])
+        if code != 0:
+            return None
+
+        try:
+            return plan_summary(json.loads(out))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def parse_plan_output(text):
+        """
+        Counts from "Plan: 1 to add, 2 to change, 3 to destroy." line of terraform plan output
+        :rtype: dict
+        """
+        match = re.search(r'Plan: (\d+) to add, (\d+) to change, (\d+) to destroy', text or '')
+        if match:
+            return dict(zip(('add', 'change', 'destroy'), map(int, match.groups())))
+
+        if re.search(r'No changes\.', text or ''):
+            return {'add': 0, 'change': 0, 'destroy': 0}
+
+        return None
+
+    def _exec(self, args, on_line=None):
+        """
+        :param on_line: called with every line of output, which is still written to terminal (or output file)
+        """
+        self._echo("Executing: " + " ".join([self.cmd] + args))
+        stdout = self.output or click.get_text_stream("stdout")
+
+        with span('terraform ' + args[0], 'subprocess', stage=self.stage):
+            p = subprocess.Popen([self.cmd] + args, cwd=self.terraform_dir, env=self._env(),
+                                 stdout=subprocess.PIPE if on_line else stdout,
+                                 stderr=self.output or click.get_text_stream("stderr"))
+
+            if on_line:
+                for line in iter(p.stdout.readline, ''):
+                    stdout.write(line)
+                    stdout.flush()
+                    on_line(line)
+
+            p.communicate()
 
         return p.returncode
 
+    def _capture(self, args):
+        with span('terraform ' + args[0], 'subprocess', stage=self.stage):
+            p = subprocess.Popen([self.cmd] + args, cwd=self.terraform_dir, env=self._env(),
+                                 stdout=subprocess.PIPE,
+                                 stderr=self.output or click.get_text_stream("stderr"))
+            out, _ = p.communicate()
+
+        return p.returncode, out
+
+    def _echo(self, message):
+        if self.output:
+            self.output.write(message + "\n")
+            self.output.flush()
+        else:
+            click.secho(message, fg="blue")
+
+    @property
+    def plugin_cache_dir(self):
+        return os.environ.get('TF_PLUGIN_CACHE_DIR') or expanduser(
+            self.ctx.settings.get('terraform', {}).get('plugin_cache_dir', PLUGIN_CACHE_DIR)
+        )
+
+    def _env(self):
+        env = dict(os.environ)
+        env['TF_PLUGIN_CACHE_DIR'] = self.plugin_cache_dir
+
+        if self.isolated:
+            env['TF_DATA_DIR'] = self.data_dir
+
+        return env
+
     def configure_module(self, module_name, alias):
         self.setup()
         maped_values = {
@@ -178,9 +557,9 @@ class Terraform(object):
         current_vars = {}
         template = self.templates.get_template('terraform/module.jinja2')
 
-        module_dir = join(self.templates.terraform_local_modules_source, module_name)
+        module = self.templates.module_index.get(module_name)
 
-        if not isdir(module_dir):
+        if not module:
             logger.error("Unable to locate '{}' module definition".format(module_name))
             sys.exit(1)
 
@@ -202,34 +581,25 @@ class Terraform(object):
             except Exception:
                 pass
 
-        module_variables = []
+        module_variables = [name for name, _ in module['variables']]
 
-        for tf_file in glob(join(module_dir, '*.tf')):
-            try:
-                with open(tf_file, 'r') as f:
-                    variables = hcl.load(f).get("variable") or {}
-                    module_variables += variables.keys()
-
-                if not variables:
-                    continue
+        for name, default in module['variables']:
+            if name in Terraform.STYLIST_VAR_NAMES:
+                continue
 
-                for name, config in {k: v for k, v in variables.items() if
-                                     k not in Terraform.STYLIST_VAR_NAMES}.items():
-                    if name in maped_values:
-                        values[name] = maped_values.get(name)
-                    else:
-                        prefix = "{feature}({module}) Enter value for: {variable}".format(
-                            feature=style("Terraform", fg="blue"),
-                            module=style(module_name, fg="green"),
-                            variable=name
-                        )
+            if name in maped_values:
+                values[name] = maped_values.get(name)
+            else:
+                prefix = "{feature}({module}) Enter value for: {variable}".format(
+                    feature=style("Terraform", fg="blue"),
+                    module=style(module_name, fg="green"),
+                    variable=name
+                )
 
-                        _val = prompt(prefix, default=current_vars.get(name, config.get("default")))
+                _val = prompt(prefix, default=current_vars.get(name, default))
 
-                        if _val and _val != config.get("default"):
-                            values[name] = _val
-            except Exception as e:
-                print "Error: {}".format(e)
+                if _val and _val != default:
+                    values[name] = _val
 
         rendered = template.render(
             module_name=module_name,
@@ -261,20 +631,53 @@ class Terraform(object):
         if not isdir(self.terraform_dir):
             os.makedirs(self.terraform_dir)
 
-        with open(provider_file, 'w+') as f:
-            template = Template(PROVIDER_TEMPLATE)
-            f.write(template.render())
+        provider = render_string(PROVIDER_TEMPLATE)
+        if _read(provider_file) != provider:
+            # terraform of other stage may be reading the file at the same time
+            atomic_write(provider_file, provider)
 
         if not isfile(join(self.terraform_dir, 'variables.tf')):
             open(join(self.terraform_dir, 'variables.tf'), 'a').close()
 
     def list_modules(self):
-        modules = {}
+        return self.templates.module_index.descriptions()
+
+
+def git_head(path):
+    """
+    Commit checked out in git repository, read directly from .git without starting git
+    """
+    git_dir = join(path, '.git')
+
+    try:
+        with open(join(git_dir, 'HEAD'), 'r') as f:
+            head = f.read().strip()
+
+        if not head.startswith('ref: '):
+            return head
+
+        ref = head[len('ref: '):]
+        if isfile(join(git_dir, ref)):
+            with open(join(git_dir, ref), 'r') as f:
+                return f.read().strip()
+
+        with open(join(git_dir, 'packed-refs'), 'r') as f:
+            for line in f:
+                if line.strip().endswith(' ' + ref):
+                    return line.split()[0]
+    except IOError:
+        pass
+
+    return None
+
 
-        for module in glob(self.templates.terraform_local_modules_source + '/*'):
-            with open(join(module, 'module.tf'), 'r') as f:
-                line = f.readline().strip()
+def _is_local_source(source):
+    return isinstance(source, basestring) and source.startswith(('/', './', '../'))
 
-            modules[basename(module)] = line.replace('## Desc:', '') if line.startswith('## Desc:') else ''
 
-        return modules
+def _read(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except IOError:
+        return None
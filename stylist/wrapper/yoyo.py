@@ -10,6 +10,7 @@ import re
 
 from stylist.commands.cmd_check import which
 from stylist.helper.rds import DbContext, get_connection_credentials
+from stylist.timing import span
 
 
 class Yoyo(object):
@@ -60,7 +61,8 @@ class Yoyo(object):
     def _exec(self, args, env=None):
         click.secho("Executing: " + " ".join([self.cmd] + args), fg="blue")
 
-        p = subprocess.Popen([self.cmd] + args, cwd=self.ctx.working_dir, env=env or {},
-                             stdout=click.get_text_stream("stdout"),
-                             stderr=click.get_text_stream("stderr"))
-        return p.communicate()
+        with span('yoyo ' + args[0], 'subprocess'):
+            p = subprocess.Popen([self.cmd] + args, cwd=self.ctx.working_dir, env=env or {},
+                                 stdout=click.get_text_stream("stdout"),
+                                 stderr=click.get_text_stream("stderr"))
+            return p.communicate()
@@ -0,0 +1,54 @@
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+from stylist.click.manifest import CommandManifest
+
+
+class CountingManifest(CommandManifest):
+    builds = 0
+
+    def build(self):
+        self.builds += 1
+        return super(CountingManifest, self).build()
+
+
+class CommandManifestTest(TestCase):
+    def setUp(self):
+        self.commands_dir = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.manifest_path = join(self.cache_dir, 'commands.json')
+
+        self._touch('cmd_first.py')
+        self._touch('__init__.py')
+
+    def tearDown(self):
+        shutil.rmtree(self.commands_dir)
+        shutil.rmtree(self.cache_dir)
+
+    def _touch(self, name):
+        open(join(self.commands_dir, name), 'w').close()
+
+    def _manifest(self):
+        return CountingManifest(self.commands_dir, self.manifest_path)
+
+    def test_lists_only_command_modules(self):
+        self.assertEqual(['first'], sorted(self._manifest().commands))
+
+    def test_unchanged_commands_are_served_from_manifest(self):
+        self._manifest().load()
+
+        manifest = self._manifest()
+        manifest.load()
+
+        self.assertEqual(0, manifest.builds)
+
+    def test_new_command_module_refreshes_manifest(self):
+        self._manifest().load()
+        self._touch('cmd_second.py')
+
+        manifest = self._manifest()
+
+        self.assertEqual(['first', 'second'], sorted(manifest.commands))
+        self.assertEqual(1, manifest.builds)
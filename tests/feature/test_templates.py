@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+import stylist.feature as feature
+from stylist.feature import Templates
+from stylist.helper.git_sync import GitSyncException
+
+
+class FakeContext(object):
+    def __init__(self, settings):
+        self.settings = settings
+        self.no_cache = False
+
+
+class TemplatesTest(TestCase):
+    def setUp(self):
+        self._sync_repository = feature.sync_repository
+        self._get_environment = feature.get_environment
+        self.synced = []
+
+        # environment isn't used here, it would create bytecode cache in home directory
+        feature.get_environment = lambda: None
+
+    def tearDown(self):
+        feature.sync_repository = self._sync_repository
+        feature.get_environment = self._get_environment
+
+    def _templates(self):
+        return Templates(FakeContext({'terraform': {'templates': '/srv/terraform-modules.git'}}))
+
+    def test_remote_templates_are_synced_once(self):
+        feature.sync_repository = lambda source, destination, interval, force: self.synced.append(source)
+        templates = self._templates()
+
+        self.assertEqual([], self.synced)
+        self.assertEqual(feature.TEMPLATES_CLONE_DIR, templates.terraform_local_modules_source)
+        self.assertEqual(feature.TEMPLATES_CLONE_DIR, templates.terraform_local_modules_source)
+        self.assertEqual(['/srv/terraform-modules.git'], self.synced)
+
+    def test_failed_sync_is_reported(self):
+        def sync(source, destination, interval, force):
+            raise GitSyncException('Unable to clone templates from {}'.format(source))
+
+        feature.sync_repository = sync
+
+        with self.assertRaises(SystemExit) as e:
+            self._templates().terraform_local_modules_source
+
+        self.assertEqual(1, e.exception.code)
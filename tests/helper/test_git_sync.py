@@ -0,0 +1,83 @@
+import shutil
+import subprocess
+import tempfile
+from os.path import isdir, join
+from unittest import TestCase
+
+from stylist.helper.git_sync import GitSyncException, sync_repository
+
+
+def _git(cwd, *args):
+    subprocess.check_output(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com'] + list(args),
+                            cwd=cwd, stderr=subprocess.STDOUT)
+
+
+class SyncRepositoryTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.source = join(self.tmp, 'source')
+        self.destination = join(self.tmp, 'cache', 'templates')
+
+        _git(self.tmp, 'init', '-q', 'source')
+        self.commit('module.tf', '## Desc: first')
+
+        # git ignores --depth for plain local paths
+        self.url = 'file://' + self.source
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def commit(self, name, content):
+        with open(join(self.source, name), 'w') as f:
+            f.write(content)
+        _git(self.source, 'add', name)
+        _git(self.source, 'commit', '-q', '-m', name)
+
+    def read(self, name):
+        with open(join(self.destination, name)) as f:
+            return f.read()
+
+    def test_shallow_clone(self):
+        self.commit('other.tf', '')
+
+        self.assertTrue(sync_repository(self.url, self.destination, 3600))
+        self.assertEqual('## Desc: first', self.read('module.tf'))
+
+        log = subprocess.check_output(['git', 'log', '--oneline'], cwd=self.destination)
+        self.assertEqual(1, len(log.splitlines()))
+
+    def test_update_is_throttled(self):
+        sync_repository(self.url, self.destination, 3600)
+        self.commit('module.tf', '## Desc: second')
+
+        self.assertFalse(sync_repository(self.url, self.destination, 3600))
+        self.assertEqual('## Desc: first', self.read('module.tf'))
+
+    def test_forced_update_moves_to_latest_commit(self):
+        sync_repository(self.url, self.destination, 3600)
+        self.commit('module.tf', '## Desc: second')
+
+        self.assertTrue(sync_repository(self.url, self.destination, 3600, force=True))
+        self.assertEqual('## Desc: second', self.read('module.tf'))
+
+    def test_expired_checkout_is_updated(self):
+        sync_repository(self.url, self.destination, 3600)
+        self.commit('module.tf', '## Desc: second')
+
+        self.assertTrue(sync_repository(self.url, self.destination, 0))
+        self.assertEqual('## Desc: second', self.read('module.tf'))
+
+    def test_unreachable_remote_keeps_last_checkout(self):
+        sync_repository(self.url, self.destination, 3600)
+        shutil.rmtree(self.source)
+
+        self.assertFalse(sync_repository(self.url, self.destination, 0))
+        self.assertEqual('## Desc: first', self.read('module.tf'))
+
+    def test_failed_clone_leaves_nothing_behind(self):
+        shutil.rmtree(self.source)
+
+        with self.assertRaises(GitSyncException):
+            sync_repository(self.url, self.destination, 3600)
+
+        self.assertFalse(isdir(self.destination))
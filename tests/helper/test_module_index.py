@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import time
+from os.path import join
+from unittest import TestCase
+
+from stylist.helper import module_index
+from stylist.helper.module_index import ModuleIndex
+
+MODULE = """## Desc: %s
+variable "name" {}
+variable "context" { type = "map" }
+"""
+
+
+class ModuleIndexTest(TestCase):
+    def setUp(self):
+        self.templates = tempfile.mkdtemp()
+        self.cache = tempfile.mkdtemp()
+        self._user_cache_path = module_index.user_cache_path
+        self._index_module = module_index._index_module
+        module_index.user_cache_path = lambda *parts: join(self.cache, *parts)
+
+        self.indexed = []
+        self.mtime = time.time()
+
+        def index(module_dir, signature):
+            self.indexed.append(os.path.basename(module_dir))
+            return self._index_module(module_dir, signature)
+
+        module_index._index_module = index
+
+        self.write('s3_bucket', 'module.tf', MODULE % 'S3 bucket')
+        self.write('s3_bucket', 'variables.tf', 'variable "versioning" { default = "false" }\n')
+        self.write('sqs', 'module.tf', MODULE % 'SQS queue')
+
+    def tearDown(self):
+        module_index.user_cache_path = self._user_cache_path
+        module_index._index_module = self._index_module
+        shutil.rmtree(self.templates)
+        shutil.rmtree(self.cache)
+
+    def write(self, module, name, content):
+        if not os.path.isdir(join(self.templates, module)):
+            os.makedirs(join(self.templates, module))
+
+        path = join(self.templates, module, name)
+        with open(path, 'w') as f:
+            f.write(content)
+
+        # make sure mtime changes even on file systems with 1s resolution
+        self.mtime += 10
+        os.utime(path, (self.mtime, self.mtime))
+
+    def test_modules_are_indexed(self):
+        index = ModuleIndex(self.templates)
+
+        self.assertEqual([('s3_bucket', ' S3 bucket'), ('sqs', ' SQS queue')], list(index.descriptions().items()))
+        self.assertEqual(
+            [['context', None], ['name', None], ['versioning', 'false']],
+            sorted(index.get('s3_bucket')['variables'])
+        )
+        self.assertIsNone(index.get('missing'))
+
+    def test_only_changed_modules_are_indexed_again(self):
+        ModuleIndex(self.templates).modules
+        self.write('sqs', 'module.tf', MODULE % 'Queue')
+        self.write('sns', 'module.tf', MODULE % 'Topic')
+
+        descriptions = ModuleIndex(self.templates).descriptions()
+
+        self.assertEqual(['s3_bucket', 'sqs', 'sns', 'sqs'], self.indexed)
+        self.assertEqual(' Queue', descriptions['sqs'])
+
+    def test_removed_module(self):
+        ModuleIndex(self.templates).modules
+        shutil.rmtree(join(self.templates, 'sqs'))
+
+        self.assertEqual(['s3_bucket'], list(ModuleIndex(self.templates).modules.keys()))
+
+    def test_same_revision_is_not_checked(self):
+        ModuleIndex(self.templates, 'abc').modules
+        self.write('sqs', 'module.tf', MODULE % 'Queue')
+
+        self.assertEqual(' SQS queue', ModuleIndex(self.templates, 'abc').get('sqs')['description'])
+        self.assertEqual(' Queue', ModuleIndex(self.templates, 'def').get('sqs')['description'])
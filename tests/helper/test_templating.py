@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+from stylist.helper import templating
+
+
+class EnvironmentTest(TestCase):
+    def setUp(self):
+        self.templates = tempfile.mkdtemp()
+        self.cache = tempfile.mkdtemp()
+
+        self._templates_dir = templating.INTERNAL_TEMPLATES_DIR
+        self._user_cache_path = templating.user_cache_path
+        templating.INTERNAL_TEMPLATES_DIR = self.templates
+        templating.user_cache_path = lambda *parts: join(self.cache, *parts)
+        templating._environment = None
+
+        os.makedirs(join(self.templates, 'docker'))
+        with open(join(self.templates, 'docker', 'Dockerfile.jinja2'), 'w') as f:
+            f.write('FROM {{ base_image }}\n')
+
+    def tearDown(self):
+        templating.INTERNAL_TEMPLATES_DIR = self._templates_dir
+        templating.user_cache_path = self._user_cache_path
+        templating._environment = None
+
+        shutil.rmtree(self.templates)
+        shutil.rmtree(self.cache)
+
+    def test_environment_is_shared(self):
+        self.assertIs(templating.get_environment(), templating.get_environment())
+
+    def test_compiled_template_is_kept_in_bytecode_cache(self):
+        template = templating.get_environment().get_template('docker/Dockerfile.jinja2')
+
+        self.assertEqual('FROM python:3-stretch', template.render(base_image='python:3-stretch'))
+        self.assertEqual(1, len(os.listdir(join(self.cache, 'jinja'))))
+
+        # new process starts with empty environment but loads bytecode written by the previous one
+        templating._environment = None
+        template = templating.get_environment().get_template('docker/Dockerfile.jinja2')
+
+        self.assertEqual('FROM alpine', template.render(base_image='alpine'))
+        self.assertEqual(1, len(os.listdir(join(self.cache, 'jinja'))))
+
+    def test_static_template_is_rendered_once(self):
+        source = 'variable "context" {}'
+
+        self.assertEqual(source, templating.render_string(source))
+        self.assertIs(templating.render_string(source), templating.render_string(source))
@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+from unittest import TestCase
+
+from stylist.helper import terraform_runs
+from stylist.helper.terraform_runs import ApplyRecorder, RunHistory, parse_duration, plan_summary, totals
+
+PLAN = {'resource_changes': [
+    {'address': 'module.web.aws_lb.main', 'module_address': 'module.web', 'change': {'actions': ['update']}},
+    {'address': 'aws_s3_bucket.files', 'change': {'actions': ['create']}},
+    {'address': 'module.web.aws_ecs_service.web', 'module_address': 'module.web',
+     'change': {'actions': ['delete', 'create']}},
+    {'address': 'aws_iam_role.old', 'change': {'actions': ['delete']}},
+    {'address': 'aws_s3_bucket.logs', 'change': {'actions': ['no-op']}},
+]}
+
+
+class PlanSummaryTest(TestCase):
+    def test_grouped_by_module(self):
+        summary = plan_summary(PLAN)
+
+        self.assertEqual(['root', 'module.web'], list(summary.keys()))
+        self.assertEqual([('delete', 'aws_iam_role.old'), ('create', 'aws_s3_bucket.files')],
+                         summary['root']['resources'])
+        self.assertEqual({'add': 1, 'change': 1, 'destroy': 1},
+                         {k: summary['module.web'][k] for k in ('add', 'change', 'destroy')})
+
+    def test_totals(self):
+        self.assertEqual({'add': 2, 'change': 1, 'destroy': 2}, totals(plan_summary(PLAN)))
+
+    def test_no_changes(self):
+        self.assertFalse(terraform_runs.has_changes(plan_summary({'resource_changes': None})))
+
+
+class ApplyRecorderTest(TestCase):
+    def test_durations(self):
+        recorder = ApplyRecorder()
+        for line in [
+            'aws_s3_bucket.files: Creating...\n',
+            '\x1b[0m\x1b[1maws_s3_bucket.files: Creation complete after 3s (ID: files)\x1b[0m\n',
+            'module.web.aws_ecs_service.web: Modifications complete after 1m12s [id=web]\n',
+            'aws_iam_role.old: Destruction complete after 1h0m1s\n',
+            'Apply complete! Resources: 1 added, 1 changed, 1 destroyed.\n',
+        ]:
+            recorder.feed(line)
+
+        self.assertEqual([
+            ('aws_s3_bucket.files', {'action': 'create', 'seconds': 3}),
+            ('module.web.aws_ecs_service.web', {'action': 'update', 'seconds': 72}),
+            ('aws_iam_role.old', {'action': 'delete', 'seconds': 3601}),
+        ], list(recorder.resources.items()))
+
+    def test_parse_duration(self):
+        self.assertEqual(0, parse_duration(''))
+        self.assertEqual(125, parse_duration('2m5s'))
+
+
+class RunHistoryTest(TestCase):
+    def setUp(self):
+        self.terraform_dir = tempfile.mkdtemp()
+        self.history = RunHistory(self.terraform_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.terraform_dir)
+
+    def _record(self, started, stage, seconds):
+        resources = {address: {'action': 'update', 'seconds': s} for address, s in seconds.items()}
+        self.history.record(stage, started, started + 60, 0, resources)
+
+    def test_slowest_with_trend(self):
+        self._record(1000, 'prod', {'aws_ecs_service.web': 100, 'aws_lb.main': 10})
+        self._record(2000, 'prod', {'aws_ecs_service.web': 200})
+        self._record(2500, 'uat', {'aws_ecs_service.web': 5})
+        self._record(3000, 'prod', {'aws_ecs_service.web': 300, 'aws_lb.main': 5, 'aws_s3_bucket.new': 1})
+
+        self.assertEqual([
+            ['aws_ecs_service.web', 'update', 300, '150.0', 200, 2, '+100%'],
+            ['aws_lb.main', 'update', 5, '10.0', 10, 1, '-50%'],
+            ['aws_s3_bucket.new', 'update', 1, '-', '-', 0, '-'],
+        ], self.history.slowest('prod'))
+
+        self.assertEqual(1, len(self.history.slowest('prod', limit=1)))
+        self.assertEqual([], RunHistory(tempfile.gettempdir() + '/missing').slowest())
+
+    def test_history_is_pruned(self):
+        size, terraform_runs.HISTORY_SIZE = terraform_runs.HISTORY_SIZE, 2
+        try:
+            for started in (1000, 2000, 3000):
+                self._record(started, 'prod', {})
+        finally:
+            terraform_runs.HISTORY_SIZE = size
+
+        self.assertEqual([2000, 3000], [run['started'] for run in self.history.runs()])
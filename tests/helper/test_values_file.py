@@ -0,0 +1,54 @@
+from StringIO import StringIO
+from unittest import TestCase
+
+from stylist.helper.values_file import ValuesFileException, detect_format, read_values, write_values
+
+VALUES = [('USER', 'app'), ('PASSWORD', 'p@ss "word"\nwith newline'), ('EMPTY', ''), ('URL', 'https://x.io/a?b=1')]
+
+
+class ValuesFileTest(TestCase):
+    def _round_trip(self, fmt):
+        out = StringIO()
+        self.assertEqual(len(VALUES), write_values(out, fmt, iter(VALUES)))
+
+        self.assertEqual(dict(VALUES), dict(read_values(StringIO(out.getvalue()), fmt)))
+
+    def test_dotenv_round_trip(self):
+        self._round_trip('dotenv')
+
+    def test_json_round_trip(self):
+        self._round_trip('json')
+
+    def test_yaml_round_trip(self):
+        self._round_trip('yaml')
+
+    def test_non_ascii_round_trip(self):
+        values = [('NAME', u'za\u017c\xf3\u0142\u0107 x'), ('PLAIN', u'za\u017c\xf3\u0142\u0107')]
+
+        for fmt in ('dotenv', 'json', 'yaml'):
+            out = StringIO()
+            write_values(out, fmt, iter(values))
+
+            read = read_values(StringIO(out.getvalue()), fmt)
+            self.assertEqual(dict(values), dict(read))
+            self.assertTrue(all(isinstance(value, unicode) for value in read.values()))
+
+    def test_dotenv(self):
+        values = read_values(StringIO('# comment\n\nexport A=1\nB = \'two words\'\nC="a\\"b"\n'), 'dotenv')
+
+        self.assertEqual([('A', '1'), ('B', 'two words'), ('C', 'a"b')], values.items())
+
+    def test_scalars_are_converted_to_strings(self):
+        values = read_values(StringIO('port: 5432\nssl: true\nempty:\n'), 'yaml')
+
+        self.assertEqual({'port': '5432', 'ssl': 'true', 'empty': ''}, dict(values))
+
+    def test_nested_values_are_rejected(self):
+        with self.assertRaises(ValuesFileException):
+            read_values(StringIO('{"db": {"port": 5432}}'), 'json')
+
+    def test_detect_format(self):
+        self.assertEqual('json', detect_format('values.JSON'))
+        self.assertEqual('yaml', detect_format('values.yml'))
+        self.assertEqual('dotenv', detect_format('.env'))
+        self.assertEqual('dotenv', detect_format('<stdout>'))
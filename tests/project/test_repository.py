@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+from stylist.project.repository import find_git_config, project_name, read_remote_url
+
+GIT_CONFIG = """[core]
+\trepositoryformatversion = 0
+\tbare = false
+[remote "upstream"]
+\turl = git@github.com:Other/fork.git
+[remote "origin"]
+\turl = git@github.com:ThreadsStylingLtd/www.threads.example.com.git
+\tfetch = +refs/heads/*:refs/remotes/origin/*
+"""
+
+
+class RepositoryTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.repo = join(self.root, 'repo')
+        os.makedirs(join(self.repo, '.git'))
+
+        with open(join(self.repo, '.git', 'config'), 'w') as f:
+            f.write(GIT_CONFIG)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_reads_origin_url(self):
+        self.assertEqual(
+            'git@github.com:ThreadsStylingLtd/www.threads.example.com.git',
+            read_remote_url(find_git_config(self.repo))
+        )
+
+    def test_missing_remote(self):
+        self.assertIsNone(read_remote_url(find_git_config(self.repo), 'missing'))
+
+    def test_worktree_uses_common_config(self):
+        worktree_git_dir = join(self.repo, '.git', 'worktrees', 'feature')
+        os.makedirs(worktree_git_dir)
+        with open(join(worktree_git_dir, 'commondir'), 'w') as f:
+            f.write('../..\n')
+
+        worktree = join(self.root, 'feature')
+        os.mkdir(worktree)
+        with open(join(worktree, '.git'), 'w') as f:
+            f.write('gitdir: {}\n'.format(worktree_git_dir))
+
+        self.assertEqual(join(self.repo, '.git', 'config'), find_git_config(worktree))
+
+    def test_project_name_with_exclusions(self):
+        self.assertEqual('www.threads', project_name(self.repo, ['.example.com']))
+
+    def test_project_name_is_cached_per_exclusions(self):
+        cache_file = join(self.root, 'cache', 'project')
+
+        self.assertEqual('www.threads', project_name(self.repo, ['.example.com'], cache_file))
+        self.assertEqual('threads.example.com', project_name(self.repo, ['www.'], cache_file))
+
+    def test_not_a_repository(self):
+        self.assertIsNone(project_name(self.root))
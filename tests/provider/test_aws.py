@@ -0,0 +1,448 @@
+import os
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+from stylist.provider import aws
+
+
+class FakeContext(object):
+    no_cache = False
+
+    def __init__(self, settings=None):
+        self.settings = settings or {}
+
+
+class ClientPoolTest(TestCase):
+    def setUp(self):
+        self.aws_dir = tempfile.mkdtemp()
+        self._environ = dict(os.environ)
+
+        os.environ['AWS_CONFIG_FILE'] = join(self.aws_dir, 'config')
+        os.environ['AWS_SHARED_CREDENTIALS_FILE'] = join(self.aws_dir, 'credentials')
+
+        with open(os.environ['AWS_CONFIG_FILE'], 'w') as f:
+            f.write('[profile dev]\nregion = eu-west-1\n[profile prod]\nregion = us-east-1\n')
+
+        with open(os.environ['AWS_SHARED_CREDENTIALS_FILE'], 'w') as f:
+            f.write('[dev]\naws_access_key_id = a\naws_secret_access_key = b\n'
+                    '[prod]\naws_access_key_id = c\naws_secret_access_key = d\n')
+
+        self._clear()
+        self.provider = aws.AWSProvider(FakeContext({'stylist': {'provider': {'prefix': ''}}}))
+        self.provider.values['profile'] = 'dev'
+
+    def tearDown(self):
+        self._clear()
+        os.environ.clear()
+        os.environ.update(self._environ)
+        shutil.rmtree(self.aws_dir)
+
+    def _clear(self):
+        aws._sessions.clear()
+        aws._clients.clear()
+
+    def test_client_is_reused(self):
+        self.assertIs(self.provider.client('ssm'), self.provider.client('ssm'))
+        self.assertIs(self.provider.client('ssm'), self.provider.ssm.ssm)
+
+    def test_client_per_profile_region_and_service(self):
+        ssm = self.provider.client('ssm')
+
+        self.assertIsNot(ssm, self.provider.client('kms'))
+        self.assertIsNot(ssm, self.provider.client('ssm', region='us-west-2'))
+        self.assertIsNot(ssm, self.provider.client('ssm', profile='prod'))
+        self.assertEqual('us-east-1', self.provider.client('ssm', profile='prod').meta.region_name)
+
+    def test_stage_session_comes_from_pool(self):
+        self.assertIs(self.provider.get_session('prod'), self.provider.get_session_for_stage('prod'))
+
+    def test_service_models_are_shared_between_sessions(self):
+        dev = self.provider.get_session('dev')._session
+        prod = self.provider.get_session('prod')._session
+
+        self.assertIs(dev.get_component('data_loader'), prod.get_component('data_loader'))
+
+    def test_changed_credentials_create_new_client(self):
+        ssm = self.provider.client('ssm')
+        os.environ['AWS_DEFAULT_REGION'] = 'eu-central-1'
+
+        self.assertIsNot(ssm, self.provider.client('ssm'))
+
+    def test_max_pool_connections(self):
+        self.provider.ctx.settings['aws'] = {'max_pool_connections': 25}
+
+        self.assertEqual(25, self.provider.client('ssm').meta.config.max_pool_connections)
+
+    def test_calls_are_recorded_with_status_and_retries(self):
+        import botocore.endpoint
+        from stylist.provider.aws_stats import stats
+
+        ssm = self.provider.client('ssm')
+        responses = [
+            (FakeHTTPResponse(400), {'Error': {'Code': 'ThrottlingException'}, 'ResponseMetadata': {}}),
+            (FakeHTTPResponse(200), {'Parameters': [], 'ResponseMetadata': {}})
+        ]
+        ssm._endpoint._get_response = lambda request, operation_model, attempts: (responses.pop(0), None)
+
+        stats.reset()
+        _time, botocore.endpoint.time = botocore.endpoint.time, NoSleep
+        try:
+            ssm.describe_parameters()
+        finally:
+            botocore.endpoint.time = _time
+
+        self.assertEqual([['ssm', 'DescribeParameters', 1, 0, 1, 1]], [row[:6] for row in stats.summary()])
+        self.assertEqual(200, stats.calls[0].status)
+
+
+class FakeHTTPResponse(object):
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+        self.content = ''
+
+
+class NoSleep(object):
+    @staticmethod
+    def sleep(seconds):
+        pass
+
+
+class FakeSTS(object):
+    calls = 0
+
+    def get_caller_identity(self):
+        self.calls += 1
+        return {'Account': '123456789012', 'Arn': 'arn:aws:iam::123456789012:user/dev', 'UserId': 'AIDA'}
+
+
+class FakeKMS(object):
+    calls = 0
+
+    class exceptions(object):
+        class NotFoundException(Exception):
+            pass
+
+    class meta(object):
+        region_name = 'eu-west-1'
+
+    def describe_key(self, KeyId):
+        self.calls += 1
+        return {'KeyMetadata': {'KeyId': 'key-' + KeyId}}
+
+
+class FakePaginatedClient(object):
+    class meta(object):
+        region_name = 'eu-west-1'
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def get_paginator(self, operation):
+        client = self
+
+        class Paginator(object):
+            def paginate(self, **kwargs):
+                client.calls.append(operation)
+
+                for page in client.pages[operation]:
+                    yield {key: [{k: v.format(**kwargs) for k, v in item.items()} for item in items]
+                           for key, items in page.items()}
+
+        return Paginator()
+
+
+class UserCacheTestCase(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self._cache_files = aws.IDENTITY_CACHE_FILE, aws.KMS_KEY_CACHE_FILE, aws.CONTEXT_CACHE_FILE
+        self._environ = dict(os.environ)
+        aws.IDENTITY_CACHE_FILE = join(self.cache_dir, 'identity.json')
+        aws.KMS_KEY_CACHE_FILE = join(self.cache_dir, 'kms-keys.json')
+        aws.CONTEXT_CACHE_FILE = join(self.cache_dir, 'terraform-context.json')
+        aws._kms_keys.clear()
+
+        self.sts = FakeSTS()
+        self.kms = FakeKMS()
+        self.elbv2 = FakePaginatedClient({
+            'describe_load_balancers': [
+                {'LoadBalancers': [{'LoadBalancerName': 'main', 'LoadBalancerArn': 'lb-main'}]},
+                {'LoadBalancers': [{'LoadBalancerName': 'internal', 'LoadBalancerArn': 'lb-internal'}]}
+            ],
+            'describe_listeners': [
+                {'Listeners': [{'Protocol': 'HTTPS', 'ListenerArn': 'https-{LoadBalancerArn}'}]},
+                {'Listeners': [{'Protocol': 'HTTP', 'ListenerArn': 'http-{LoadBalancerArn}'}]}
+            ]
+        })
+        self.apigateway = FakePaginatedClient({
+            'get_rest_apis': [{'items': [{'name': 'a', 'id': '1'}]}, {'items': [{'name': 'b', 'id': '2'}]}]
+        })
+        self.settings = {}
+
+    def tearDown(self):
+        aws.IDENTITY_CACHE_FILE, aws.KMS_KEY_CACHE_FILE, aws.CONTEXT_CACHE_FILE = self._cache_files
+        aws._kms_keys.clear()
+        os.environ.clear()
+        os.environ.update(self._environ)
+        shutil.rmtree(self.cache_dir)
+
+    def _provider(self, profile='dev'):
+        provider = aws.AWSProvider(FakeContext(self.settings))
+        provider.values['profile'] = profile
+        provider.client = lambda service, profile=None: {
+            'sts': self.sts, 'kms': self.kms, 'elbv2': self.elbv2, 'apigateway': self.apigateway
+        }[service]
+
+        return provider
+
+
+class CallerIdentityCacheTest(UserCacheTestCase):
+
+    def test_identity_is_cached_between_commands(self):
+        self.assertEqual('123456789012', self._provider().account_id)
+        self.assertEqual('123456789012', self._provider().account_id)
+
+        self.assertEqual(1, self.sts.calls)
+
+    def test_identity_is_cached_per_profile(self):
+        self._provider('dev').account_id
+        self._provider('prod').account_id
+        self._provider('dev').account_id
+
+        self.assertEqual(2, self.sts.calls)
+
+    def test_changed_credentials_invalidate_cache(self):
+        self._provider().account_id
+        os.environ['AWS_ACCESS_KEY_ID'] = 'other'
+        self._provider().account_id
+
+        self.assertEqual(2, self.sts.calls)
+
+    def test_expired_identity_is_refreshed(self):
+        self.settings['aws'] = {'identity_ttl': -1}
+
+        self._provider().account_id
+        self._provider().account_id
+
+        self.assertEqual(2, self.sts.calls)
+
+    def test_secrets_are_not_written_to_disk(self):
+        os.environ['AWS_SECRET_ACCESS_KEY'] = 'very-secret'
+        self._provider().account_id
+
+        with open(aws.IDENTITY_CACHE_FILE) as f:
+            self.assertNotIn('very-secret', f.read())
+
+
+class ParameterStoreKeyCacheTest(UserCacheTestCase):
+    def test_key_is_resolved_once(self):
+        provider = self._provider()
+
+        for _ in range(5):
+            self.assertEqual('key-alias/parameter_store_key', provider.parameter_store_key())
+
+        self.assertEqual(1, self.kms.calls)
+
+    def test_key_is_cached_on_disk(self):
+        self._provider().parameter_store_key()
+        aws._kms_keys.clear()
+        self._provider().parameter_store_key()
+
+        self.assertEqual(1, self.kms.calls)
+
+    def test_encryption_key(self):
+        ctx = FakeContext()
+        ctx.provider = self._provider()
+
+        self.assertEqual('key-alias/parameter_store_key', aws.SSM(None, ctx).get_encryption_key().get('TargetKeyId'))
+
+    def test_missing_key_is_not_cached(self):
+        def missing(KeyId):
+            self.kms.calls += 1
+            raise FakeKMS.exceptions.NotFoundException()
+
+        self.kms.describe_key = missing
+
+        self.assertIsNone(self._provider().parameter_store_key())
+        self.assertIsNone(self._provider().parameter_store_key())
+        self.assertEqual(2, self.kms.calls)
+
+
+class TerraformContextTest(UserCacheTestCase):
+    def test_all_pages_are_discovered(self):
+        self.assertEqual({
+            'alb_main_arn_https': 'https-lb-main',
+            'alb_main_arn_http': 'http-lb-main',
+            'alb_internal_arn_https': 'https-lb-internal',
+            'alb_internal_arn_http': 'http-lb-internal',
+            'api_a': '1',
+            'api_b': '2'
+        }, self._provider().terraform_context())
+
+        self.assertEqual(2, self.elbv2.calls.count('describe_listeners'))
+
+    def test_context_is_cached(self):
+        self._provider().terraform_context()
+        self._provider().terraform_context()
+
+        self.assertEqual(1, self.apigateway.calls.count('get_rest_apis'))
+
+    def test_refresh(self):
+        self._provider().terraform_context()
+        self._provider().terraform_context(refresh=True)
+
+        self.assertEqual(2, self.apigateway.calls.count('get_rest_apis'))
+
+    def test_forgotten_context_is_discovered_again(self):
+        self._provider().terraform_context()
+        self._provider().forget_terraform_context()
+        self._provider().terraform_context()
+
+        self.assertEqual(2, self.apigateway.calls.count('get_rest_apis'))
+
+
+class FakeSSMClient(object):
+    class meta(object):
+        region_name = 'eu-west-1'
+
+    def __init__(self, names, page_size=50):
+        self.names = names
+        self.page_size = page_size
+        self.versions = {}
+        self.batches = []
+
+    def get_paginator(self, operation):
+        return self
+
+    def paginate(self, **kwargs):
+        for i in range(0, len(self.names), self.page_size):
+            yield {'Parameters': [
+                {'Name': name, 'Version': self.versions.get(name, 1)} for name in self.names[i:i + self.page_size]
+            ]}
+
+    def get_parameters(self, Names, WithDecryption):
+        self.batches.append(Names)
+        return {'Parameters': [{'Name': name, 'Value': name.upper()} for name in Names]}
+
+
+class NamespaceSSM(aws.SSM):
+    def _resolve_namespace(self, resource):
+        return '/' + resource.replace(':', '/') + '/'
+
+
+class SSMFetchTest(TestCase):
+    def test_all_pages_are_fetched_in_batches(self):
+        names = ['/service/app/key{:03}'.format(i) for i in range(123)]
+        client = FakeSSMClient(names)
+        ssm = NamespaceSSM(client, FakeContext(), 'dev')
+        ssm._cache = aws.ParameterCache('dev', 'eu-west-1', 0)
+
+        (namespace, parameters, values), = ssm.fetch_namespaces(['service:app'])
+
+        self.assertEqual('/service/app/', namespace)
+        self.assertEqual(names, [param['Name'] for param in parameters])
+        self.assertEqual(set(names), set(values))
+        self.assertEqual(13, len(client.batches))
+        self.assertTrue(all(len(batch) <= aws.SSM_BATCH_SIZE for batch in client.batches))
+
+    def test_namespaces_are_returned_in_order(self):
+        client = FakeSSMClient(['/service/app/key'])
+        ssm = NamespaceSSM(client, FakeContext(), 'dev')
+        ssm._cache = aws.ParameterCache('dev', 'eu-west-1', 0)
+
+        namespaces = [namespace for namespace, _, _ in ssm.fetch_namespaces(['service:a', 'service:b', 'service:c'])]
+
+        self.assertEqual(['/service/a/', '/service/b/', '/service/c/'], namespaces)
+
+
+class ShortNameSSM(NamespaceSSM):
+    @staticmethod
+    def normalize_name(namespace, name, env, exclude_namespace):
+        return name[len(namespace):]
+
+
+class SSMShortParametersTest(TestCase):
+    def test_nested_parameters_are_excluded(self):
+        client = FakeSSMClient(['/master/db/user', '/master/db/replica/user', '/master/db/password'])
+        ssm = ShortNameSSM(client, FakeContext(), 'dev')
+        ssm._cache = aws.ParameterCache('dev', 'eu-west-1', 0)
+
+        self.assertEqual({'user': '/MASTER/DB/USER', 'password': '/MASTER/DB/PASSWORD'},
+                         ssm.get_short_parameters('master:db'))
+
+
+class FakeProvider(object):
+    def parameter_store_key(self, profile=None):
+        return 'key'
+
+    def aws_setting(self, name, default):
+        return 1000
+
+
+class WritingSSMClient(object):
+    def __init__(self):
+        self.puts = []
+        self.tags = []
+
+    def put_parameter(self, **kwargs):
+        if kwargs['Value'] == 'invalid':
+            raise ValueError('invalid value')
+
+        self.puts.append(kwargs)
+
+    def add_tags_to_resource(self, **kwargs):
+        self.tags.append(kwargs['ResourceId'])
+
+
+class PathSSM(NamespaceSSM):
+    def get_full_name(self, *namespace, **kwargs):
+        return '/{}/{}'.format('/'.join(namespace), kwargs['parameter'])
+
+
+class SSMWriteManyTest(TestCase):
+    def setUp(self):
+        ctx = FakeContext()
+        ctx.provider = FakeProvider()
+
+        self.client = WritingSSMClient()
+        self.ssm = PathSSM(self.client, ctx)
+
+    def test_all_parameters_are_written(self):
+        written, failed = self.ssm.write_many('service:app', {'user': 'app', 'password': 'secret'},
+                                              tags={'role': 'app'})
+
+        self.assertEqual({'user': '/service/app/user', 'password': '/service/app/password'}, written)
+        self.assertEqual({}, failed)
+        self.assertEqual({'key'}, {put['KeyId'] for put in self.client.puts})
+        self.assertEqual(sorted(written.values()), sorted(self.client.tags))
+
+    def test_tagging_is_rate_limited(self):
+        acquired = []
+
+        class CountingBucket(object):
+            def __init__(self, rate):
+                pass
+
+            def acquire(self):
+                acquired.append(1)
+
+        token_bucket = aws.TokenBucket
+        aws.TokenBucket = CountingBucket
+        try:
+            self.ssm.write_many('service:app', {'user': 'app', 'password': 'secret'}, tags={'role': 'app'})
+        finally:
+            aws.TokenBucket = token_bucket
+
+        # one token for each put_parameter and each add_tags_to_resource
+        self.assertEqual(4, len(acquired))
+
+    def test_failure_does_not_stop_batch(self):
+        written, failed = self.ssm.write_many('service:app', {'user': 'app', 'host': 'invalid'}, encrypt=False)
+
+        self.assertEqual(['user'], written.keys())
+        self.assertEqual(['host'], failed.keys())
+        self.assertIsInstance(failed['host'], ValueError)
+        self.assertEqual('String', self.client.puts[0]['Type'])
@@ -0,0 +1,48 @@
+import json
+import os
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+from stylist.provider.aws_stats import CallStats
+
+
+class CallStatsTest(TestCase):
+    def setUp(self):
+        self.stats = CallStats()
+
+    def test_summary_per_operation_most_called_first(self):
+        self.stats.record('elbv2', 'DescribeListeners', 10.0, 10.1, 200)
+        self.stats.record('sts', 'GetCallerIdentity', 10.0, 10.5, 200)
+        self.stats.record('elbv2', 'DescribeListeners', 11.0, 11.3, 400, error='Throttling', retries=2, throttled=2)
+
+        summary = self.stats.summary()
+
+        self.assertEqual(['elbv2', 'DescribeListeners', 2, 1, 2, 2], summary[0][:6])
+        self.assertAlmostEqual(0.4, summary[0][6])
+        self.assertAlmostEqual(0.3, summary[0][7])
+        self.assertEqual(['sts', 'GetCallerIdentity', 1, 0, 0, 0], summary[1][:6])
+
+    def test_json_export(self):
+        self.stats.record('ssm', 'GetParameters', 10.0, 10.25, 200, retries=1)
+
+        path = join(tempfile.mkdtemp(), 'stats.json')
+        try:
+            self.stats.write_json(path)
+
+            with open(path) as f:
+                data = json.load(f)
+        finally:
+            shutil.rmtree(os.path.dirname(path))
+
+        self.assertEqual('GetParameters', data['summary'][0]['operation'])
+        self.assertEqual(1, data['summary'][0]['calls'])
+        self.assertEqual({'service': 'ssm', 'operation': 'GetParameters', 'start': 10.0, 'duration': 0.25,
+                          'status': 200, 'error': None, 'retries': 1, 'throttled': 0}, data['calls'][0])
+
+    def test_reset(self):
+        self.stats.record('ssm', 'GetParameters', 10.0, 10.25, 200)
+        self.stats.reset()
+
+        self.assertEqual([], self.stats.summary())
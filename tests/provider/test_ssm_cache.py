@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+from unittest import SkipTest, TestCase
+
+from stylist.provider import ssm_cache
+from stylist.provider.ssm_cache import ParameterCache
+from tests.provider.test_aws import FakeContext, FakeSSMClient, NamespaceSSM
+
+
+class FakeProvider(object):
+    profile = 'dev'
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    def aws_setting(self, name, default):
+        return self.ttl if name == 'ssm_cache_ttl' else default
+
+
+class ParameterCacheTest(TestCase):
+    def setUp(self):
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            raise SkipTest('cryptography is not installed')
+
+        self.cache_dir = tempfile.mkdtemp()
+        self._cache_dir = ssm_cache.CACHE_DIR
+        ssm_cache.CACHE_DIR = self.cache_dir
+        ssm_cache._fernet[:] = [Fernet(Fernet.generate_key())]
+
+        self.names = ['/service/app/user', '/service/app/password']
+        self.client = FakeSSMClient(self.names)
+
+    def tearDown(self):
+        ssm_cache.CACHE_DIR = self._cache_dir
+        del ssm_cache._fernet[:]
+        shutil.rmtree(self.cache_dir)
+
+    def _fetch(self, ttl=3600, no_cache=False):
+        ctx = FakeContext()
+        ctx.no_cache = no_cache
+        ctx.provider = FakeProvider(ttl)
+
+        (_, _, values), = NamespaceSSM(self.client, ctx, 'dev').fetch_namespaces(['service:app'])
+
+        return {name: value['Value'] for name, value in values.items()}
+
+    def _fetched(self):
+        return sorted(name for batch in self.client.batches for name in batch)
+
+    def test_unchanged_values_are_not_fetched_again(self):
+        first = self._fetch()
+        second = self._fetch()
+
+        self.assertEqual(first, second)
+        self.assertEqual(sorted(self.names), self._fetched())
+
+    def test_changed_version_is_fetched(self):
+        self._fetch()
+        self.client.versions['/service/app/password'] = 2
+        self._fetch()
+
+        self.assertEqual(sorted(self.names + ['/service/app/password']), self._fetched())
+
+    def test_disabled_without_ttl(self):
+        self._fetch(ttl=0)
+        self._fetch(ttl=0)
+
+        self.assertEqual(sorted(self.names * 2), self._fetched())
+
+    def test_no_cache_bypasses_cache(self):
+        self._fetch()
+        self._fetch(no_cache=True)
+
+        self.assertEqual(sorted(self.names * 2), self._fetched())
+
+    def test_values_are_encrypted_at_rest(self):
+        cache = ParameterCache('dev', 'eu-west-1', 3600)
+        cache.store('/service/app/', [{'Name': '/service/app/password', 'Version': 1}],
+                    {'/service/app/password': {'Type': 'SecureString', 'Value': 'very-secret'}})
+
+        with open(cache._path('/service/app/'), 'rb') as f:
+            self.assertNotIn('very-secret', f.read())
+
+        self.assertEqual('very-secret', cache.load('/service/app/')['/service/app/password']['Value'])
+
+    def test_cache_of_other_profile_is_not_used(self):
+        cache = ParameterCache('dev', 'eu-west-1', 3600)
+        cache.store('/service/app/', [{'Name': '/service/app/password', 'Version': 1}],
+                    {'/service/app/password': {'Type': 'SecureString', 'Value': 'very-secret'}})
+
+        self.assertEqual({}, ParameterCache('prod', 'eu-west-1', 3600).load('/service/app/'))
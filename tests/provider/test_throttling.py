@@ -0,0 +1,66 @@
+import time
+from unittest import TestCase
+
+from stylist.provider import throttling
+from stylist.provider.throttling import TokenBucket, call_with_backoff
+
+
+class ClientError(Exception):
+    def __init__(self, code):
+        super(ClientError, self).__init__(code)
+        self.response = {'Error': {'Code': code}}
+
+
+class TokenBucketTest(TestCase):
+    def test_burst_is_not_delayed(self):
+        bucket = TokenBucket(1, 5)
+
+        started = time.time()
+        for _ in range(5):
+            bucket.acquire()
+
+        self.assertLess(time.time() - started, 0.1)
+
+    def test_rate_is_limited_after_burst(self):
+        bucket = TokenBucket(20, 1)
+
+        started = time.time()
+        for _ in range(5):
+            bucket.acquire()
+
+        self.assertGreaterEqual(time.time() - started, 0.15)
+
+
+class CallWithBackoffTest(TestCase):
+    def setUp(self):
+        self._sleep = throttling.time.sleep
+        throttling.time.sleep = lambda seconds: None
+        self.calls = 0
+
+    def tearDown(self):
+        throttling.time.sleep = self._sleep
+
+    def _failing(self, code, times):
+        def call(**kwargs):
+            self.calls += 1
+            if self.calls <= times:
+                raise ClientError(code)
+            return kwargs
+
+        return call
+
+    def test_throttled_call_is_retried(self):
+        self.assertEqual({'Name': 'a'}, call_with_backoff(self._failing('ThrottlingException', 3), Name='a'))
+        self.assertEqual(4, self.calls)
+
+    def test_gives_up_after_retries(self):
+        with self.assertRaises(ClientError):
+            call_with_backoff(self._failing('ThrottlingException', 10), retries=2)
+
+        self.assertEqual(3, self.calls)
+
+    def test_other_errors_are_not_retried(self):
+        with self.assertRaises(ClientError):
+            call_with_backoff(self._failing('ParameterLimitExceeded', 1))
+
+        self.assertEqual(1, self.calls)
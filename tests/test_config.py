@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+import stylist.config as config
+
+
+class ConfigCacheTest(TestCase):
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.project = tempfile.mkdtemp()
+        self._home = os.environ.get('HOME')
+        os.environ['HOME'] = self.home
+        os.mkdir(join(self.home, '.stylist'))
+
+        self.config_file = join(self.project, 'config.yml')
+        self.cache_file = join(self.project, 'cache', 'settings')
+        self._get = config.get
+
+        config._loaded.clear()
+
+    def tearDown(self):
+        config.get = self._get
+        config._loaded.clear()
+        os.environ['HOME'] = self._home
+        shutil.rmtree(self.home)
+        shutil.rmtree(self.project)
+
+    def _write(self, path, content):
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def _load(self):
+        config._loaded.clear()
+        return config.load(self.config_file, 'config.yml', self.cache_file)
+
+    def test_unchanged_config_is_loaded_from_cache(self):
+        self._write(self.config_file, 'stylist:\n  stages: [prod, uat]\n')
+        self._load()
+
+        def fail(*args):
+            raise AssertionError('config files should not be parsed')
+
+        config.get = fail
+
+        self.assertEqual({'stylist': {'stages': ['prod', 'uat']}}, self._load())
+
+    def test_cache_dir_is_ignored_by_git(self):
+        self._write(self.config_file, 'stylist:\n  stages: [prod]\n')
+        self._load()
+
+        with open(join(self.project, 'cache', '.gitignore')) as f:
+            self.assertEqual('*\n', f.read())
+
+    def test_project_config_change_invalidates_cache(self):
+        self._write(self.config_file, 'stylist:\n  stages: [prod]\n')
+        self._load()
+        self._write(self.config_file, 'stylist:\n  stages: [prod, staging]\n')
+
+        self.assertEqual(['prod', 'staging'], self._load()['stylist']['stages'])
+
+    def test_new_user_config_invalidates_cache(self):
+        self._write(self.config_file, 'stylist:\n  stages: [prod]\n')
+        self._load()
+        self._write(join(self.home, '.stylist', 'config.yml'), 'terraform:\n  templates: /tmp/modules\n')
+
+        self.assertEqual({'templates': '/tmp/modules'}, self._load()['terraform'])
@@ -0,0 +1,62 @@
+import os
+import shutil
+import stat
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+from stylist.diff import Diff, Plan, PlanSection
+
+
+class DiffTest(TestCase):
+    def setUp(self):
+        self.diff = Diff(
+            {'same': 'a', 'changed': 'new', 'added': 'b', 'list': [1, 2]},
+            {'same': 'a', 'changed': 'old', 'removed': 'c', 'list': [1, 2]}
+        )
+
+    def test_classification(self):
+        self.assertEqual(['added'], self.diff.added)
+        self.assertEqual(['removed'], self.diff.removed)
+        self.assertEqual(['changed'], self.diff.changed)
+        self.assertEqual(['list', 'same'], self.diff.identical)
+
+    def test_only_deltas_are_written(self):
+        self.assertEqual({'added': 'b', 'changed': 'new'}, self.diff.writes())
+
+    def test_identical_sides_have_no_changes(self):
+        self.assertFalse(Diff({'a': '1'}, {'a': '1'}).has_changes())
+        self.assertFalse(Diff({}, {'a': '1'}).has_changes())
+        self.assertTrue(Diff({}, {'a': '1'}).has_changes(prune=True))
+
+    def test_removed_keys_are_deleted_only_when_pruning(self):
+        self.assertEqual([], PlanSection.from_diff('ssm', 'service:app', self.diff).deletes)
+        self.assertEqual(['removed'], PlanSection.from_diff('ssm', 'service:app', self.diff, prune=True).deletes)
+
+
+class PlanTest(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = join(self.dir, 'sync.plan')
+        self.destination = {'changed': 'old', 'removed': 'c'}
+        self.section = PlanSection.from_diff('ssm', 'service:app', Diff({'changed': 'new', 'added': 'b'},
+                                                                          self.destination), prune=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_saved_plan_is_loaded(self):
+        Plan('uat', 'prod', [self.section]).save(self.path)
+        plan = Plan.load(self.path)
+
+        self.assertEqual(('uat', 'prod'), (plan.source, plan.destination))
+        self.assertEqual(self.section.to_dict(), plan.sections[0].to_dict())
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+    def test_unchanged_destination_has_not_drifted(self):
+        self.assertEqual([], self.section.drifted(dict(self.destination, other='x')))
+
+    def test_drift(self):
+        self.assertEqual(['changed'], self.section.drifted({'changed': 'other', 'removed': 'c'}))
+        self.assertEqual(['added'], self.section.drifted(dict(self.destination, added='meanwhile')))
+        self.assertEqual(['removed'], self.section.drifted({'changed': 'old'}))
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from unittest import TestCase
+
+from stylist.fanout import MISSING, StageException, drift, fan_out, get_stages, merge_rows
+
+
+class FanOutTest(TestCase):
+    def test_stages_run_concurrently_and_keep_order(self):
+        barrier = threading.Event()
+        started = []
+
+        def func(stage):
+            started.append(stage)
+            if len(started) == 3:
+                barrier.set()
+
+            # every stage waits for the others, it would time out if stages were run one by one
+            self.assertTrue(barrier.wait(5))
+            time.sleep(0.01 if stage == 'prod' else 0)
+
+            return stage.upper()
+
+        results, errors = fan_out(['prod', 'uat', 'staging'], func)
+
+        self.assertEqual([], errors)
+        self.assertEqual(['prod', 'uat', 'staging'], list(results.keys()))
+        self.assertEqual(['PROD', 'UAT', 'STAGING'], list(results.values()))
+
+    def test_failed_stage_does_not_hide_other_stages(self):
+        def func(stage):
+            if stage == 'uat':
+                raise ValueError('no credentials')
+            return stage
+
+        results, errors = fan_out(['prod', 'uat'], func)
+
+        self.assertEqual({'prod': 'prod'}, dict(results))
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(errors[0], StageException)
+        self.assertEqual('uat', errors[0].stage)
+        self.assertEqual('uat: no credentials', str(errors[0]))
+
+    def test_bounded_parallelism(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def func(stage):
+            with lock:
+                running.append(stage)
+                peak.append(len(running))
+            time.sleep(0.01)
+            with lock:
+                running.remove(stage)
+
+        results, errors = fan_out(['a', 'b', 'c', 'd', 'e'], func, max_workers=2)
+
+        self.assertEqual(5, len(results))
+        self.assertLessEqual(max(peak), 2)
+
+    def test_no_stages(self):
+        self.assertEqual(({}, []), fan_out([], lambda stage: stage))
+
+
+class FakeContext(object):
+    def __init__(self, stages):
+        self.settings = {'stylist': {'stages': stages}}
+
+
+class GetStagesTest(TestCase):
+    def test_local_stage_is_skipped(self):
+        self.assertEqual(['prod', 'uat'], get_stages(FakeContext(['local', 'prod', 'uat'])))
+
+    def test_no_stages(self):
+        self.assertEqual([], get_stages(FakeContext([])))
+
+
+class MergeTest(TestCase):
+    def test_stage_column_is_prepended(self):
+        results = OrderedDict([('prod', [['A', 1], ['B', 2]]), ('uat', [['A', 3]])])
+
+        self.assertEqual([['prod', 'A', 1], ['prod', 'B', 2], ['uat', 'A', 3]], merge_rows(results))
+
+    def test_drift_lists_only_differing_keys(self):
+        results = OrderedDict([
+            ('prod', {'same': '1', 'changed': 'a', 'prod_only': 'x'}),
+            ('uat', {'same': '1', 'changed': 'b'}),
+        ])
+
+        self.assertEqual([
+            ['changed', 'a', 'b'],
+            ['prod_only', 'x', MISSING],
+        ], drift(results))
+
+    def test_value_equal_to_missing_marker_is_still_drift(self):
+        results = OrderedDict([('prod', {'key': MISSING}), ('uat', {})])
+
+        self.assertEqual([['key', MISSING, MISSING]], drift(results))
@@ -0,0 +1,70 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from os.path import abspath, dirname, join
+from unittest import TestCase
+
+HEAVY_MODULES = ('anyconfig', 'boto3', 'botocore', 'git', 'hcl', 'jinja2', 'pygments', 'terminaltables')
+
+STARTUP_BUDGET = float(os.environ.get('STYLIST_STARTUP_BUDGET', '1.0'))
+
+SCRIPT = """
+import json
+import sys
+
+from stylist.cli import cli
+
+try:
+    cli(['profile', 'selected'])
+except SystemExit:
+    pass
+
+sys.stderr.write(json.dumps([m for m in {modules!r} if m in sys.modules]))
+""".format(modules=HEAVY_MODULES)
+
+
+class StartupTest(TestCase):
+    """
+    Trivial commands must not pay for heavy dependencies they don't use
+    """
+
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.project = tempfile.mkdtemp()
+        os.mkdir(join(self.project, '.stylist'))
+
+        self.env = dict(os.environ, HOME=self.home, PYTHONPATH=os.pathsep.join(
+            filter(None, [abspath(join(dirname(__file__), '..')), os.environ.get('PYTHONPATH')])
+        ))
+
+        # first run generates command manifest
+        self._run()
+
+    def tearDown(self):
+        shutil.rmtree(self.home)
+        shutil.rmtree(self.project)
+
+    def _run(self):
+        started = time.time()
+        p = subprocess.Popen([sys.executable, '-c', SCRIPT], cwd=self.project, env=self.env,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        out, err = p.communicate()
+
+        self.assertEqual(0, p.returncode, err)
+
+        return time.time() - started, json.loads(err.strip().splitlines()[-1])
+
+    def test_trivial_command_does_not_import_heavy_modules(self):
+        _, imported = self._run()
+
+        self.assertEqual([], imported)
+
+    def test_trivial_command_startup_within_budget(self):
+        elapsed = min(self._run()[0] for _ in range(3))
+
+        self.assertLess(elapsed, STARTUP_BUDGET,
+                        'Startup took {:.3f}s, budget is {:.3f}s'.format(elapsed, STARTUP_BUDGET))
@@ -0,0 +1,42 @@
+from unittest import TestCase
+
+from stylist.timing import Tracer
+
+
+class TracerTest(TestCase):
+    def setUp(self):
+        self.tracer = Tracer()
+
+    def test_span_is_recorded_on_exception(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.span('failing', 'command'):
+                raise ValueError()
+
+        self.assertEqual(['failing'], [s.name for s in self.tracer.spans])
+
+    def test_summary_aggregates_spans_in_order_of_first_occurrence(self):
+        self.tracer.record('ssm.GetParameters', 'aws', 10.0, 10.5)
+        self.tracer.record('load context', 'context', 11.0, 11.25)
+        self.tracer.record('ssm.GetParameters', 'aws', 12.0, 13.0)
+
+        self.assertEqual([
+            ['aws', 'ssm.GetParameters', 2, 1.5],
+            ['context', 'load context', 1, 0.25],
+        ], self.tracer.summary())
+
+    def test_chrome_trace_is_relative_to_start(self):
+        self.tracer.started = 100.0
+        self.tracer.record('terraform plan', 'subprocess', 100.5, 102.0, stage='dev')
+
+        event, = self.tracer.chrome_trace()['traceEvents']
+
+        self.assertEqual('X', event['ph'])
+        self.assertEqual(500000, event['ts'])
+        self.assertEqual(1500000, event['dur'])
+        self.assertEqual({'stage': 'dev'}, event['args'])
+
+    def test_reset(self):
+        self.tracer.record('stylist', 'import', 0, 1)
+        self.tracer.reset()
+
+        self.assertEqual([], self.tracer.summary())
@@ -0,0 +1,383 @@
+import json
+import os
+import shutil
+import tempfile
+from os.path import join
+from unittest import TestCase
+
+from stylist.wrapper import terraform
+from stylist.wrapper.terraform import Terraform
+
+MODULE = """
+module "bucket" {
+  source = "git::https://example.com/templates.git//s3_bucket"
+  version = "%s"
+  name = "%s"
+}
+"""
+
+
+_plugin_cache_dir = terraform.PLUGIN_CACHE_DIR
+
+
+def setup_module():
+    # init must never touch plugin cache in home directory of the developer
+    terraform.PLUGIN_CACHE_DIR = tempfile.mkdtemp()
+
+
+def teardown_module():
+    shutil.rmtree(terraform.PLUGIN_CACHE_DIR)
+    terraform.PLUGIN_CACHE_DIR = _plugin_cache_dir
+
+
+class FakeContext(object):
+    def __init__(self, working_dir, environment='staging', settings=None):
+        self.working_dir = working_dir
+        self.environment = environment
+        self.settings = settings or {}
+
+
+class ModulesFingerprintTest(TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.mkdtemp()
+        os.makedirs(join(self.working_dir, 'terraform', '.terraform'))
+        self.write('module.bucket.tf', MODULE % ('1.0', 'files'))
+
+        self.terraform = Terraform(FakeContext(self.working_dir))
+        self.terraform._exec = self._exec
+        self.executed = []
+
+    def tearDown(self):
+        shutil.rmtree(self.working_dir)
+
+    def write(self, name, content):
+        with open(join(self.working_dir, 'terraform', name), 'w') as f:
+            f.write(content)
+
+    def _exec(self, args):
+        self.executed.append(args)
+        return 0
+
+    def test_init_only_when_modules_change(self):
+        self.terraform._update_modules()
+        self.terraform._update_modules()
+        self.assertEqual([['init', '--upgrade=true']], self.executed)
+
+        self.write('module.bucket.tf', MODULE % ('1.1', 'files'))
+        self.terraform._update_modules()
+        self.assertEqual(2, len(self.executed))
+
+    def test_module_variables_do_not_trigger_init(self):
+        fingerprint = self.terraform.modules_fingerprint()
+        self.write('module.bucket.tf', MODULE % ('1.0', 'images'))
+
+        self.assertEqual(fingerprint, self.terraform.modules_fingerprint())
+
+    def test_new_module_file_triggers_init(self):
+        fingerprint = self.terraform.modules_fingerprint()
+        self.write('module.other.tf', MODULE % ('1.0', 'other'))
+
+        self.assertNotEqual(fingerprint, self.terraform.modules_fingerprint())
+
+    def test_missing_terraform_dir_triggers_init(self):
+        self.terraform._update_modules()
+        shutil.rmtree(join(self.working_dir, 'terraform', '.terraform'))
+        self.terraform._update_modules()
+
+        self.assertEqual(2, len(self.executed))
+
+    def test_failed_init_is_retried(self):
+        self.terraform._exec = lambda args: self.executed.append(args) or 1
+
+        self.terraform._update_modules()
+        self.terraform._update_modules()
+
+        self.assertEqual(2, len(self.executed))
+
+    def test_remote_templates_revision(self):
+        git_dir = join(self.working_dir, 'templates', '.git')
+        os.makedirs(join(git_dir, 'refs', 'heads'))
+        with open(join(git_dir, 'HEAD'), 'w') as f:
+            f.write('ref: refs/heads/master\n')
+        with open(join(git_dir, 'packed-refs'), 'w') as f:
+            f.write('# pack-refs with: peeled\nabc123 refs/heads/master\n')
+
+        self.assertEqual('abc123', terraform.git_head(join(self.working_dir, 'templates')))
+
+        with open(join(git_dir, 'refs', 'heads', 'master'), 'w') as f:
+            f.write('def456\n')
+
+        self.assertEqual('def456', terraform.git_head(join(self.working_dir, 'templates')))
+        self.assertIsNone(terraform.git_head(self.working_dir))
+
+
+class SetupTest(TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.mkdtemp()
+        self.provider_file = join(self.working_dir, 'terraform', 'provider.tf')
+        self.terraform = Terraform(FakeContext(self.working_dir))
+
+    def tearDown(self):
+        shutil.rmtree(self.working_dir)
+
+    def test_provider_file_is_written_only_when_changed(self):
+        self.terraform.setup()
+        inode = os.stat(self.provider_file).st_ino
+
+        self.terraform.setup()
+        self.assertEqual(inode, os.stat(self.provider_file).st_ino)
+
+        with open(self.provider_file, 'w') as f:
+            f.write('# edited')
+
+        self.terraform.setup()
+        with open(self.provider_file) as f:
+            self.assertEqual(terraform.PROVIDER_TEMPLATE.rstrip('\n'), f.read())
+
+
+class WorkspacesTest(TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.mkdtemp()
+        self.terraform_dir = join(self.working_dir, 'terraform')
+        os.makedirs(join(self.terraform_dir, '.terraform'))
+        os.makedirs(join(self.terraform_dir, 'terraform.tfstate.d', 'uat'))
+
+        self.executed = []
+        self.terraform = self._terraform()
+
+    def tearDown(self):
+        shutil.rmtree(self.working_dir)
+
+    def _terraform(self, environment='uat', settings=None):
+        tf = Terraform(FakeContext(self.working_dir, environment, settings))
+        tf._exec = lambda args: self.executed.append(args) or 0
+
+        return tf
+
+    def _select(self, data_dir, name):
+        with open(join(self.terraform_dir, data_dir, 'environment'), 'w') as f:
+            f.write(name)
+
+    def test_current_workspace(self):
+        self.assertEqual('default', self.terraform.workspaces.current)
+
+        self._select('.terraform', 'uat')
+        self.assertEqual('uat', self.terraform.workspaces.current)
+
+    def test_selected_workspace_is_not_selected_again(self):
+        self._select('.terraform', 'uat')
+        self.terraform._ensure_env()
+
+        self.assertEqual([], self.executed)
+
+    def test_existing_workspace_is_selected(self):
+        self.terraform._ensure_env()
+
+        self.assertEqual([['workspace', 'select', 'uat']], self.executed)
+
+    def test_missing_workspace_is_created(self):
+        prod = self._terraform('prod')
+        prod._exec = lambda args: self.executed.append(args) or (1 if args[1] == 'select' else 0)
+        prod._ensure_env()
+
+        self.assertEqual([['workspace', 'select', 'prod'], ['workspace', 'new', 'prod']], self.executed)
+
+    def test_remote_workspace_is_selected(self):
+        # fresh data dir of a remote backend: no local state of the workspace, but it exists in the backend
+        os.rmdir(join(self.terraform_dir, 'terraform.tfstate.d', 'uat'))
+        self.terraform._ensure_env()
+
+        self.assertEqual([['workspace', 'select', 'uat']], self.executed)
+
+    def test_failed_switch(self):
+        self.terraform._exec = lambda args: 1
+
+        with self.assertRaises(terraform.TerraformException):
+            self.terraform._ensure_env()
+
+    def test_isolated_data_dir_per_stage(self):
+        settings = {'terraform': {'isolated_data_dirs': True}}
+        uat = self._terraform('uat', settings)
+        prod = self._terraform('prod', settings)
+
+        self.assertEqual(join(self.terraform_dir, '.terraform-uat'), uat.data_dir)
+        self.assertEqual(join(self.terraform_dir, '.terraform-prod'), prod.data_dir)
+        self.assertEqual(join(self.terraform_dir, '.terraform-uat', '.tfupdate'), uat.tfupdate_path)
+        self.assertEqual(uat.data_dir, uat._env()['TF_DATA_DIR'])
+
+
+class PlanChangesTest(TestCase):
+    def setUp(self):
+        self.terraform = Terraform(FakeContext(tempfile.gettempdir()))
+
+    def test_counts_from_show_json(self):
+        plan = {'resource_changes': [
+            {'change': {'actions': ['create']}},
+            {'change': {'actions': ['update']}},
+            {'change': {'actions': ['delete', 'create']}},
+            {'change': {'actions': ['delete']}},
+            {'change': {'actions': ['no-op']}},
+        ]}
+        self.terraform._capture = lambda args: (0, json.dumps(plan))
+
+        self.assertEqual({'add': 2, 'change': 1, 'destroy': 2}, self.terraform.plan_changes('plan'))
+
+    def test_show_json_is_not_supported(self):
+        self.terraform._capture = lambda args: (1, '')
+
+        self.assertIsNone(self.terraform.plan_changes('plan'))
+
+    def test_counts_from_plan_output(self):
+        self.assertEqual({'add': 1, 'change': 0, 'destroy': 12},
+                         Terraform.parse_plan_output('...\nPlan: 1 to add, 0 to change, 12 to destroy.\n'))
+        self.assertEqual({'add': 0, 'change': 0, 'destroy': 0},
+                         Terraform.parse_plan_output('No changes. Infrastructure is up-to-date.'))
+        self.assertIsNone(Terraform.parse_plan_output('Error: something'))
+
+
+class FakeSession(object):
+    region_name = 'eu-west-1'
+
+
+class FakeProvider(object):
+    def stage_profile(self, stage):
+        return stage
+
+    def get_caller_identity(self, profile=None):
+        return {'Account': '123456789012'}
+
+    def get_session(self, profile):
+        return FakeSession()
+
+    def __init__(self):
+        self.forgotten = []
+
+    def terraform_context(self, refresh=False, profile=None):
+        return {'alb_main_arn_https': 'arn'}
+
+    def forget_terraform_context(self, profile=None):
+        self.forgotten.append(profile)
+
+
+class PlanReuseTest(TestCase):
+    def setUp(self):
+        self.working_dir = tempfile.mkdtemp()
+        self.terraform_dir = join(self.working_dir, 'terraform')
+        os.makedirs(join(self.terraform_dir, '.terraform'))
+        os.makedirs(join(self.terraform_dir, 'terraform.tfstate.d', 'uat'))
+
+        with open(join(self.terraform_dir, '.terraform', 'environment'), 'w') as f:
+            f.write('uat')
+
+        self.write('main.tf', MODULE % ('1.0', 'files'))
+        self.set_state(1)
+        self.plans = 0
+        self.reused = []
+
+    def tearDown(self):
+        shutil.rmtree(self.working_dir)
+
+    def write(self, name, content):
+        with open(join(self.terraform_dir, name), 'w') as f:
+            f.write(content)
+
+    def set_state(self, serial):
+        self.write('terraform.tfstate.d/uat/terraform.tfstate', json.dumps({'lineage': 'abc', 'serial': serial}))
+
+    def _exec(self, args, on_line=None):
+        if args[0] == 'plan':
+            self.plans += 1
+            with open([a for a in args if a.startswith('-out=')][0][len('-out='):], 'w') as f:
+                f.write('plan {}'.format(self.plans))
+
+        return 0
+
+    def plan(self, reuse=True, settings=None):
+        ctx = FakeContext(self.working_dir, 'uat', settings)
+        ctx.name = 'project'
+        ctx.no_cache = False
+        ctx.provider = FakeProvider()
+
+        self.terraform = Terraform(ctx)
+        self.terraform._exec = self._exec
+
+        reusable = self.terraform._reusable
+        self.terraform._reusable = lambda fingerprint: self.reused.append(reusable(fingerprint)) or self.reused[-1]
+
+        path, exit_code = self.terraform.plan(True, reuse=reuse)
+        try:
+            with open(path) as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    def test_plan_is_reused(self):
+        self.assertEqual('plan 1', self.plan())
+        self.assertEqual('plan 1', self.plan())
+        self.assertEqual(1, self.plans)
+
+    def test_changed_inputs_are_planned_again(self):
+        self.plan()
+        self.write('env.uat.tfvars', 'version = "2"\n')
+        self.plan()
+
+        self.assertEqual(2, self.plans)
+
+    def test_changed_state_is_planned_again(self):
+        self.plan()
+        self.set_state(2)
+        self.plan()
+
+        self.assertEqual(2, self.plans)
+
+    def test_changed_local_module_is_planned_again(self):
+        modules_dir = join(self.working_dir, 'modules')
+        os.makedirs(join(modules_dir, 'bucket'))
+        os.makedirs(join(modules_dir, 'policy'))
+
+        with open(join(modules_dir, 'bucket', 'main.tf'), 'w') as f:
+            f.write('module "policy" {\n  source = "../policy"\n}\n')
+        with open(join(modules_dir, 'policy', 'main.tf'), 'w') as f:
+            f.write('variable "actions" {}\n')
+        self.write('module.bucket_files.tf', 'module "bucket" {\n  source = "../modules/bucket"\n}\n')
+
+        self.plan()
+        self.plan()
+        self.assertEqual([True], self.reused[-1:])
+
+        # module used by the local module changes, sources and versions stay the same
+        with open(join(modules_dir, 'policy', 'main.tf'), 'w') as f:
+            f.write('variable "actions" { default = ["s3:GetObject"] }\n')
+
+        self.plan()
+        self.assertEqual([False], self.reused[-1:])
+        self.assertEqual(2, self.plans)
+
+    def test_plan_of_isolated_data_dir_is_not_reused(self):
+        os.makedirs(join(self.terraform_dir, '.terraform-uat'))
+
+        self.plan(settings={'terraform': {'isolated_data_dirs': True}})
+        self.plan()
+
+        self.assertEqual([False], self.reused[-1:])
+        self.assertEqual(2, self.plans)
+
+    def test_replan_and_expiry(self):
+        self.plan()
+        self.plan(reuse=False)
+        self.plan(settings={'terraform': {'plan_reuse_ttl': 0}})
+
+        self.assertEqual(3, self.plans)
+
+    def test_apply_invalidates_context(self):
+        self.plan()
+        self.terraform.apply('plan')
+
+        self.assertEqual(['uat'], self.terraform.ctx.provider.forgotten)
+
+    def test_apply_verifies_state(self):
+        self.plan()
+        self.set_state(2)
+
+        with self.assertRaises(terraform.TerraformException):
+            self.terraform.apply('plan')